@@ -85,6 +85,15 @@ rates, including:
   simulation code.
 
 
+integration
+-----------
+
+integration provides integrate_network, a numba-compiled, variable
+order BDF integrator for a PythonNetwork or NumpyNetwork at fixed
+density and temperature that uses the sparsity of the network's
+Jacobian in its linear algebra.  The integrator is only imported when
+integrate_network is first accessed.
+
 rates
 -----
 
@@ -140,3 +149,13 @@ from pynucastro.rates import (ApproximateRate, DerivedRate, LangankeLibrary,
                               SuzukiLibrary, TabularLibrary, Tfactors,
                               list_known_rates, load_rate)
 from pynucastro.screening import make_plasma_state, make_screen_factors
+
+
+def __getattr__(name):
+    # the integrator is imported on first use, so that importing
+    # pynucastro doesn't pull it in
+    if name == "integrate_network":
+        # pylint: disable-next=import-outside-toplevel
+        from pynucastro.integration import integrate_network
+        return integrate_network
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,126 @@
+"""
+Support for the on-disk cache of pre-parsed data files.
+
+Several of the data files that pynucastro ships (the ReacLib library,
+the tabulated weak rates, the nuclear data tables) are stored as text
+and are expensive to parse.  The routines here let us store a binary
+(NumPy) version of the parsed data in a cache directory, keyed by a
+hash of the original file, so subsequent loads can skip the parsing.
+
+The cache location is controlled by the ``PYNUCASTRO_CACHE_DIR``
+environment variable.  If it is not set, we use
+``$XDG_CACHE_HOME/pynucastro`` (defaulting to
+``~/.cache/pynucastro``).  Setting ``PYNUCASTRO_CACHE_DIR`` to an
+empty string disables the cache.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# bump this if the layout of any of the cached files changes
+CACHE_VERSION = 2
+
+
+def get_cache_dir():
+    """Return the directory used for the binary cache, or None if
+    caching is disabled."""
+
+    cache_dir = os.environ.get("PYNUCASTRO_CACHE_DIR")
+    if cache_dir is not None:
+        if not cache_dir.strip():
+            return None
+        return Path(cache_dir)
+
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return Path(xdg_cache)/"pynucastro"
+    return Path.home()/".cache"/"pynucastro"
+
+
+def file_hash(path):
+    """Return the sha256 hash of the contents of the file path."""
+
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def get_cache_file(kind, source, *, suffix=".npz", digest=None):
+    """Return the path of the cache file holding the parsed version
+    of the data file source, or None if caching is disabled.  Here
+    kind is a short string describing the type of data stored.  By
+    default, the file name includes a hash of the contents of source;
+    a different digest (e.g. one describing a whole directory) can
+    be given instead."""
+
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+
+    source = Path(source)
+    if digest is None:
+        digest = file_hash(source)
+    return cache_dir/f"{kind}-v{CACHE_VERSION}-{source.name}-{digest[:24]}{suffix}"
+
+
+def _atomic_write(cache_file, write_func):
+    """Write cache_file by calling write_func with an open file object
+    for a temporary file that then replaces cache_file.  Any errors
+    (e.g. a read-only cache directory) are ignored, since the cache is
+    only an optimization."""
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write_func(f)
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    except OSError:
+        pass
+
+
+def write_npz(cache_file, **arrays):
+    """Atomically write the arrays to the npz file cache_file."""
+
+    _atomic_write(cache_file, lambda f: np.savez(f, **arrays))
+
+
+def write_npy(cache_file, array):
+    """Atomically write a single array to the npy file cache_file."""
+
+    _atomic_write(cache_file, lambda f: np.save(f, array))
+
+
+def read_npz(cache_file):
+    """Return the dictionary of arrays stored in the npz file
+    cache_file, or None if it doesn't exist or cannot be read."""
+
+    if cache_file is None or not cache_file.is_file():
+        return None
+    try:
+        with np.load(cache_file, allow_pickle=False) as data:
+            return {k: data[k] for k in data.files}
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def read_npy_mmap(cache_file):
+    """Return a read-only memory map of the array stored in the npy
+    file cache_file, or None if it doesn't exist or cannot be read."""
+
+    if cache_file is None or not cache_file.is_file():
+        return None
+    try:
+        return np.load(cache_file, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
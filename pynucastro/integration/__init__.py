@@ -0,0 +1,11 @@
+"""A stiff ODE integrator for reaction networks.
+
+:func:`integrate_network` integrates a :class:`PythonNetwork` or
+:class:`NumpyNetwork` at fixed density and temperature with a
+variable-order BDF method, compiled with numba, that uses the sparsity
+of the network's Jacobian in its linear algebra.
+"""
+
+__all__ = ["integrator"]
+
+from .integrator import IntegrationResult, integrate_network
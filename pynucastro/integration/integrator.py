@@ -0,0 +1,855 @@
+"""A numba-compiled, variable-order BDF integrator for reaction
+networks.
+
+The time stepping follows the BDF method of ``scipy.integrate``
+(itself based on the quasi-constant step size NDF formulas of
+Shampine & Reichelt 1997), but the whole integration runs in compiled
+code, and the linear systems ``(I - c J) x = b`` that arise in the
+Newton iterations are solved with a sparse LU decomposition: the
+factors are stored in compressed sparse row form over the sparsity
+pattern of the network's Jacobian plus the fill-in it generates, with
+the nuclei reordered (reverse Cuthill-McKee) to keep that fill-in
+small.
+
+Since ``I - c J`` is diagonally dominant for the small ``c`` used
+when integrating stiff systems, the factorization is done without
+pivoting, which lets us compute the fill-in symbolically, once per
+network.  If a pivot is tiny compared to the rest of its row, the
+sparse factorization is abandoned and the matrix is instead factored
+as a dense matrix with partial pivoting.
+"""
+
+import collections
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from pynucastro.networks.numpy_network import NumpyNetwork
+from pynucastro.networks.python_network import PythonNetwork
+from pynucastro.rates import TabularRate
+from pynucastro.rates.rate import numba
+from pynucastro.screening import PlasmaState, ScreenFactorsArray
+
+if numba is not None:
+    njit = numba.njit
+else:
+    def njit(func):
+        return func
+
+
+IntegrationResult = collections.namedtuple(
+    "IntegrationResult",
+    ["t", "y", "success", "message", "nsteps", "nfev", "njev", "nlu"])
+
+IntegrationResult.__doc__ = """\
+The result of :func:`integrate_network`.
+
+t: the times the solution is stored at
+
+y: the molar fractions at those times, with shape (nnuc, len(t))
+
+success: whether the integration reached the final time
+
+message: a description of the reason the integration stopped
+
+nsteps: the number of steps taken
+
+nfev: the number of righthand side evaluations
+
+njev: the number of Jacobian evaluations
+
+nlu: the number of LU decompositions
+"""
+
+_MESSAGES = {0: "The solver successfully reached the end of the integration interval.",
+             -1: "The maximum number of steps was taken before reaching the end of the integration interval.",
+             -2: "The step size became too small.",
+             -3: "The iteration matrix is singular."}
+
+MAX_ORDER = 5
+NEWTON_MAXITER = 4
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10.0
+
+# the smallest pivot, relative to the largest entry of its row, that
+# we accept in the sparse LU decomposition
+PIVOT_TOL = 1.e-10
+
+# the coefficients of the NDF formulas
+_kappa = np.array([0, -0.1850, -1/9, -0.0823, -0.0415, 0])
+_gamma = np.hstack((0, np.cumsum(1 / np.arange(1, MAX_ORDER + 1))))
+_alpha = (1 - _kappa) * _gamma
+_error_const = _kappa * _gamma + 1 / np.arange(1, MAX_ORDER + 2)
+
+
+def lu_pattern(indptr, indices, n):
+    """compute the sparsity pattern of the LU decomposition (without
+    pivoting) of an n x n matrix whose nonzeros (in CSR form) are
+    given by indptr and indices.  The diagonal is always included.
+
+    To limit the fill-in, the rows and columns are first reordered
+    with the reverse Cuthill-McKee ordering of the symmetrized
+    pattern, A + A^T.  Since that pattern is symmetric, the fill-in
+    follows from its elimination tree, and the pattern of U is the
+    transpose of that of L.
+
+    We return the pattern as 5 arrays: the ordering, perm (row k of
+    the reordered matrix is row perm[k] of the original); the
+    columns of L + U for each reordered row, in CSR form (fill_ptr,
+    fill_idx, with the columns of each row sorted); the position of
+    the diagonal in each row, diag_pos; and, for each of the input
+    nonzeros, its position in fill_idx, jac_to_fill."""
+
+    A = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n, n))
+    S = (A + A.T + sparse.identity(n, format="csr")).tocsr()
+    perm = reverse_cuthill_mckee(S, symmetric_mode=True).astype(np.int64)
+
+    S = S[perm, :][:, perm].tocsr()
+    S.sort_indices()
+    lower_ptr, lower_idx = _lower_pattern(S.indptr.astype(np.int64),
+                                          S.indices.astype(np.int64), n)
+
+    # L + U: the rows of L, their transpose, and the diagonal
+    lower_row = np.repeat(np.arange(n, dtype=np.int64), np.diff(lower_ptr))
+    rows = np.concatenate((lower_row, lower_idx, np.arange(n, dtype=np.int64)))
+    cols = np.concatenate((lower_idx, lower_row, np.arange(n, dtype=np.int64)))
+    keys = np.sort(rows * n + cols)
+
+    fill_ptr = np.searchsorted(keys // n, np.arange(n+1)).astype(np.int64)
+    fill_idx = keys % n
+    diag_pos = np.searchsorted(keys, np.arange(n, dtype=np.int64) * (n + 1))
+
+    iperm = np.empty(n, dtype=np.int64)
+    iperm[perm] = np.arange(n, dtype=np.int64)
+    jac_row = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    jac_to_fill = np.searchsorted(keys, iperm[jac_row] * n + iperm[np.asarray(indices)])
+
+    return perm, fill_ptr, fill_idx, diag_pos, jac_to_fill
+
+
+@njit
+def _lower_pattern(indptr, indices, n):
+    """for a matrix with a symmetric sparsity pattern (in CSR form),
+    find the strictly lower triangular pattern of L, row by row.  The
+    pattern of row i of L is the set of nodes in the elimination tree
+    reached by walking up from the nonzeros of row i of the matrix."""
+
+    # the elimination tree (Liu's algorithm, with path compression)
+    parent = np.full(n, -1, dtype=np.int64)
+    ancestor = np.full(n, -1, dtype=np.int64)
+    for i in range(n):
+        for p in range(indptr[i], indptr[i+1]):
+            j = indices[p]
+            while j != -1 and j < i:
+                j_next = ancestor[j]
+                ancestor[j] = i
+                if j_next == -1:
+                    parent[j] = i
+                j = j_next
+
+    # walk the row subtrees twice: once to count, once to store
+    lower_ptr = np.zeros(n+1, dtype=np.int64)
+    lower_idx = np.empty(0, dtype=np.int64)
+    counts = np.zeros(n, dtype=np.int64)
+    mark = np.full(n, -1, dtype=np.int64)
+    for stage in range(2):
+        mark[:] = -1
+        for i in range(n):
+            mark[i] = i
+            nz = lower_ptr[i]
+            for p in range(indptr[i], indptr[i+1]):
+                j = indices[p]
+                while j < i and mark[j] != i:
+                    if stage == 1:
+                        lower_idx[nz] = j
+                    nz += 1
+                    mark[j] = i
+                    j = parent[j]
+            counts[i] = nz - lower_ptr[i]
+        if stage == 0:
+            lower_ptr[1:] = np.cumsum(counts)
+            lower_idx = np.empty(lower_ptr[n], dtype=np.int64)
+
+    return lower_ptr, lower_idx
+
+
+@njit
+def _build_matrix(lu, c, jac_data, jac_to_fill, diag_pos):
+    """store I - c J in lu, the data of the (reordered) matrix over
+    the pattern of its LU decomposition"""
+    lu[:] = 0.0
+    for pos in diag_pos:
+        lu[pos] = 1.0
+    for p, pos in enumerate(jac_to_fill):
+        lu[pos] -= c * jac_data[p]
+
+
+@njit
+def _lu_factor(lu, fill_ptr, fill_idx, diag_pos):
+    """factor the matrix stored in lu in place into L (unit diagonal,
+    below the diagonal) and U, without pivoting, one row at a time.
+    Returns False if a pivot is smaller than PIVOT_TOL times the
+    largest entry of its row of the matrix, in which case lu is left
+    partially factored."""
+    n = len(diag_pos)
+    work = np.zeros(n)
+    for i in range(n):
+        row_max = 0.0
+        for p in range(fill_ptr[i], fill_ptr[i+1]):
+            work[fill_idx[p]] = lu[p]
+            row_max = max(row_max, abs(lu[p]))
+        # the columns of each row are sorted, so the rows k < i are
+        # eliminated in order
+        for p in range(fill_ptr[i], diag_pos[i]):
+            k = fill_idx[p]
+            lik = work[k] / lu[diag_pos[k]]
+            work[k] = lik
+            for q in range(diag_pos[k]+1, fill_ptr[k+1]):
+                work[fill_idx[q]] -= lik * lu[q]
+        for p in range(fill_ptr[i], fill_ptr[i+1]):
+            lu[p] = work[fill_idx[p]]
+            work[fill_idx[p]] = 0.0
+        if abs(lu[diag_pos[i]]) <= PIVOT_TOL * row_max:
+            return False
+    return True
+
+
+@njit
+def _lu_solve(lu, b, perm, fill_ptr, fill_idx, diag_pos):
+    """solve A x = b, with the LU decomposition of the reordered A
+    stored in lu by _lu_factor"""
+    n = len(perm)
+    z = np.empty(n)
+    for k in range(n):
+        z[k] = b[perm[k]]
+    for i in range(n):
+        for p in range(fill_ptr[i], diag_pos[i]):
+            z[i] -= lu[p] * z[fill_idx[p]]
+    for i in range(n-1, -1, -1):
+        for p in range(diag_pos[i]+1, fill_ptr[i+1]):
+            z[i] -= lu[p] * z[fill_idx[p]]
+        z[i] /= lu[diag_pos[i]]
+    x = np.empty(n)
+    for k in range(n):
+        x[perm[k]] = z[k]
+    return x
+
+
+@njit
+def _dense_lu_factor(W, lu, fill_ptr, fill_idx, piv):
+    """store the (reordered) matrix held in lu as a dense matrix in W
+    and factor it in place with partial pivoting, recording the row
+    swaps in piv.  Returns False if the matrix is singular."""
+    n = len(piv)
+    W[:, :] = 0.0
+    for i in range(n):
+        for p in range(fill_ptr[i], fill_ptr[i+1]):
+            W[i, fill_idx[p]] = lu[p]
+    for k in range(n):
+        m = k + np.argmax(np.abs(W[k:, k]))
+        piv[k] = m
+        if W[m, k] == 0.0:
+            return False
+        if m != k:
+            for j in range(n):
+                W[k, j], W[m, j] = W[m, j], W[k, j]
+        for i in range(k+1, n):
+            W[i, k] /= W[k, k]
+            for j in range(k+1, n):
+                W[i, j] -= W[i, k] * W[k, j]
+    return True
+
+
+@njit
+def _dense_lu_solve(W, piv, b, perm):
+    """solve A x = b, with the LU decomposition of the reordered A
+    stored in W and piv by _dense_lu_factor"""
+    n = len(perm)
+    z = np.empty(n)
+    for k in range(n):
+        z[k] = b[perm[k]]
+    for k in range(n):
+        z[k], z[piv[k]] = z[piv[k]], z[k]
+    for i in range(n):
+        for j in range(i):
+            z[i] -= W[i, j] * z[j]
+    for i in range(n-1, -1, -1):
+        for j in range(i+1, n):
+            z[i] -= W[i, j] * z[j]
+        z[i] /= W[i, i]
+    x = np.empty(n)
+    for k in range(n):
+        x[perm[k]] = z[k]
+    return x
+
+
+@njit
+def _factor_matrix(lu, W, piv, c, jac_data, jac_to_fill, fill_ptr, fill_idx, diag_pos):
+    """build and factor I - c J, first with the sparse LU
+    decomposition and, if that hits a tiny pivot, with the dense one
+    (allocating W if needed).  Returns W, whether the dense
+    factorization is used, and whether the factorization succeeded."""
+    _build_matrix(lu, c, jac_data, jac_to_fill, diag_pos)
+    if _lu_factor(lu, fill_ptr, fill_idx, diag_pos):
+        return W, False, True
+    n = len(diag_pos)
+    if W.shape[0] != n:
+        W = np.zeros((n, n))
+    _build_matrix(lu, c, jac_data, jac_to_fill, diag_pos)
+    return W, True, _dense_lu_factor(W, lu, fill_ptr, fill_idx, piv)
+
+
+@njit
+def _norm(x):
+    return np.sqrt(np.mean(x * x))
+
+
+@njit
+def _compute_R(order, factor):
+    """the matrix used to change the step size of the difference
+    array by factor"""
+    M = np.zeros((order + 1, order + 1))
+    for i in range(1, order + 1):
+        for j in range(1, order + 1):
+            M[i, j] = (i - 1 - factor * j) / i
+    M[0, :] = 1.0
+    R = np.empty_like(M)
+    R[0, :] = M[0, :]
+    for i in range(1, order + 1):
+        R[i, :] = R[i-1, :] * M[i, :]
+    return R
+
+
+@njit
+def _change_D(D, order, factor):
+    """rescale the difference array D in place for a step size
+    changed by factor"""
+    RU = np.dot(_compute_R(order, factor), _compute_R(order, 1.0))
+    Dnew = np.zeros((order + 1, D.shape[1]))
+    for i in range(order + 1):
+        for j in range(order + 1):
+            Dnew[i, :] += RU[j, i] * D[j, :]
+    D[:order+1, :] = Dnew
+
+
+@njit
+def _order_factor(error_norm, exponent):
+    if error_norm == 0.0:
+        return np.inf
+    return error_norm ** (-1.0 / exponent)
+
+
+@njit
+def _dense_output(t_eval, t, h, order, D):
+    """evaluate the interpolating polynomial of the last step at t_eval"""
+    y = D[0, :].copy()
+    p = 1.0
+    for k in range(order):
+        p *= (t_eval - (t - h * k)) / (h * (1 + k))
+        y += D[k+1, :] * p
+    return y
+
+
+@njit
+def _select_initial_step(fun, args, t0, y0, f0, interval, rtol, atol):
+    """an empirical estimate of the first step size (Hairer, Norsett &
+    Wanner, Sec. II.4), for a first order method"""
+    scale = atol + np.abs(y0) * rtol
+    d0 = _norm(y0 / scale)
+    d1 = _norm(f0 / scale)
+    if d0 < 1.e-5 or d1 < 1.e-5:
+        h0 = 1.e-6
+    else:
+        h0 = 0.01 * d0 / d1
+    h0 = min(h0, interval)
+
+    f1 = fun(t0 + h0, y0 + h0 * f0, *args)
+    d2 = _norm((f1 - f0) / scale) / h0
+
+    if d1 <= 1.e-15 and d2 <= 1.e-15:
+        h1 = max(1.e-6, h0 * 1.e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** 0.5
+
+    return min(100 * h0, h1, interval)
+
+
+@njit
+def _solve_bdf_system(fun, args, t_new, y_predict, c, psi, lu, W, piv, dense,
+                      perm, fill_ptr, fill_idx, diag_pos, scale, tol):
+    """the simplified Newton iteration for the implicit BDF system.
+    The linear systems are solved with the dense factorization in W
+    and piv if dense is True, and with the sparse one in lu otherwise."""
+    d = np.zeros_like(y_predict)
+    y = y_predict.copy()
+    dy_norm_old = -1.0
+    converged = False
+    nfev = 0
+    n_iter = 0
+    for k in range(NEWTON_MAXITER):
+        n_iter = k + 1
+        f = fun(t_new, y, *args)
+        nfev += 1
+        if not np.all(np.isfinite(f)):
+            break
+
+        if dense:
+            dy = _dense_lu_solve(W, piv, c * f - psi - d, perm)
+        else:
+            dy = _lu_solve(lu, c * f - psi - d, perm, fill_ptr, fill_idx, diag_pos)
+        dy_norm = _norm(dy / scale)
+
+        rate = -1.0
+        if dy_norm_old > 0.0:
+            rate = dy_norm / dy_norm_old
+
+        if rate >= 0.0 and (rate >= 1.0 or
+                            rate ** (NEWTON_MAXITER - k) / (1.0 - rate) * dy_norm > tol):
+            break
+
+        y += dy
+        d += dy
+
+        if dy_norm == 0.0 or (rate >= 0.0 and rate / (1.0 - rate) * dy_norm < tol):
+            converged = True
+            break
+
+        dy_norm_old = dy_norm
+
+    return converged, n_iter, y, d, nfev
+
+
+@njit
+def _bdf_integrate(fun, jac, args, y0, t0, t_eval, rtol, atol, max_steps,
+                   perm, fill_ptr, fill_idx, diag_pos, jac_to_fill):
+    """integrate y' = fun(t, y, *args) from t0 to t_eval[-1], storing
+    the solution at the (increasing) times t_eval.  jac(t, y, *args)
+    returns the data of the Jacobian in CSR form, and the remaining
+    arguments describe the pattern of its LU decomposition (see
+    lu_pattern).
+
+    Returns the solution, a status flag (0 for success), and the
+    number of steps, function and Jacobian evaluations, and LU
+    decompositions."""
+
+    n = len(y0)
+    nout = len(t_eval)
+    t_bound = t_eval[nout-1]
+    eps = np.finfo(np.float64).eps
+
+    ys = np.zeros((nout, n))
+    nsteps = 0
+    nfev = 0
+    njev = 0
+    nlu = 0
+
+    t = t0
+    y = y0.copy()
+    f = fun(t, y, *args)
+    nfev += 1
+
+    jac_data = jac(t, y, *args)
+    njev += 1
+
+    lu = np.zeros(len(fill_idx))
+    lu_valid = False
+
+    # the dense fallback for when the sparse factorization hits a
+    # tiny pivot -- W is only allocated the first time it is needed
+    W = np.zeros((0, 0))
+    piv = np.zeros(n, dtype=np.int64)
+    dense = False
+
+    h_abs = _select_initial_step(fun, args, t, y, f, t_bound - t, rtol, atol)
+    nfev += 1
+
+    newton_tol = max(10 * eps / rtol, min(0.03, rtol ** 0.5))
+
+    D = np.zeros((MAX_ORDER + 3, n))
+    D[0, :] = y
+    D[1, :] = f * h_abs
+    order = 1
+    n_equal_steps = 0
+
+    ie = 0
+    while ie < nout and t_eval[ie] <= t:
+        ys[ie, :] = y
+        ie += 1
+
+    while t < t_bound:
+        if nsteps >= max_steps:
+            return ys[:ie], -1, nsteps, nfev, njev, nlu
+        nsteps += 1
+
+        min_step = 10 * (np.nextafter(t, np.inf) - t)
+        if h_abs < min_step:
+            _change_D(D, order, min_step / h_abs)
+            h_abs = min_step
+            n_equal_steps = 0
+            lu_valid = False
+
+        current_jac = False
+        step_accepted = False
+        safety = 0.9
+        error_norm = 0.0
+        t_new = t
+        y_new = y
+        d = np.zeros(n)
+        scale = np.ones(n)
+
+        while not step_accepted:
+            if h_abs < min_step:
+                return ys[:ie], -2, nsteps, nfev, njev, nlu
+
+            t_new = t + h_abs
+            if t_new > t_bound:
+                t_new = t_bound
+                _change_D(D, order, (t_new - t) / h_abs)
+                n_equal_steps = 0
+                lu_valid = False
+            h = t_new - t
+            h_abs = h
+
+            y_predict = np.zeros(n)
+            for i in range(order + 1):
+                y_predict += D[i, :]
+            scale = atol + rtol * np.abs(y_predict)
+
+            psi = np.zeros(n)
+            for i in range(1, order + 1):
+                psi += D[i, :] * _gamma[i]
+            psi /= _alpha[order]
+
+            c = h / _alpha[order]
+
+            converged = False
+            n_iter = 0
+            while not converged:
+                if not lu_valid:
+                    nlu += 1
+                    W, dense, lu_valid = _factor_matrix(lu, W, piv, c, jac_data, jac_to_fill,
+                                                        fill_ptr, fill_idx, diag_pos)
+                    if not lu_valid:
+                        return ys[:ie], -3, nsteps, nfev, njev, nlu
+
+                converged, n_iter, y_new, d, nf = _solve_bdf_system(
+                    fun, args, t_new, y_predict, c, psi, lu, W, piv, dense,
+                    perm, fill_ptr, fill_idx, diag_pos, scale, newton_tol)
+                nfev += nf
+
+                if not converged:
+                    if current_jac:
+                        break
+                    jac_data = jac(t_new, y_predict, *args)
+                    njev += 1
+                    current_jac = True
+                    lu_valid = False
+
+            if not converged:
+                factor = 0.5
+                h_abs *= factor
+                _change_D(D, order, factor)
+                n_equal_steps = 0
+                lu_valid = False
+                continue
+
+            safety = 0.9 * (2 * NEWTON_MAXITER + 1) / (2 * NEWTON_MAXITER + n_iter)
+
+            scale = atol + rtol * np.abs(y_new)
+            error_norm = _norm(_error_const[order] * d / scale)
+
+            if error_norm > 1:
+                factor = max(MIN_FACTOR, safety * error_norm ** (-1.0 / (order + 1)))
+                h_abs *= factor
+                _change_D(D, order, factor)
+                n_equal_steps = 0
+                # the LU decomposition is still a good enough
+                # approximation for the Newton iteration
+            else:
+                step_accepted = True
+
+        n_equal_steps += 1
+
+        t = t_new
+        y = y_new
+
+        D[order+2, :] = d - D[order+1, :]
+        D[order+1, :] = d
+        for i in range(order, -1, -1):
+            D[i, :] += D[i+1, :]
+
+        if n_equal_steps >= order + 1:
+            error_m_norm = np.inf
+            if order > 1:
+                error_m_norm = _norm(_error_const[order-1] * D[order, :] / scale)
+            error_p_norm = np.inf
+            if order < MAX_ORDER:
+                error_p_norm = _norm(_error_const[order+1] * D[order+2, :] / scale)
+
+            factor_m = _order_factor(error_m_norm, order)
+            factor_0 = _order_factor(error_norm, order + 1)
+            factor_p = _order_factor(error_p_norm, order + 2)
+
+            max_factor = factor_m
+            delta_order = -1
+            if factor_0 > max_factor:
+                max_factor = factor_0
+                delta_order = 0
+            if factor_p > max_factor:
+                max_factor = factor_p
+                delta_order = 1
+            order += delta_order
+
+            factor = min(MAX_FACTOR, safety * max_factor)
+            h_abs *= factor
+            _change_D(D, order, factor)
+            n_equal_steps = 0
+            lu_valid = False
+
+        while ie < nout and t_eval[ie] <= t:
+            ys[ie, :] = _dense_output(t_eval[ie], t, h_abs, order, D)
+            ie += 1
+
+    return ys, 0, nsteps, nfev, njev, nlu
+
+
+@njit
+def _numpy_rate_factors(Y, rates, tabular, screen_func, screening):
+    """the value of each rate for the molar fractions Y, without the
+    Y factors of its reactants"""
+    rate_factor, ec, Zs, As, _, _ = rates
+    ye = np.sum(Zs * Y) / np.sum(As * Y)
+    factors = rate_factor.copy()
+    for r, is_ec in enumerate(ec):
+        if is_ec:
+            factors[r] *= ye
+
+    # the tabular rates are stored on their rhoY grid at the
+    # temperature of the integration
+    tab_rate, tab_ptr, tab_rhoy, tab_logf, rho = tabular
+    if len(tab_rate) > 0:
+        logrhoy = np.log10(rho * ye)
+        for k, r in enumerate(tab_rate):
+            grid = tab_rhoy[tab_ptr[k]:tab_ptr[k+1]]
+            if logrhoy < grid[0] or logrhoy > grid[-1]:
+                raise ValueError("rhoy out of table bounds")
+            i = max(0, min(len(grid) - 1, np.searchsorted(grid, logrhoy)) - 1)
+            f = tab_logf[tab_ptr[k]:tab_ptr[k+1]]
+            x = (logrhoy - grid[i]) / (grid[i+1] - grid[i])
+            factors[r] *= 10.0**(f[i] + x * (f[i+1] - f[i]))
+
+    if screen_func is not None:
+        scn_facs, pair_idx, rate_idx, starts, T = screening
+        state = PlasmaState(T, rho, Y, Zs)
+        for m, r in enumerate(rate_idx):
+            end = starts[m+1] if m + 1 < len(starts) else len(pair_idx)
+            for p in pair_idx[starts[m]:end]:
+                scn_fac = ScreenFactorsArray(scn_facs.z1[p], scn_facs.z2[p],
+                                             scn_facs.a1[p], scn_facs.a2[p],
+                                             scn_facs.zs13[p], scn_facs.zhat[p],
+                                             scn_facs.zhat2[p], scn_facs.lzav[p],
+                                             scn_facs.aznut[p], scn_facs.ztilde[p])
+                factors[r] *= screen_func(state, scn_fac)
+
+    return factors
+
+
+@njit
+def _numpy_rates(Y, rates, tabular, screen_func, screening):
+    """the value of each rate for the molar fractions Y"""
+    _, _, _, _, ridx, rexp = rates
+    rvals = _numpy_rate_factors(Y, rates, tabular, screen_func, screening)
+    for r, (idx, exps) in enumerate(zip(ridx, rexp)):
+        for k, e in zip(idx, exps):
+            rvals[r] *= Y[k] ** e
+    return rvals
+
+
+@njit
+def _numpy_rhs(t, Y, rates, stoich, jac_terms, tabular,  # pylint: disable=unused-argument
+               screen_func, screening):
+    """dY/dt for a NumpyNetwork at fixed density and temperature"""
+    rvals = _numpy_rates(Y, rates, tabular, screen_func, screening)
+    indptr, indices, data = stoich
+    n = len(Y)
+    dYdt = np.zeros(n)
+    for i in range(n):
+        for p in range(indptr[i], indptr[i+1]):
+            dYdt[i] += data[p] * rvals[indices[p]]
+    return dYdt
+
+
+@njit
+def _numpy_jacobian(t, Y, rates, stoich, jac_terms, tabular,  # pylint: disable=unused-argument
+                    screen_func, screening):
+    """the CSR data of the Jacobian for a NumpyNetwork at fixed
+    density and temperature (neglecting the composition dependence of
+    Ye in electron capture and tabular rates, and of the screening
+    factors)"""
+    term_rate, term_ycoeff, yidx, yexp, position, term_stoich, term, nnz = jac_terms
+    factors = _numpy_rate_factors(Y, rates, tabular, screen_func, screening)
+
+    nterms = len(term_rate)
+    dterm = np.empty(nterms)
+    for t_ in range(nterms):
+        val = factors[term_rate[t_]] * term_ycoeff[t_]
+        for m in range(yidx.shape[1]):
+            val *= Y[yidx[t_, m]] ** yexp[t_, m]
+        dterm[t_] = val
+
+    jac = np.zeros(nnz)
+    for k, pos in enumerate(position):
+        jac[pos] += term_stoich[k] * dterm[term[k]]
+    return jac
+
+
+def _numpy_network_system(network, rho, T, screen_func):
+    """set up the arguments of _numpy_rhs and _numpy_jacobian for a
+    NumpyNetwork at density rho and temperature T"""
+
+    # pylint: disable-next=protected-access
+    rt = network._get_rate_types()
+    if rt["custom"]:
+        raise ValueError("custom rates are not supported with a NumpyNetwork")
+
+    rate_factor = np.array([r.prefactor * rho**r.dens_exp for r in network.rates])
+    ec = np.array([r.weak_type == "electron_capture" and not isinstance(r, TabularRate)
+                   for r in network.rates], dtype=np.bool_)
+
+    # the temperature dependence of the rates is fixed -- for the
+    # tabular rates, only the dependence on rhoY remains, so we store
+    # each rate on its rhoY grid
+    # pylint: disable-next=protected-access
+    temp_factor = network._evaluate_temperature_arr(T)
+    tab_rate = []
+    tab_rhoy = []
+    tab_logf = []
+    for group in rt["tabular"]:
+        logf = group.interpolate_temperature(np.log10(T))
+        for k, i in enumerate(group.rate_indices):
+            temp_factor[i] = 1.0
+            tab_rate.append(i)
+            tab_rhoy.append(group.rhoy)
+            tab_logf.append(logf[k])
+    rate_factor *= temp_factor
+
+    tab_ptr = np.zeros(len(tab_rate)+1, dtype=np.int64)
+    tab_ptr[1:] = np.cumsum([len(grid) for grid in tab_rhoy])
+    tabular = (np.array(tab_rate, dtype=np.int64), tab_ptr,
+               np.concatenate(tab_rhoy + [np.empty(0)]).astype(np.float64),
+               np.concatenate(tab_logf + [np.empty(0)]).astype(np.float64),
+               float(rho))
+
+    # the screening pairs, grouped by the rate they apply to
+    # pylint: disable-next=protected-access
+    scn_facs, pair_idx, rate_idx, starts = network._get_screening_arrays()
+    screening = (scn_facs, pair_idx.astype(np.int64), rate_idx, starts.astype(np.int64),
+                 float(T))
+
+    Zs = np.array([n.Z for n in network.unique_nuclei], dtype=np.float64)
+    As = np.array([n.A for n in network.unique_nuclei], dtype=np.float64)
+
+    # pylint: disable-next=protected-access
+    smat = network._get_stoich_matrix()
+    # pylint: disable-next=protected-access
+    jstr = network._get_jacobian_structure()
+
+    rates = (rate_factor, ec, Zs, As, network.reactant_idx,
+             network.reactant_count.astype(np.float64))
+    stoich = (smat.indptr.astype(np.int64), smat.indices.astype(np.int64), smat.data)
+    jac_terms = (jstr["term_rate"], jstr["term_ycoeff"], jstr["yidx"], jstr["yexp"],
+                 jstr["position"], jstr["stoich"], jstr["term"], len(jstr["indices"]))
+
+    args = (rates, stoich, jac_terms, tabular, screen_func, screening)
+    return args, jstr["indptr"], jstr["indices"]
+
+
+def integrate_network(network, Y0, tmax, rho, T, screen_func=None, *,
+                      t_eval=None, rtol=1.e-6, atol=1.e-10, max_steps=100000):
+    """integrate a network at constant density and temperature with a
+    compiled, variable-order BDF method, from t = 0 to tmax.
+
+    network: a :class:`PythonNetwork` (which is compiled with
+    :meth:`PythonNetwork.compile`) or a :class:`NumpyNetwork`.  A
+    NumpyNetwork supports all of the rates that
+    :meth:`NumpyNetwork.evaluate_rates_arr` does except custom rates,
+    which are evaluated in python.
+
+    Y0: the initial molar fractions, ordered as network.unique_nuclei
+
+    tmax: the time to integrate to (s)
+
+    rho: the density (g/cm^3)
+
+    T: the temperature (K)
+
+    screen_func: (optional) a screening function, e.g.
+    :func:`pynucastro.screening.chugunov_2007`
+
+    t_eval: (optional) the increasing times in [0, tmax] at which
+    to store the solution.  By default, only the solution at tmax is
+    returned.
+
+    rtol, atol: the relative and absolute error tolerances
+
+    max_steps: the maximum number of steps to take
+
+    Returns an :class:`IntegrationResult`.  If the step size becomes
+    too small, or the matrix of the Newton iterations is singular,
+    the integration stops early, with success = False.
+    """
+
+    Y0 = np.asarray(Y0, dtype=np.float64)
+    if Y0.shape != (len(network.unique_nuclei),):
+        raise ValueError("Y0 must have one molar fraction per nucleus in unique_nuclei")
+
+    drop_tmax = False
+    if t_eval is None:
+        t_eval = np.array([tmax], dtype=np.float64)
+    else:
+        t_eval = np.asarray(t_eval, dtype=np.float64)
+        if t_eval.ndim != 1 or len(t_eval) == 0:
+            raise ValueError("t_eval must be a non-empty 1-d array")
+        if np.any(np.diff(t_eval) <= 0):
+            raise ValueError("t_eval must be strictly increasing")
+        if t_eval[0] < 0 or t_eval[-1] > tmax:
+            raise ValueError("t_eval must be within [0, tmax]")
+        if t_eval[-1] < tmax:
+            t_eval = np.append(t_eval, tmax)
+            drop_tmax = True
+    if t_eval[-1] <= 0:
+        raise ValueError("tmax must be positive")
+
+    if isinstance(network, PythonNetwork):
+        module = network.compile(sparse_jacobian=True)
+        fun = module.rhs_eq
+        jac = module.jacobian_eq
+        args = (rho, T, screen_func)
+        jac_indptr, jac_indices = module.jac_indptr, module.jac_indices
+    elif isinstance(network, NumpyNetwork):
+        fun = _numpy_rhs
+        jac = _numpy_jacobian
+        args, jac_indptr, jac_indices = _numpy_network_system(network, rho, T, screen_func)
+    else:
+        raise TypeError("network must be a PythonNetwork or a NumpyNetwork")
+
+    # the pattern of the LU decomposition depends only on the rates,
+    # so it is cached with the network
+    # pylint: disable-next=protected-access
+    if network._lu_pattern is None:
+        # pylint: disable-next=protected-access
+        network._lu_pattern = lu_pattern(np.asarray(jac_indptr, dtype=np.int64),
+                                         np.asarray(jac_indices, dtype=np.int64),
+                                         len(Y0))
+
+    ys, status, nsteps, nfev, njev, nlu = _bdf_integrate(
+        fun, jac, args, Y0, 0.0, t_eval, float(rtol), float(atol),
+        max_steps, *network._lu_pattern)  # pylint: disable=protected-access
+
+    if drop_tmax:
+        # we only integrated to tmax to get the full interval
+        ys = ys[:len(t_eval)-1]
+    return IntegrationResult(t=t_eval[:len(ys)], y=ys.T, success=status == 0,
+                             message=_MESSAGES[status], nsteps=nsteps,
+                             nfev=nfev, njev=njev, nlu=nlu)
@@ -0,0 +1,4 @@
+# reuse fixtures from networks/tests
+# pylint: disable=unused-import
+from pynucastro.networks.tests.conftest import reaclib_library  # noqa: F401
+from pynucastro.networks.tests.conftest import tabular_library  # noqa: F401
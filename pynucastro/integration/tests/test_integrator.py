@@ -0,0 +1,185 @@
+# unit tests for the BDF integrator
+import numpy as np
+import pytest
+from pytest import approx
+from scipy.integrate import solve_ivp
+
+import pynucastro as pyna
+from pynucastro.integration import integrate_network
+from pynucastro.integration.integrator import (_dense_lu_factor,
+                                               _dense_lu_solve, _factor_matrix,
+                                               _lu_factor, _lu_solve,
+                                               lu_pattern)
+from pynucastro.screening import chugunov_2007
+
+
+class TestIntegrator:
+    @pytest.fixture(scope="class")
+    def lib(self, reaclib_library):
+        return reaclib_library.linking_nuclei(["p", "he4", "c12", "c13",
+                                               "n13", "n14", "n15",
+                                               "o14", "o15", "o16", "o17",
+                                               "f17", "f18"])
+
+    @pytest.fixture(scope="class")
+    def pynet(self, lib):
+        return pyna.PythonNetwork(libraries=[lib])
+
+    @pytest.fixture(scope="class")
+    def numpynet(self, lib):
+        return pyna.NumpyNetwork(libraries=[lib])
+
+    @pytest.fixture(scope="class")
+    def Y0(self, pynet):
+        Y0 = np.full(len(pynet.unique_nuclei), 1.e-4)
+        Y0[pynet.unique_nuclei.index(pyna.Nucleus("p"))] = 0.7
+        Y0[pynet.unique_nuclei.index(pyna.Nucleus("he4"))] = 0.07
+        return Y0
+
+    def test_lu_pattern(self):
+        rng = np.random.default_rng(12345)
+        n = 12
+        A = np.where(rng.random((n, n)) < 0.2, rng.random((n, n)), 0.0)
+        A += np.diag(np.sum(np.abs(A), axis=1) + 1.0)
+
+        indptr = np.zeros(n+1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.count_nonzero(A, axis=1))
+        indices = np.nonzero(A)[1].astype(np.int64)
+        perm, fill_ptr, fill_idx, diag_pos, jac_to_fill = lu_pattern(indptr, indices, n)
+
+        lu = np.zeros(len(fill_idx))
+        lu[jac_to_fill] = A[np.nonzero(A)]
+        assert _lu_factor(lu, fill_ptr, fill_idx, diag_pos)
+        b = rng.random(n)
+        x = _lu_solve(lu, b, perm, fill_ptr, fill_idx, diag_pos)
+        assert x == approx(np.linalg.solve(A, b), rel=1.e-12)
+
+    def test_lu_pivoting(self):
+        # J has 1 on the diagonal, so I - J has a zero diagonal and
+        # its LU decomposition needs pivoting: the sparse factorization
+        # fails and the dense one is used instead
+        rng = np.random.default_rng(54321)
+        n = 10
+        J = np.where(rng.random((n, n)) < 0.2, rng.random((n, n)), 0.0)
+        J += np.eye(n)[::-1]
+        np.fill_diagonal(J, 1.0)
+        M = np.eye(n) - J
+
+        nz = np.nonzero(J)
+        indptr = np.zeros(n+1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.count_nonzero(J, axis=1))
+        indices = nz[1].astype(np.int64)
+        perm, fill_ptr, fill_idx, diag_pos, jac_to_fill = lu_pattern(indptr, indices, n)
+
+        lu = np.zeros(len(fill_idx))
+        lu[jac_to_fill] = M[nz]
+        assert not _lu_factor(lu, fill_ptr, fill_idx, diag_pos)
+
+        piv = np.zeros(n, dtype=np.int64)
+        W, dense, success = _factor_matrix(lu, np.zeros((0, 0)), piv, 1.0, J[nz],
+                                           jac_to_fill, fill_ptr, fill_idx, diag_pos)
+        assert dense and success
+        b = rng.random(n)
+        x = _dense_lu_solve(W, piv, b, perm)
+        assert x == approx(np.linalg.solve(M, b), rel=1.e-12)
+
+        # a singular matrix is detected
+        M[:, 3] = 0.0
+        lu[:] = 0.0
+        lu[jac_to_fill] = M[nz]
+        assert not _dense_lu_factor(W, lu, fill_ptr, fill_idx, piv)
+
+    def test_lu_pattern_ordering(self):
+        # an "arrow" matrix, with a dense first row and column, fills
+        # in completely if eliminated in the natural order, but not
+        # at all when the first row and column are eliminated last
+        n = 20
+        A = np.eye(n)
+        A[0, :] = 1.0
+        A[:, 0] = 1.0
+
+        indptr = np.zeros(n+1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.count_nonzero(A, axis=1))
+        indices = np.nonzero(A)[1].astype(np.int64)
+        _, _, fill_idx, _, _ = lu_pattern(indptr, indices, n)
+        assert len(fill_idx) == np.count_nonzero(A)
+
+    @pytest.mark.parametrize("screen_func", [None, chugunov_2007])
+    def test_python_network(self, pynet, Y0, screen_func):
+        rho = 1.e4
+        T = 3.e8
+        tmax = 1.e6
+        t_eval = [1.0, 100.0, 1.e4]
+
+        res = integrate_network(pynet, Y0, tmax, rho, T, screen_func,
+                                t_eval=t_eval, rtol=1.e-8, atol=1.e-14)
+        assert res.success
+        assert res.nsteps > 0
+        assert res.t == approx(t_eval)
+        assert res.y.shape == (len(Y0), len(t_eval))
+
+        app = pynet.compile(sparse_jacobian=True)
+        sol = solve_ivp(app.rhs, [0, tmax], Y0, method="BDF",
+                        jac=app.jacobian, args=(rho, T, screen_func),
+                        t_eval=t_eval, rtol=1.e-10, atol=1.e-16)
+        assert res.y == approx(sol.y, rel=1.e-5, abs=1.e-12)
+
+    @pytest.mark.parametrize("screen_func", [None, chugunov_2007])
+    def test_numpy_network(self, pynet, numpynet, Y0, screen_func):
+        rho = 1.e4
+        T = 3.e8
+        tmax = 1.e6
+
+        res = integrate_network(numpynet, Y0, tmax, rho, T, screen_func)
+        assert res.success
+        assert res.t == approx([tmax])
+
+        res_py = integrate_network(pynet, Y0, tmax, rho, T, screen_func)
+        assert res.y == approx(res_py.y, rel=1.e-10, abs=1.e-16)
+
+    def test_numpy_network_tabular(self, reaclib_library, tabular_library):
+        lib = reaclib_library.linking_nuclei(["p", "he4", "c12", "o16",
+                                              "ne20", "na23", "mg24"],
+                                             with_reverse=False)
+        tlib = tabular_library.linking_nuclei(["ne23", "na23", "mg23"])
+        numpynet = pyna.NumpyNetwork(libraries=[lib, tlib])
+        pynet = pyna.PythonNetwork(libraries=[lib, tlib])
+
+        rho = 1.e9
+        T = 1.2e9
+        tmax = 1.e3
+
+        Y0 = np.full(len(pynet.unique_nuclei), 1.e-3)
+        Y0[pynet.unique_nuclei.index(pyna.Nucleus("c12"))] = 0.5 / 12
+        Y0[pynet.unique_nuclei.index(pyna.Nucleus("o16"))] = 0.45 / 16
+
+        res = integrate_network(numpynet, Y0, tmax, rho, T, chugunov_2007)
+        assert res.success
+
+        res_py = integrate_network(pynet, Y0, tmax, rho, T, chugunov_2007)
+        assert res.y == approx(res_py.y, rel=1.e-8, abs=1.e-16)
+
+    def test_errors(self, pynet, tabular_library, Y0):
+        rho = 1.e4
+        T = 3.e8
+        tmax = 1.e6
+
+        res = integrate_network(pynet, Y0, tmax, rho, T, max_steps=2)
+        assert not res.success
+        assert res.nsteps == 2
+        assert res.y.shape == (len(Y0), 0)
+
+        with pytest.raises(ValueError):
+            integrate_network(pynet, Y0[:-1], tmax, rho, T)
+
+        with pytest.raises(ValueError):
+            integrate_network(pynet, Y0, tmax, rho, T, t_eval=[10.0, 1.0])
+
+        with pytest.raises(TypeError):
+            integrate_network(pyna.RateCollection(rates=pynet.get_rates()),
+                              Y0, tmax, rho, T)
+
+        # rhoY is below the range of the table
+        tnet = pyna.NumpyNetwork(rates=[tabular_library.get_rate_by_name("na23(,)ne23")])
+        with pytest.raises(ValueError):
+            integrate_network(tnet, [0.5, 0.5], tmax, rho, T)
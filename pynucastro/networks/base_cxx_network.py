@@ -19,7 +19,6 @@ import sympy
 from pynucastro.networks.rate_collection import RateCollection
 from pynucastro.networks.sympy_network_support import SympyRates
 from pynucastro.rates import DerivedRate
-from pynucastro.screening import get_screening_map
 
 
 class BaseCxxNetwork(ABC, RateCollection):
@@ -198,11 +197,7 @@ class BaseCxxNetwork(ABC, RateCollection):
         self.solved_jacobian = True
 
     def _compute_screening_factors(self, n_indent, of):
-        if not self.do_screening:
-            screening_map = []
-        else:
-            screening_map = get_screening_map(self.get_rates(),
-                                              symmetric_screening=self.symmetric_screening)
+        screening_map = self.get_screening_map()
         for i, scr in enumerate(screening_map):
 
             nuc1_info = f'{float(scr.n1.Z)}_rt, {float(scr.n1.A)}_rt'
@@ -1,15 +1,122 @@
-import warnings
+import heapq
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from operator import itemgetter
+from pathlib import Path
 
 import numpy as np
-from scipy.optimize import fsolve
 
 from pynucastro._version import version
 from pynucastro.constants import constants
 from pynucastro.networks.rate_collection import Composition, RateCollection
 from pynucastro.nucdata import Nucleus
 from pynucastro.rates import TabularRate
+from pynucastro.rates.rate import numba
 from pynucastro.screening import NseState, potekhin_1998
 
+if numba is not None:
+    njit = numba.njit
+else:
+    def njit(func):
+        return func
+
+
+@njit
+def _nse_potential(v, logc, Zs, Ns, ye):
+    """The NSE state minimizes the convex function
+
+    phi(v) = sum_i Y_i(v) - ye v_p - (1 - ye) v_n
+
+    where Y_i = exp(Z_i v_p + N_i v_n + logc_i) is the molar fraction
+    of nucleus i and v = (mu_p, mu_n) / kT, since the components of
+    its gradient are the charge and nucleon-number constraints.
+    Return phi, its gradient, and its Hessian."""
+
+    phi = -ye * v[0] - (1.0 - ye) * v[1]
+    grad = np.array([-ye, -(1.0 - ye)])
+    hess = np.zeros((2, 2))
+    for i, (Z, N) in enumerate(zip(Zs, Ns)):
+        Y = np.exp(Z * v[0] + N * v[1] + logc[i])
+        phi += Y
+        grad[0] += Z * Y
+        grad[1] += N * Y
+        hess[0, 0] += Z * Z * Y
+        hess[0, 1] += Z * N * Y
+        hess[1, 1] += N * N * Y
+    hess[1, 0] = hess[0, 1]
+    return phi, grad, hess
+
+
+@njit
+def _nse_solve(v, logc, Zs, Ns, ye, tol, max_iter):
+    """minimize the function of :func:`_nse_potential` with Newton's
+    method and a backtracking line search, starting from v.  Return
+    the solution, whether it converged, and the number of
+    iterations."""
+
+    # the exponent of each Y_i is at most 0 at the solution, and for
+    # the most abundant nuclei it is not far below that, so if the
+    # initial guess is far from this, shift both chemical potentials
+    # by the same amount (which changes the exponent of Y_i by A_i
+    # times that) to bring the largest exponent to 0
+    As = Zs + Ns
+    expo = Zs * v[0] + Ns * v[1] + logc
+    if np.max(expo) > 0.0 or np.max(expo) < -50.0:
+        v = v - np.max(expo / As)
+
+    phi, grad, hess = _nse_potential(v, logc, Zs, Ns, ye)
+    for it in range(max_iter):
+        # the Hessian is nearly singular if the nuclei that dominate
+        # it all have the same Z/A (e.g. N = Z nuclei when the proton
+        # and neutron abundances are tiny), so regularize it slightly
+        reg = 1.e-12 * (hess[0, 0] + hess[1, 1])
+        h00 = hess[0, 0] + reg
+        h11 = hess[1, 1] + reg
+        det = h00 * h11 - hess[0, 1] * hess[1, 0]
+        if not det > 0.0:
+            return v, False, it
+
+        dv = np.array([-(h11 * grad[0] - hess[0, 1] * grad[1]) / det,
+                       -(h00 * grad[1] - hess[1, 0] * grad[0]) / det])
+        if np.max(np.abs(dv)) <= tol * (np.max(np.abs(v)) + tol):
+            return v + dv, True, it + 1
+
+        # far from the solution, the Newton step can overshoot by
+        # many orders of magnitude, so limit it to keep all of the
+        # Y_i below e^50
+        expo = Zs * v[0] + Ns * v[1] + logc
+        dexpo = Zs * dv[0] + Ns * dv[1]
+        for e, de in zip(expo, dexpo):
+            if e < 50.0 < e + de:
+                dv *= (50.0 - e) / de
+                dexpo *= (50.0 - e) / de
+
+        slope = grad[0] * dv[0] + grad[1] * dv[1]
+        grad_norm = np.abs(grad[0]) + np.abs(grad[1])
+
+        # Armijo condition -- this also rejects steps where the
+        # exponentials overflow.  Close to the solution, the decrease
+        # in phi is lost to roundoff, so there we settle for a decrease
+        # in the gradient
+        t = 1.0
+        while True:
+            v_new = v + t * dv
+            phi_new, grad_new, hess_new = _nse_potential(v_new, logc, Zs, Ns, ye)
+            if phi_new <= phi + 1.e-4 * t * slope:
+                break
+            if (-slope <= 1.e-12 * np.abs(phi) and
+                    np.abs(grad_new[0]) + np.abs(grad_new[1]) < grad_norm):
+                break
+            t *= 0.5
+            if t < 1.e-12:
+                return v, False, it
+
+        v = v_new
+        phi, grad, hess = phi_new, grad_new, hess_new
+
+    return v, False, max_iter
+
 
 class NSETableEntry:
     def __init__(self, rho, T, Ye, *,
@@ -68,92 +175,96 @@ class NSETableEntry:
     def __lt__(self, other):
         return self.value() < other.value()
 
+    def table_row(self):
+        """the line for this entry in the NSE table"""
 
-class NSENetwork(RateCollection):
-    """a network for solving for the NSE composition and outputting
-    tabulated NSE quantities"""
-
-    def _evaluate_n_e(self, state, Xs):
-
-        n_e = 0.0
-        for nuc in self.unique_nuclei:
-            n_e += nuc.Z * state.dens * Xs[nuc] / (nuc.A * constants.m_u)
-
-        return n_e
-
-    def _evaluate_mu_c(self, n_e, state, use_coulomb_corr=True):
-        """ A helper equation that finds the mass fraction of each nuclide in NSE state,
-        u[0] is chemical potential of proton  while u[1] is chemical potential of neutron"""
-
-        # If there is proton included in network, upper limit of ye is 1
-        # And if neutron is included in network, lower limit of ye is 0.
-        # However, there are networks where either of them are included
-        # So here I add a general check to find the upper and lower limit of ye
-        # so the input doesn't go outside of the scope and the solver won't be able to converge if it did
-        ye_low = min(nuc.Z/nuc.A for nuc in self.unique_nuclei)
-        ye_max = max(nuc.Z/nuc.A for nuc in self.unique_nuclei)
-        assert state.ye >= ye_low and state.ye <= ye_max, "input electron fraction goes outside of scope for current network"
-
-        # u_c is the coulomb correction term for NSE
-        # Calculate the composition at NSE, equations found in appendix of Calder paper
-        u_c = {}
-
-        for nuc in set(list(self.unique_nuclei) + [Nucleus("p")]):
-            if use_coulomb_corr:
-                # These are three constants for calculating coulomb corrections of chemical energy, see Calders paper: iopscience 510709, appendix
-                A_1 = -0.9052
-                A_2 = 0.6322
-                A_3 = -0.5 * np.sqrt(3.0) - A_1 / np.sqrt(A_2)
-
-                Gamma = state.gamma_e_fac * n_e ** (1.0/3.0) * nuc.Z ** (5.0 / 3.0) / state.temp
-                u_c[nuc] = constants.erg2MeV * constants.k * state.temp * (A_1 * (np.sqrt(Gamma * (A_2 + Gamma)) - A_2 * np.log(np.sqrt(Gamma / A_2) +
-                                      np.sqrt(1.0 + Gamma / A_2))) + 2.0 * A_3 * (np.sqrt(Gamma) - np.arctan(np.sqrt(Gamma))))
-            else:
-                u_c[nuc] = 0.0
+        row = f"{np.log10(self.rho):15.10f} {np.log10(self.T):15.10f} {self.Ye:15.10f} "
+        row += f"{self.abar:15.10f} {self.bea:15.10f} {self.dYedt:15.8g} {self.dabardt:15.8g} {self.dbeadt:15.8g} {self.enu:15.8g} "
 
-        return u_c
+        if self.X:
+            for _, val in self.X:
+                row += f"{val:15.10g} "
 
-    def _nucleon_fraction_nse(self, u, u_c, state):
+        return row + "\n"
 
-        Xs = {}
-        up_c = u_c[Nucleus("p")]
 
-        for nuc in self.unique_nuclei:
-            if nuc.partition_function:
-                pf = nuc.partition_function.eval(state.temp)
-            else:
-                pf = 1.0
-
-            if not nuc.spin_states:
-                raise ValueError(f"The spin of {nuc} is not implemented for now.")
-
-            nse_exponent = (nuc.Z * u[0] + nuc.N * u[1] - u_c[nuc] + nuc.Z * up_c + nuc.nucbind * nuc.A) / (constants.k * state.temp * constants.erg2MeV)
-            nse_exponent = min(500.0, nse_exponent)
-
-            Xs[nuc] = constants.m_u * nuc.A_nuc * pf * nuc.spin_states / state.dens * (2.0 * np.pi * constants.m_u * nuc.A_nuc * constants.k * state.temp / constants.h**2) ** 1.5 \
-                    * np.exp(nse_exponent)
-
-        return Xs
-
-    def _constraint_eq(self, u, u_c, state):
-        """ Constraint Equations used to evaluate chemical potential for proton and neutron,
-        which is used when evaluating composition at NSE"""
-
-        # Don't use eval_ye() since it does automatic mass fraction normalization.
-        # However, we should force normalization through constraint eq1.
-
-        Xs = self._nucleon_fraction_nse(u, u_c, state)
-
-        eq1 = sum(Xs[nuc] for nuc in self.unique_nuclei) - 1.0
-        eq2 = sum(Xs[nuc] * nuc.Z / nuc.A for nuc in self.unique_nuclei) - state.ye
+class NSENetwork(RateCollection):
+    """a network for solving for the NSE composition and outputting
+    tabulated NSE quantities"""
 
-        return [eq1, eq2]
+    def _build_collection(self):
+        super()._build_collection()
+        self._nse_arrays = None
+
+    def _get_nse_arrays(self):
+        """the properties of the nuclei needed to find the NSE state,
+        as arrays ordered like unique_nuclei"""
+
+        if self._nse_arrays is None:
+            for nuc in self.unique_nuclei:
+                if not nuc.spin_states:
+                    raise ValueError(f"The spin of {nuc} is not implemented for now.")
+
+            self._nse_arrays = {"Z": np.array([nuc.Z for nuc in self.unique_nuclei], dtype=np.float64),
+                                "N": np.array([nuc.N for nuc in self.unique_nuclei], dtype=np.float64),
+                                "A": np.array([nuc.A for nuc in self.unique_nuclei], dtype=np.float64),
+                                "A_nuc": np.array([nuc.A_nuc for nuc in self.unique_nuclei]),
+                                "nucbind": np.array([nuc.nucbind for nuc in self.unique_nuclei]),
+                                "spin_states": np.array([nuc.spin_states for nuc in self.unique_nuclei],
+                                                        dtype=np.float64)}
+        return self._nse_arrays
+
+    @staticmethod
+    def _evaluate_mu_c(Zs, state, use_coulomb_corr=True):
+        """Return the Coulomb correction to the chemical potential
+        (in MeV) of nuclei with charges Zs, following the appendix
+        of Calder et al. 2007"""
+
+        if not use_coulomb_corr:
+            return np.zeros_like(Zs, dtype=np.float64)
+
+        # In NSE, sum_i Z_i X_i / A_i = ye, so the electron number
+        # density follows from the constraints
+        n_e = state.dens * state.ye / constants.m_u
+
+        # These are three constants for calculating coulomb corrections of chemical energy, see Calders paper: iopscience 510709, appendix
+        A_1 = -0.9052
+        A_2 = 0.6322
+        A_3 = -0.5 * np.sqrt(3.0) - A_1 / np.sqrt(A_2)
+
+        Gamma = state.gamma_e_fac * n_e ** (1.0/3.0) * np.asarray(Zs, dtype=np.float64) ** (5.0 / 3.0) / state.temp
+        return constants.erg2MeV * constants.k * state.temp * (A_1 * (np.sqrt(Gamma * (A_2 + Gamma)) - A_2 * np.log(np.sqrt(Gamma / A_2) +
+                               np.sqrt(1.0 + Gamma / A_2))) + 2.0 * A_3 * (np.sqrt(Gamma) - np.arctan(np.sqrt(Gamma))))
+
+    def _nse_prefactors(self, state):
+        """the factors multiplying exp((Z mu_p + N mu_n + ...) / kT)
+        in the NSE mass fraction of each nucleus"""
+
+        arr = self._get_nse_arrays()
+        pfs = np.array([nuc.partition_function.eval(state.temp) if nuc.partition_function else 1.0
+                        for nuc in self.unique_nuclei])
+
+        return constants.m_u * arr["A_nuc"] * pfs * arr["spin_states"] / state.dens * \
+            (2.0 * np.pi * constants.m_u * arr["A_nuc"] * constants.k * state.temp / constants.h**2) ** 1.5
+
+    def _nse_exponent_offsets(self, state, use_coulomb_corr):
+        """the part of the NSE exponent (in MeV) that does not depend
+        on the chemical potentials: -mu_c + Z mu_c(p) + B"""
+
+        arr = self._get_nse_arrays()
+        u_c = self._evaluate_mu_c(arr["Z"], state, use_coulomb_corr)
+        up_c = self._evaluate_mu_c(np.array([Nucleus("p").Z]), state, use_coulomb_corr)[0]
+        return -u_c + arr["Z"] * up_c + arr["nucbind"] * arr["A"]
 
     def get_comp_nse(self, rho, T, ye, init_guess=(-3.5, -15),
                      tol=1.0e-11, use_coulomb_corr=False, return_sol=False):
         """
-        Returns the NSE composition given density, temperature and prescribed electron fraction
-        using scipy.fsolve.
+        Returns the NSE composition given density, temperature and prescribed electron fraction.
+
+        The chemical potentials of the proton and neutron are found
+        with Newton's method, using the analytic Jacobian of the
+        constraint equations and a line search that makes the
+        iteration converge from any initial guess.
 
         Parameters:
         -------------------------------------
@@ -165,76 +276,61 @@ class NSENetwork(RateCollection):
 
         init_guess: optional, initial guess of chemical potential of proton and neutron, [mu_p, mu_n]
 
-        tol: optional, sets the tolerance of scipy.fsolve
+        tol: optional, the relative tolerance on the chemical potentials
 
         use_coulomb_corr: Whether to include coulomb correction terms
 
         return_sol: Whether to return the solution of the proton and neutron chemical potential.
         """
 
-        # From here we convert the init_guess list into a np.array object:
+        # If there is proton included in network, upper limit of ye is 1
+        # And if neutron is included in network, lower limit of ye is 0.
+        # However, there are networks where either of them are included
+        # So here I add a general check to find the upper and lower limit of ye
+        # so the input doesn't go outside of the scope and the solver won't be able to converge if it did
+        ye_low = min(nuc.Z/nuc.A for nuc in self.unique_nuclei)
+        ye_max = max(nuc.Z/nuc.A for nuc in self.unique_nuclei)
+        assert ye_low <= ye <= ye_max, "input electron fraction goes outside of scope for current network"
 
-        init_guess = np.array(init_guess)
         state = NseState(T, rho, ye)
+        arr = self._get_nse_arrays()
 
-        u_c = {}
-        for nuc in set(list(self.unique_nuclei) + [Nucleus("p")]):
-            u_c[nuc] = 0.0
-
-        Xs = {}
-
-        j = 0
-        is_pos_old = False
-        found_sol = False
-
-        # This nested loops should fine-tune the initial guess if fsolve is unable to find a solution
-        while j < 20:
-            i = 0
-            guess = init_guess.copy()
-            init_dx = 0.5
-
-            while i < 20:
-                # Filter out runtimewarnings from fsolve, here we check convergence by np.isclose
-                with warnings.catch_warnings():
-                    warnings.filterwarnings("ignore", category=RuntimeWarning)
-                    u = fsolve(self._constraint_eq, guess, args=(u_c, state), xtol=tol, maxfev=800)
-                Xs = self._nucleon_fraction_nse(u, u_c, state)
-                n_e = self._evaluate_n_e(state, Xs)
-                u_c = self._evaluate_mu_c(n_e, state, use_coulomb_corr)
+        kT = constants.k * state.temp * constants.erg2MeV
+        prefac = self._nse_prefactors(state)
+        offset = self._nse_exponent_offsets(state, use_coulomb_corr)
 
-                res = self._constraint_eq(u, u_c, state)
-                is_pos_new = all(k > 0 for k in res)
-                found_sol = np.all(np.isclose(res, [0.0, 0.0], rtol=1.0e-7, atol=1.0e-7))
+        # work with the molar fractions and the chemical potentials in units of kT
+        logc = np.log(prefac / arr["A"]) + offset / kT
+        v, converged, _ = _nse_solve(np.asarray(init_guess, dtype=np.float64) / kT,
+                                     logc, arr["Z"], arr["N"], state.ye, tol, 200)
+        u = v * kT
 
-                if found_sol:
-                    Xs = self._nucleon_fraction_nse(u, u_c, state)
-                    comp = Composition(self.unique_nuclei)
-                    comp.X = Xs
+        # evaluate the mass fractions exactly as the solver sees them,
+        # so the constraints hold to roundoff
+        Xs = arr["A"] * np.exp(np.minimum(500.0, arr["Z"] * v[0] + arr["N"] * v[1] + logc))
 
-                    if return_sol:
-                        return comp, u
+        res = [np.sum(Xs) - 1.0, np.sum(Xs * arr["Z"] / arr["A"]) - state.ye]
+        if not converged or not np.all(np.isclose(res, [0.0, 0.0], rtol=1.0e-7, atol=1.0e-7)):
+            raise ValueError("Unable to find a solution, try to adjust initial guess manually")
 
-                    return comp
+        comp = Composition(self.unique_nuclei)
+        comp.X = dict(zip(self.unique_nuclei, Xs))
 
-                if is_pos_old != is_pos_new:
-                    init_dx *= 0.8
+        if return_sol:
+            return comp, u
 
-                if is_pos_new:
-                    guess -= init_dx
-                else:
-                    guess += init_dx
+        return comp
 
-                is_pos_old = is_pos_new
-                i += 1
+    def _generate_table_rows(self, T_values, rho_values, Ye_values,
+                             comp_reduction_func=None, verbose=False):
+        """Solve for the NSE state on a block of the table grid.
 
-            j += 1
-            init_guess[0] -= 0.5
-
-        raise ValueError("Unable to find a solution, try to adjust initial guess manually")
-
-    def generate_table(self, rho_values=None, T_values=None, Ye_values=None,
-                       comp_reduction_func=None,
-                       verbose=False, outfile="nse.tbl"):
+        We start at the highest temperature and cache the proton and
+        neutron chemical potentials at each (rho, Ye) to use as the
+        initial guess for the next temperature.  This returns a list
+        of (sort key, table row) tuples and the names of the nuclei in
+        the reduced composition (or None).
+        """
 
         # initial guess
         mu_p0 = -3.5
@@ -244,7 +340,8 @@ class NSENetwork(RateCollection):
         mu_p = np.ones((len(rho_values), len(Ye_values)), dtype=np.float64) * mu_p0
         mu_n = np.ones((len(rho_values), len(Ye_values)), dtype=np.float64) * mu_n0
 
-        nse_states = []
+        rows = []
+        X_names = None
         for T in reversed(T_values):
             for irho, rho in enumerate(reversed(rho_values)):
                 for iye, ye in enumerate(reversed(Ye_values)):
@@ -265,39 +362,119 @@ class NSENetwork(RateCollection):
                     # get the dY/dt for just the weak rates
                     ydots = self.evaluate_ydots(rho, T, comp,
                                                 screen_func=potekhin_1998,
-                                                rate_filter=lambda r: isinstance(r, TabularRate))
+                                                rate_filter=_is_tabular_rate)
 
                     _, enu = self.evaluate_energy_generation(rho, T, comp,
                                                              screen_func=potekhin_1998,
                                                              return_enu=True)
 
-                    nse_states.append(NSETableEntry(rho, T, ye,
-                                                    comp=comp, ydots=ydots, enu=enu,
-                                                    comp_reduction_func=comp_reduction_func))
+                    entry = NSETableEntry(rho, T, ye,
+                                          comp=comp, ydots=ydots, enu=enu,
+                                          comp_reduction_func=comp_reduction_func)
                     if verbose:
-                        print(nse_states[-1])
+                        print(entry)
+
+                    if X_names is None and entry.X:
+                        X_names = [nuc for nuc, _ in entry.X]
+
+                    rows.append((entry.value(), entry.table_row()))
+
+        return rows, X_names
+
+    def _write_table_header(self, of, X_names):
+        """write the header of the NSE table, including the names of the
+        columns"""
+
+        of.write(f"# NSE table generated by pynucastro {version}\n")
+        of.write(f"# original NSENetwork had {len(self.unique_nuclei)} nuclei\n")
+        of.write("#\n")
+        of.write(f"# {'log10(rho)':^15} {'log10(T)':^15} {'Ye':^15} ")
+        of.write(f"{'Abar':^15} {'<B/A>':^15} {'dYe/dt':^15} {'dAbar/dt':^15} {'d<B/A>/dt':^15} {'e_nu':^15} ")
+
+        if X_names:
+            for nuc in X_names:
+                _tmp = f"X({nuc})"
+                of.write(f"{_tmp:^15} ")
+
+        of.write("\n")
+
+    def generate_table(self, rho_values=None, T_values=None, Ye_values=None,
+                       comp_reduction_func=None,
+                       verbose=False, outfile="nse.tbl", nprocs=1):
+        """Tabulate the NSE state on the grid of rho, T, and Ye and
+        write it to outfile, sorted by log10(rho), then log10(T), then
+        decreasing Ye.
+
+        Parameters:
+        -------------------------------------
+        rho_values, T_values, Ye_values: the table grid, each in increasing order
+
+        comp_reduction_func: optional, a function that takes the NSE
+        Composition and returns a list of (name, X) tuples to output
+        (see NSETableEntry)
+
+        verbose: whether to print each entry as it is computed
+
+        outfile: the name of the table file
+
+        nprocs: the number of processes to use.  For nprocs > 1, the
+        temperatures are split into nprocs contiguous slices that are
+        solved in a process pool, each starting from its highest
+        temperature.  The network and comp_reduction_func must then be
+        picklable.
+        """
+
+        if nprocs <= 1:
+            rows, X_names = self._generate_table_rows(T_values, rho_values, Ye_values,
+                                                      comp_reduction_func=comp_reduction_func,
+                                                      verbose=verbose)
+
+            with open(outfile, "w") as of:
+                self._write_table_header(of, X_names)
+                for _, row in sorted(rows, key=itemgetter(0)):
+                    of.write(row)
+            return
+
+        T_chunks = np.array_split(np.asarray(T_values), min(nprocs, len(T_values)))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            chunk_files = [Path(tmpdir) / f"chunk_{n:05d}.txt" for n in range(len(T_chunks))]
+
+            with ProcessPoolExecutor(max_workers=nprocs) as executor:
+                futures = [executor.submit(_write_table_chunk, self, T_chunk,
+                                           rho_values, Ye_values, comp_reduction_func,
+                                           verbose, chunk_file)
+                           for T_chunk, chunk_file in zip(T_chunks, chunk_files)]
+                X_names = [future.result() for future in futures][0]
+
+            # each chunk is already sorted, so merge them as we write
+            with ExitStack() as stack, open(outfile, "w") as of:
+                self._write_table_header(of, X_names)
+                chunks = [stack.enter_context(open(chunk_file)) for chunk_file in chunk_files]
+                for line in heapq.merge(*chunks, key=_chunk_line_key):
+                    of.write(line.partition(" ")[2])
+
+
+def _is_tabular_rate(r):
+    return isinstance(r, TabularRate)
+
 
-        with open(outfile, "w") as of:
+def _chunk_line_key(line):
+    return int(line.partition(" ")[0])
 
-            # write the header
-            of.write(f"# NSE table generated by pynucastro {version}\n")
-            of.write(f"# original NSENetwork had {len(self.unique_nuclei)} nuclei\n")
-            of.write("#\n")
-            of.write(f"# {'log10(rho)':^15} {'log10(T)':^15} {'Ye':^15} ")
-            of.write(f"{'Abar':^15} {'<B/A>':^15} {'dYe/dt':^15} {'dAbar/dt':^15} {'d<B/A>/dt':^15} {'e_nu':^15} ")
 
-            if nse_states[0].X:
-                for nuc, _ in nse_states[0].X:
-                    _tmp = f"X({nuc})"
-                    of.write(f"{_tmp:^15} ")
+def _write_table_chunk(net, T_values, rho_values, Ye_values,
+                       comp_reduction_func, verbose, chunk_file):
+    """solve a slice of the NSE table in a worker process and write
+    its rows, sorted and prefixed by their sort key, to chunk_file"""
 
-            of.write("\n")
+    # pylint: disable-next=protected-access
+    rows, X_names = net._generate_table_rows(T_values, rho_values, Ye_values,
+                                             comp_reduction_func=comp_reduction_func,
+                                             verbose=verbose)
 
-            for entry in sorted(nse_states):
-                of.write(f"{np.log10(entry.rho):15.10f} {np.log10(entry.T):15.10f} {entry.Ye:15.10f} ")
-                of.write(f"{entry.abar:15.10f} {entry.bea:15.10f} {entry.dYedt:15.8g} {entry.dabardt:15.8g} {entry.dbeadt:15.8g} {entry.enu:15.8g} ")
+    with open(chunk_file, "w") as cf:
+        for key, row in sorted(rows, key=itemgetter(0)):
+            cf.write(f"{key} {row}")
 
-                if entry.X:
-                    for _, val in entry.X:
-                        of.write(f"{val:15.10g} ")
-                of.write("\n")
+    return X_names
@@ -1,7 +1,116 @@
 import numpy as np
+from scipy import sparse
 
-from pynucastro.networks.rate_collection import RateCollection
-from pynucastro.rates import Tfactors
+from pynucastro.networks.rate_collection import Composition, RateCollection
+from pynucastro.rates import (ApproximateRate, DerivedRate, ReacLibRate,
+                              TableIndex, TabularRate)
+from pynucastro.rates.rate import _tfactors_array
+from pynucastro.screening import make_plasma_state_array, screen_all_pairs
+
+# the maximum number of elements in the temporary arrays used when
+# evaluating the rates for many states at once -- the states are
+# processed in chunks that respect this
+_MAX_CHUNK_ELEMENTS = 2**22
+
+
+def _tfactors_matrix(T):
+    """return the temperature factors multiplying the 7 Reaclib
+    coefficients for the 1-d array of temperatures T, with shape
+    (len(T), 7)"""
+
+    T9, T9i, T913i, T913, T953, lnT9 = _tfactors_array(T)
+    return np.stack([np.ones_like(T9), T9i, T913i, T913, T9, T953, lnT9], axis=-1)
+
+
+def _sum_sets(coef_arr, coef_mask, tfm):
+    """evaluate the sum over the sets of each rate for the
+    temperature factors tfm (from _tfactors_matrix), returning an
+    array of shape (len(tfm), number_of_rates)"""
+
+    return np.sum(np.exp(np.sum(coef_arr * tfm[:, None, None, :], axis=3)) * coef_mask, axis=2)
+
+
+def _coef_arrays(rates):
+    """return the Reaclib coefficient array and set mask for the
+    rates.  Rates that are not parameterized by Reaclib sets get rows
+    of zeros, with the mask False."""
+
+    N_sets = max((len(r.sets) for r in rates if isinstance(r, ReacLibRate)), default=1)
+
+    coef_arr = np.zeros((len(rates), N_sets, 7), dtype=np.float64)
+    coef_mask = np.zeros((len(rates), N_sets), dtype=np.bool_)
+
+    for i, r in enumerate(rates):
+        if not isinstance(r, ReacLibRate):
+            continue
+        for j, s in enumerate(r.sets):
+            coef_arr[i, j, :] = s.a
+            coef_mask[i, j] = True
+
+    return coef_arr, coef_mask
+
+
+class _TabularGroup:
+    """The tabular rates that share the same (rhoY, T) grid, with the
+    log of their rates stacked so they can be interpolated together.
+    This uses the same bilinear interpolation as
+    :class:`TableInterpolator <pynucastro.rates.rate.TableInterpolator>`."""
+
+    def __init__(self, rate_indices, rates):
+        interp = rates[0].interpolator
+        self.rate_indices = np.array(rate_indices, dtype=np.int64)
+        self.rhoy = interp.rhoy
+        self.temp = interp.temp
+        self.rhoy_min = interp.rhoy_min
+        self.rhoy_max = interp.rhoy_max
+        self.temp_min = interp.temp_min
+        self.temp_max = interp.temp_max
+        self.data = np.array([r.interpolator.data[:, TableIndex.RATE.value].reshape(len(self.rhoy), len(self.temp))
+                              for r in rates])
+
+    def interpolate(self, logrhoy, logT):
+        """return the log of the rates at the points (logrhoy, logT),
+        given as 1-d arrays, with shape (len(logT), number of rates)"""
+
+        if np.any(logT < self.temp_min) or np.any(logT > self.temp_max):
+            raise ValueError("temperature out of table bounds")
+
+        if np.any(logrhoy < self.rhoy_min) or np.any(logrhoy > self.rhoy_max):
+            raise ValueError("rhoy out of table bounds")
+
+        i = np.maximum(0, np.minimum(len(self.rhoy) - 1, np.searchsorted(self.rhoy, logrhoy)) - 1)
+        j = np.maximum(0, np.minimum(len(self.temp) - 1, np.searchsorted(self.temp, logT)) - 1)
+
+        dlogrho = self.rhoy[i+1] - self.rhoy[i]
+        dlogT = self.temp[j+1] - self.temp[j]
+
+        f_ij = self.data[:, i, j].T
+        f_ip1j = self.data[:, i+1, j].T
+        f_ijp1 = self.data[:, i, j+1].T
+        f_ip1jp1 = self.data[:, i+1, j+1].T
+
+        D = f_ij
+        C = (f_ijp1 - f_ij) / dlogT[:, None]
+        B = (f_ip1j - f_ij) / dlogrho[:, None]
+        A = (f_ip1jp1 - B * dlogrho[:, None] - C * dlogT[:, None] - D) / (dlogrho * dlogT)[:, None]
+
+        x = (logrhoy - self.rhoy[i])[:, None]
+        y = (logT - self.temp[j])[:, None]
+        return A * x * y + B * x + C * y + D
+
+    def interpolate_temperature(self, logT):
+        """return the log of the rates on the rhoY grid at the single
+        temperature logT, with shape (number of rates, len(rhoy)).
+        Since the interpolation is bilinear, interpolating these
+        linearly in log rhoY gives the same result as
+        :meth:`interpolate`."""
+
+        if logT < self.temp_min or logT > self.temp_max:
+            raise ValueError("temperature out of table bounds")
+
+        j = max(0, min(len(self.temp) - 1, np.searchsorted(self.temp, logT)) - 1)
+        y = (logT - self.temp[j]) / (self.temp[j+1] - self.temp[j])
+        return self.data[:, :, j] + y * (self.data[:, :, j+1] - self.data[:, :, j])
 
 
 class NumpyNetwork(RateCollection):
@@ -20,20 +129,46 @@ class NumpyNetwork(RateCollection):
        Boolean mask array determining how many sets to include in the final
        rate evaluation, with shape ``(number_of_rates, number_of_sets)``.
 
+    .. py:attribute:: nuc_prod_count_sparse
+
+       Sparse (CSR) matrix storing the count of each nucleus in rates
+       producing that nucleus, with shape ``(number_of_species,
+       number_of_rates)``.
+
+    .. py:attribute:: nuc_cons_count_sparse
+
+       Sparse (CSR) matrix storing the count of each nucleus in rates
+       consuming that nucleus, with shape ``(number_of_species,
+       number_of_rates)``.
+
+    .. py:attribute:: reactant_idx
+
+       Array storing the index of each distinct reactant of each rate,
+       with shape ``(number_of_rates, max_distinct_reactants)``.  Rates
+       with fewer reactants are padded with index 0.
+
+    .. py:attribute:: reactant_count
+
+       Array storing the number of times each reactant in
+       :attr:`.reactant_idx` appears in the rate (0 for the padding).
+
     .. py:attribute:: nuc_prod_count
 
-       Array storing the count of each nucleus in rates producing that nucleus,
-       with shape ``(number_of_species, number_of_rates)``.
+       Dense version of :attr:`.nuc_prod_count_sparse`.
 
     .. py:attribute:: nuc_cons_count
 
-       Array storing the count of each nucleus in rates consuming that nucleus,
-       with shape ``(number_of_species, number_of_rates)``.
+       Dense version of :attr:`.nuc_cons_count_sparse`.
 
     .. py:attribute:: nuc_used
 
        A boolean matrix of whether the nucleus is involved in the reaction
-       or not, with shape ``(number_of_species, number_of_rates)``.
+       or not, with shape ``(number_of_rates, number_of_species)``.
+
+    The vectorized evaluations only use the sparse matrices and the
+    reactant lists, so their cost scales with the number of rates
+    rather than with (number of species) x (number of rates).  The
+    dense matrices are only built if they are accessed.
 
     .. py:attribute:: yfac
 
@@ -50,6 +185,20 @@ class NumpyNetwork(RateCollection):
 
        Depends on composition and density.
 
+    The rates can be evaluated for many thermodynamic states at once:
+    :meth:`.update_yfac_arr` and :meth:`.update_prefac_arr` accept
+    sequences of compositions (and densities), and
+    :meth:`.evaluate_rates_arr` an array of temperatures, and these
+    are broadcast against each other.
+
+    Rates that are not described by Reaclib sets are also supported:
+    tabular rates are interpolated together (grouped by their table
+    grid), partition function corrections for :class:`DerivedRate`
+    are applied as a product over the nuclei with tabulated partition
+    functions, and :class:`ApproximateRate` are built from their
+    vectorized child rates.  Any other rate is evaluated with its own
+    ``eval()`` method.
+
     Methods
     -------
     """
@@ -61,66 +210,125 @@ class NumpyNetwork(RateCollection):
                          symmetric_screening, do_screening)
 
         # cached values for vectorized evaluation
+        self._nuc_prod_count_sparse = None
+        self._nuc_cons_count_sparse = None
+        self._reactant_idx = None
+        self._reactant_count = None
         self._nuc_prod_count = None
         self._nuc_cons_count = None
         self._nuc_used = None
         self._coef_arr = None
         self._coef_mask = None
+        self._rate_types = None
+        self._screening_arrays = None
         self.prefac = None
         self.yfac = None
 
+        # the state set by update_prefac_arr, needed for the tabular
+        # rates, screening, and custom rates, and the compositions
+        # given to update_yfac_arr, which must agree with it
+        self._rho = None
+        self._composition = None
+        self._yfac_composition = None
+
     def _build_collection(self):
         super()._build_collection()
         # clear the cached arrays after changing any of the rates
         self.clear_arrays()
 
+    @property
+    def nuc_prod_count_sparse(self):
+        if self._nuc_prod_count_sparse is None:
+            self._calc_count_matrices()
+        return self._nuc_prod_count_sparse
+
+    @property
+    def nuc_cons_count_sparse(self):
+        if self._nuc_cons_count_sparse is None:
+            self._calc_count_matrices()
+        return self._nuc_cons_count_sparse
+
+    @property
+    def reactant_idx(self):
+        if self._reactant_idx is None:
+            self._calc_count_matrices()
+        return self._reactant_idx
+
+    @property
+    def reactant_count(self):
+        if self._reactant_count is None:
+            self._calc_count_matrices()
+        return self._reactant_count
+
     @property
     def nuc_prod_count(self):
         if self._nuc_prod_count is None:
-            self._calc_count_matrices()
+            self._nuc_prod_count = self.nuc_prod_count_sparse.toarray()
         return self._nuc_prod_count
 
     @property
     def nuc_cons_count(self):
         if self._nuc_cons_count is None:
-            self._calc_count_matrices()
+            self._nuc_cons_count = self.nuc_cons_count_sparse.toarray()
         return self._nuc_cons_count
 
     @property
     def nuc_used(self):
         if self._nuc_used is None:
-            self._calc_count_matrices()
+            # Whether the nucleus is involved in the reaction or not
+            self._nuc_used = (self.nuc_prod_count_sparse +
+                              self.nuc_cons_count_sparse).T.toarray() > 0
         return self._nuc_used
 
     def _calc_count_matrices(self):
         """
-        Compute and store 3 count matrices that can be used for vectorized rate
-        calculations.
+        Compute and store the sparse count matrices and the per-rate
+        reactant lists that are used for vectorized rate calculations.
         """
 
-        # Rate -> index mapping
-        r_map = {}
-        for i, r in enumerate(self.rates):
-            r_map[r] = i
+        nuc_index = {n: i for i, n in enumerate(self.unique_nuclei)}
 
         N_species = len(self.unique_nuclei)
         N_rates = len(self.rates)
 
+        prod_rows = []
+        prod_cols = []
+        prod_vals = []
+        cons_rows = []
+        cons_cols = []
+        cons_vals = []
+        reactants = []
+
+        for irate, r in enumerate(self.rates):
+            for n in set(r.products):
+                prod_rows.append(nuc_index[n])
+                prod_cols.append(irate)
+                prod_vals.append(r.products.count(n))
+
+            rlist = [(nuc_index[n], r.reactants.count(n)) for n in sorted(set(r.reactants))]
+            for i, count in rlist:
+                cons_rows.append(i)
+                cons_cols.append(irate)
+                cons_vals.append(count)
+            reactants.append(rlist)
+
         # Counts for reactions producing nucleus
-        self._nuc_prod_count = np.zeros((N_species, N_rates), dtype=np.int32)
+        self._nuc_prod_count_sparse = sparse.csr_matrix(
+            (np.array(prod_vals, dtype=np.int32), (prod_rows, prod_cols)),
+            shape=(N_species, N_rates))
         # Counts for reactions consuming nucleus
-        self._nuc_cons_count = np.zeros((N_species, N_rates), dtype=np.int32)
-
-        for i, n in enumerate(self.unique_nuclei):
-
-            for r in self.nuclei_produced[n]:
-                self._nuc_prod_count[i, r_map[r]] = r.products.count(n)
-
-            for r in self.nuclei_consumed[n]:
-                self._nuc_cons_count[i, r_map[r]] = r.reactants.count(n)
-
-        # Whether the nucleus is involved in the reaction or not
-        self._nuc_used = np.logical_or(self._nuc_prod_count, self._nuc_cons_count).T
+        self._nuc_cons_count_sparse = sparse.csr_matrix(
+            (np.array(cons_vals, dtype=np.int32), (cons_rows, cons_cols)),
+            shape=(N_species, N_rates))
+
+        # the reactants of each rate, padded with Y[0]**0 = 1
+        max_reactants = max((len(rlist) for rlist in reactants), default=0)
+        self._reactant_idx = np.zeros((N_rates, max_reactants), dtype=np.int64)
+        self._reactant_count = np.zeros((N_rates, max_reactants), dtype=np.int32)
+        for irate, rlist in enumerate(reactants):
+            for m, (i, count) in enumerate(rlist):
+                self._reactant_idx[irate, m] = i
+                self._reactant_count[irate, m] = count
 
     @property
     def coef_arr(self):
@@ -140,118 +348,376 @@ class NumpyNetwork(RateCollection):
         """
 
         # coef arr can be precomputed if evaluate_rates_arr is called multiple times
-        N_sets = max(len(r.sets) for r in self.rates)
+        self._coef_arr, self._coef_mask = _coef_arrays(self.rates)
 
-        coef_arr = np.zeros((len(self.rates), N_sets, 7), dtype=np.float64)
-        coef_mask = np.zeros((len(self.rates), N_sets), dtype=np.bool_)
+    def _get_rate_types(self):
+        """build (once) the information needed to evaluate the rates
+        that are not simply the sum of their Reaclib sets"""
 
-        for i, r in enumerate(self.rates):
-            for j, s in enumerate(r.sets):
-                coef_arr[i, j, :] = s.a
-                coef_mask[i, j] = True
+        if self._rate_types is not None:
+            return self._rate_types
 
-        self._coef_arr = coef_arr
-        self._coef_mask = coef_mask
+        # the child rates of the approximate rates -- these are
+        # evaluated like the rates in the network
+        children = []
+        child_index = {}
+        approx = []
+        approx_idx = []
+        for i, r in enumerate(self.rates):
+            if not isinstance(r, ApproximateRate):
+                continue
+            if not r.is_reverse:
+                # r_ag + r_ap r_pg / (r_pg + r_pa)
+                names = ["A(a,g)B", "A(a,p)X", "X(p,g)B", "X(p,g)B", "X(p,a)A"]
+            else:
+                # r_ga + r_pa r_gp / (r_pg + r_pa)
+                names = ["B(g,a)A", "X(p,a)A", "B(g,p)X", "X(p,g)B", "X(p,a)A"]
+            idx = []
+            for name in names:
+                c = r.rates[name]
+                if c not in child_index:
+                    child_index[c] = len(children)
+                    children.append(c)
+                idx.append(child_index[c])
+            approx.append(i)
+            approx_idx.append(idx)
+
+        # partition function corrections: the log of the correction
+        # to each rate is pf_exp @ log(pf) over the nuclei in pf_nuclei
+        pf_nuclei = []
+        for r in self.rates + children:
+            if isinstance(r, DerivedRate) and r.use_pf:
+                for n in r.rate.reactants + r.rate.products:
+                    if n.partition_function and n not in pf_nuclei:
+                        pf_nuclei.append(n)
+
+        def _pf_exp(rates):
+            pf_exp = np.zeros((len(rates), len(pf_nuclei)), dtype=np.float64)
+            for i, r in enumerate(rates):
+                if not (isinstance(r, DerivedRate) and r.use_pf):
+                    continue
+                for n in r.rate.reactants:
+                    if n.partition_function:
+                        pf_exp[i, pf_nuclei.index(n)] += 1.0
+                for n in r.rate.products:
+                    if n.partition_function:
+                        pf_exp[i, pf_nuclei.index(n)] -= 1.0
+            return pf_exp
+
+        # group the tabular rates by their grid
+        groups = {}
+        for i, r in enumerate(self.rates):
+            if isinstance(r, TabularRate):
+                key = (r.interpolator.rhoy.tobytes(), r.interpolator.temp.tobytes())
+                groups.setdefault(key, []).append(i)
+        tabular = [_TabularGroup(idx, [self.rates[i] for i in idx])
+                   for idx in groups.values()]
+
+        custom = [i for i, r in enumerate(self.rates)
+                  if not isinstance(r, (ReacLibRate, TabularRate, ApproximateRate))]
+        custom_children = [i for i, c in enumerate(children)
+                           if not isinstance(c, ReacLibRate)]
+
+        child_coef_arr, child_coef_mask = _coef_arrays(children)
+
+        self._rate_types = {"children": children,
+                            "child_coef_arr": child_coef_arr,
+                            "child_coef_mask": child_coef_mask,
+                            "approx": np.array(approx, dtype=np.int64),
+                            "approx_idx": np.array(approx_idx, dtype=np.int64).reshape(-1, 5),
+                            "pf_nuclei": pf_nuclei,
+                            "pf_exp": _pf_exp(self.rates),
+                            "child_pf_exp": _pf_exp(children),
+                            "tabular": tabular,
+                            "custom": custom,
+                            "custom_children": custom_children}
+        return self._rate_types
+
+    def _get_screening_arrays(self):
+        """return the :class:`ScreenFactorsArray` cached by
+        :meth:`get_screening_pairs`, and which rates in the network
+        each pair applies to.  The pairs are grouped by rate: the
+        factors of pairs[starts[j]:starts[j+1]] multiply the rate
+        rate_idx[j] (3-alpha gets the product of two pairs)."""
+
+        scn_facs, pair_idx, pair_rates = self.get_screening_pairs()
+        if self._screening_arrays is not None and self._screening_arrays[0] is scn_facs:
+            return self._screening_arrays
+
+        rate_index = {r: i for i, r in enumerate(self.rates)}
+        # the child rates of approximate rates are not in the
+        # network -- RateCollection.evaluate_rates does not screen
+        # them either
+        keep = [k for k, r in enumerate(pair_rates) if r in rate_index]
+        rate_idx = np.array([rate_index[pair_rates[k]] for k in keep], dtype=np.int64)
+        order = np.argsort(rate_idx, kind="stable")
+        rate_idx, starts = np.unique(rate_idx[order], return_index=True)
+        self._screening_arrays = (scn_facs, pair_idx[keep][order], rate_idx, starts)
+        return self._screening_arrays
+
+    def _state_compositions(self, nstates):
+        """return the :class:`Composition` of each of the nstates
+        states, checking that :meth:`.update_yfac_arr` and
+        :meth:`.update_prefac_arr` were given the same ones"""
+
+        compositions = self._composition
+        if len(compositions) == 1:
+            compositions = compositions * nstates
+
+        yfac_compositions = self._yfac_composition
+        if yfac_compositions is not None:
+            if len(yfac_compositions) == 1:
+                yfac_compositions = yfac_compositions * nstates
+            for c, yc in zip(compositions, yfac_compositions):
+                if c is not yc and c.X != yc.X:
+                    raise ValueError("update_yfac_arr and update_prefac_arr were given different compositions")
+
+        return compositions
 
     def update_yfac_arr(self, composition):
         """
         Calculate and store molar fraction component of each rate (Y of each
         reactant raised to the appropriate power). The results are stored in
         the :attr:`.yfac` array.
+
+        composition can be a :class:`Composition` or a sequence of them, in
+        which case :attr:`.yfac` has shape ``(len(composition),
+        number_of_rates)``.
         """
 
         # yfac must be evaluated each time composition changes, probably pretty cheap
-        yfac = np.ones((len(self.rates), len(self.unique_nuclei)), dtype=np.float64)
-        ys = np.array(list(composition.get_molar().values()), dtype=np.float64)
+        if isinstance(composition, Composition):
+            ys = np.array(list(composition.get_molar().values()), dtype=np.float64)
+            self._yfac_composition = [composition]
+        else:
+            ys = np.array([list(c.get_molar().values()) for c in composition], dtype=np.float64)
+            self._yfac_composition = list(composition)
 
-        yfac *= ys**self.nuc_cons_count.T
-        yfac = np.prod(yfac, axis=1)
-        self.yfac = yfac
+        self.yfac = np.prod(ys[..., self.reactant_idx]**self.reactant_count, axis=-1)
 
     def update_prefac_arr(self, rho, composition):
         """
         Calculate and store rate prefactors, which include both statistical
         prefactors and mass density raised to the corresponding density
         exponents. The results are stored in the :attr:`.prefac` array.
+
+        rho can be an array and composition a sequence of
+        :class:`Composition` objects, which are broadcast against each
+        other, in which case :attr:`.prefac` has shape ``(number_of_states,
+        number_of_rates)``.
         """
 
-        y_e = composition.eval_ye()
-        prefac = np.zeros(len(self.rates))
-        for i, r in enumerate(self.rates):
-            if r.label == "tabular":
-                raise ValueError('Tabular rates are not supported in vectorized rate calculations.')
-            prefac[i] = r.prefactor * rho**r.dens_exp
-            if r.weak_type == 'electron_capture':
-                prefac[i] *= y_e
+        batched = np.ndim(rho) > 0 or not isinstance(composition, Composition)
+
+        compositions = [composition] if isinstance(composition, Composition) else list(composition)
+        y_e = np.array([c.eval_ye() for c in compositions])
+        rho_arr, y_e = np.broadcast_arrays(np.atleast_1d(np.asarray(rho, dtype=np.float64)), y_e)
+        if rho_arr.ndim != 1:
+            raise ValueError("rho and composition must describe a 1-d list of states")
 
-        self.prefac = prefac
+        dens_exp = np.array([r.dens_exp for r in self.rates], dtype=np.float64)
+        rate_prefactor = np.array([r.prefactor for r in self.rates], dtype=np.float64)
+        ec = np.array([r.weak_type == 'electron_capture' and not isinstance(r, TabularRate)
+                       for r in self.rates])
 
-    def evaluate_rates_arr(self, T):
+        prefac = rate_prefactor * rho_arr[:, None]**dens_exp
+        prefac[:, ec] *= y_e[:, None]
+
+        self.prefac = prefac if batched else prefac[0]
+
+        # the tabular rates, screening, and custom rates need the
+        # state itself
+        self._rho = rho_arr
+        self._composition = compositions
+
+    def _evaluate_temperature_arr(self, T):
+        """evaluate the part of each rate that depends only on
+        temperature: the Reaclib rates (with any partition function
+        corrections) and the approximate rates.  The entries for
+        tabular and custom rates are zero.
+
+        T can be a scalar or a 1-d array, in which case the result has
+        shape (len(T), number_of_rates)."""
+
+        rt = self._get_rate_types()
+
+        scalar = np.ndim(T) == 0
+        T = np.atleast_1d(np.asarray(T, dtype=np.float64))
+
+        # the temperature factors only need to be evaluated when T changes
+        tfm = _tfactors_matrix(T)
+
+        rvals = _sum_sets(self.coef_arr, self.coef_mask, tfm)
+
+        log_pf = None
+        if rt["pf_nuclei"]:
+            log_pf = np.log([n.partition_function.eval(T) for n in rt["pf_nuclei"]])
+            rvals *= np.exp(log_pf.T @ rt["pf_exp"].T)
+
+        if rt["children"]:
+            cvals = _sum_sets(rt["child_coef_arr"], rt["child_coef_mask"], tfm)
+            if log_pf is not None:
+                cvals *= np.exp(log_pf.T @ rt["child_pf_exp"].T)
+            for i in rt["custom_children"]:
+                cvals[:, i] = [rt["children"][i].eval(T0) for T0 in T]
+
+            x = cvals[:, rt["approx_idx"]]
+            rvals[:, rt["approx"]] = x[..., 0] + x[..., 1] * x[..., 2] / (x[..., 3] + x[..., 4])
+
+        if scalar:
+            return rvals[0]
+        return rvals
+
+    def evaluate_rates_arr(self, T, screen_func=None):
         """
         Evaluate the rates in the network for a specific temperature, assuming
         necessary precalculations have been carried out (calling the methods
         :meth:`.update_yfac_arr` and :meth:`.update_prefac_arr` to set the
         composition and density).
 
+        screen_func: (optional) a screening function to apply to the rates,
+        using the density and composition passed to :meth:`.update_prefac_arr`
+
         This performs a vectorized calculation, and returns an array ordered by
-        the rates in the ``rates`` member variable. This does not support
-        tabular rates.
+        the rates in the ``rates`` member variable.
+
+        T can also be a 1-d array of temperatures.  If T, :attr:`.yfac`,
+        or :attr:`.prefac` describe more than one state, they are broadcast
+        against each other, and the result has shape ``(number_of_states,
+        number_of_rates)``.  The states are evaluated in chunks to bound
+        the size of the temporary arrays.
 
         See :meth:`.evaluate_rates` for the non-vectorized version. Relative
         performance between the two varies based on the setup. See
         :meth:`clear_arrays` for freeing memory post calculation.
         """
 
-        # T9 arr only needs to be evaluated when T changes
-        T9_arr = Tfactors(T).array[None, None, :]
-
-        rvals = self.prefac*self.yfac*np.sum(np.exp(np.sum(self.coef_arr*T9_arr, axis=2))*self.coef_mask, axis=1)
-
-        return rvals
-
-    def evaluate_ydots_arr(self, T):
+        if self.prefac is None or self.yfac is None:
+            raise ValueError("update_yfac_arr and update_prefac_arr must be called first")
+
+        batched = np.ndim(T) > 0 or self.prefac.ndim > 1 or self.yfac.ndim > 1
+
+        T = np.atleast_1d(np.asarray(T, dtype=np.float64))
+        prefac = np.atleast_2d(self.prefac)
+        yfac = np.atleast_2d(self.yfac)
+        nstates = np.broadcast_shapes(T.shape, prefac.shape[:1], yfac.shape[:1])
+        if len(nstates) != 1:
+            raise ValueError("T, yfac, and prefac must describe a 1-d list of states")
+        nstates = nstates[0]
+
+        T = np.broadcast_to(T, (nstates,))
+        prefac = np.broadcast_to(prefac, (nstates, len(self.rates)))
+        yfac = np.broadcast_to(yfac, (nstates, len(self.rates)))
+        rho = np.broadcast_to(self._rho, (nstates,))
+
+        # the properties of each distinct composition, and which one
+        # each state uses
+        compositions = self._state_compositions(nstates)
+        unique = {}
+        comp_idx = np.array([unique.setdefault(id(c), len(unique)) for c in compositions],
+                            dtype=np.int64)
+        unique_comps = list({id(c): c for c in compositions}.values())
+
+        rt = self._get_rate_types()
+
+        y_e = None
+        if rt["tabular"]:
+            y_e = np.array([c.eval_ye() for c in unique_comps])
+
+        screening = None
+        state_size = self.coef_arr.size
+        if screen_func is not None:
+            scn_facs, pair_idx, rate_idx, starts = self._get_screening_arrays()
+            if len(rate_idx) > 0:
+                molar = [c.get_molar() for c in unique_comps]
+                nuclei = list(dict.fromkeys(n for ys in molar for n in ys))
+                Ys = np.array([[ys.get(n, 0.0) for n in nuclei] for ys in molar])
+                screening = (scn_facs, pair_idx, rate_idx, starts, Ys, [n.Z for n in nuclei])
+                state_size = max(state_size, len(scn_facs.z1))
+
+        # evaluate the states in chunks, so the temporary arrays stay
+        # bounded in size
+        rvals = np.empty((nstates, len(self.rates)), dtype=np.float64)
+        chunk = max(1, _MAX_CHUNK_ELEMENTS // state_size)
+
+        for start in range(0, nstates, chunk):
+            sl = slice(start, start + chunk)
+            rv = rvals[sl]
+            rv[:] = self._evaluate_temperature_arr(T[sl])
+
+            if rt["tabular"]:
+                logrhoy = np.log10(rho[sl] * y_e[comp_idx[sl]])
+                logT = np.log10(T[sl])
+                for group in rt["tabular"]:
+                    rv[:, group.rate_indices] = 10.0**group.interpolate(logrhoy, logT)
+
+            for i in rt["custom"]:
+                rv[:, i] = [self.rates[i].eval(T[k], rho=rho[k], comp=compositions[k])
+                            for k in range(sl.start, min(sl.stop, nstates))]
+
+            rv *= prefac[sl]
+            rv *= yfac[sl]
+
+            if screening is not None:
+                scn_facs, pair_idx, rate_idx, starts, Ys, Zs = screening
+                states = make_plasma_state_array(T[sl], rho[sl],
+                                                 Ys if len(Ys) == 1 else Ys[comp_idx[sl]], Zs)
+                scor = screen_all_pairs(screen_func, states, scn_facs)
+                rv[:, rate_idx] *= np.multiply.reduceat(scor[:, pair_idx], starts, axis=1)
+
+        if batched:
+            return rvals
+        return rvals[0]
+
+    def evaluate_ydots_arr(self, T, screen_func=None):
         """
         Evaluate net rate of change of molar abundance for each nucleus in the
         network for a specific temperature, assuming necessary precalculations
         have been carried out (calling the methods :meth:`.update_yfac_arr` and
         :meth:`.update_prefac_arr` to set the composition and density).
 
+        screen_func: (optional) a screening function to apply to the rates
+
         This performs a vectorized calculation, and returns an array ordered by
-        the nuclei in the ``unique_nuclei`` member variable. This does not
-        support tabular rates.
+        the nuclei in the ``unique_nuclei`` member variable.  For many states
+        (see :meth:`.evaluate_rates_arr`), this has shape ``(number_of_states,
+        number_of_species)``.
 
         See :meth:`.evaluate_ydots` for the non-vectorized version. Relative
         performance between the two varies based on the setup. See
         :meth:`.clear_arrays` for freeing memory post calculation.
         """
 
-        rvals_arr = self.evaluate_rates_arr(T)
+        rvals_arr = self.evaluate_rates_arr(T, screen_func)
 
-        p_A = np.sum(self.nuc_prod_count*rvals_arr, axis=1)
-        c_A = np.sum(self.nuc_cons_count*rvals_arr, axis=1)
+        p_A = (self.nuc_prod_count_sparse @ rvals_arr.T).T
+        c_A = (self.nuc_cons_count_sparse @ rvals_arr.T).T
 
         return p_A - c_A
 
-    def evaluate_activity_arr(self, T):
+    def evaluate_activity_arr(self, T, screen_func=None):
         """
         Sum over all of the terms contributing to dY/dt for a specific
         temperature, neglecting sign, assuming necessary precalculations have
         been carried out (calling the methods :meth:`.update_yfac_arr` and
         :meth:`.update_prefac_arr` to set the composition and density).
 
+        screen_func: (optional) a screening function to apply to the rates
+
         This performs a vectorized calculation, and returns an array ordered by
-        the nuclei in the ``unique_nuclei`` member variable. This does not
-        support tabular rates.
+        the nuclei in the ``unique_nuclei`` member variable.  For many states
+        (see :meth:`.evaluate_rates_arr`), this has shape ``(number_of_states,
+        number_of_species)``.
 
         See :meth:`.evaluate_activity` for the non-vectorized version. Relative
         performance between the two varies based on the setup. See
         :meth:`.clear_arrays` for freeing memory post calculation.
         """
 
-        rvals_arr = self.evaluate_rates_arr(T)
+        rvals_arr = self.evaluate_rates_arr(T, screen_func)
 
-        p_A = np.sum(self.nuc_prod_count*rvals_arr, axis=1)
-        c_A = np.sum(self.nuc_cons_count*rvals_arr, axis=1)
+        p_A = (self.nuc_prod_count_sparse @ rvals_arr.T).T
+        c_A = (self.nuc_cons_count_sparse @ rvals_arr.T).T
 
         return p_A + c_A
 
@@ -260,10 +726,19 @@ class NumpyNetwork(RateCollection):
         Clear all cached arrays stored by the :meth:`.update_yfac_arr` and
         :meth:`.update_prefac_arr` member functions, freeing up memory.
         """
+        self._nuc_prod_count_sparse = None
+        self._nuc_cons_count_sparse = None
+        self._reactant_idx = None
+        self._reactant_count = None
         self._nuc_prod_count = None
         self._nuc_cons_count = None
         self._nuc_used = None
         self._coef_arr = None
         self._coef_mask = None
+        self._rate_types = None
+        self._screening_arrays = None
         self.prefac = None
         self.yfac = None
+        self._rho = None
+        self._composition = None
+        self._yfac_composition = None
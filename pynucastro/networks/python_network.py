@@ -1,50 +1,69 @@
 """Support modules to write a pure python reaction network ODE
 source"""
 
+import collections
+import hashlib
+import inspect
+import io
+import linecache
 import shutil
 import sys
+import types
 import warnings
 from pathlib import Path
 
 from pynucastro.constants import constants
 from pynucastro.networks.rate_collection import RateCollection
 from pynucastro.rates import ApproximateRate
-from pynucastro.screening import get_screening_map
+
+# the networks most recently compiled in this process, keyed by the
+# hash of the generated source.  Only the last _MAX_COMPILED_NETWORKS
+# are kept, so pipelines that build many networks don't hold on to all
+# of them (and their numba code)
+_MAX_COMPILED_NETWORKS = 16
+_compiled_networks = collections.OrderedDict()
 
 
 class PythonNetwork(RateCollection):
     """A pure python reaction network."""
 
-    def full_ydot_string(self, nucleus, indent=""):
-        """construct the python form of dY(nucleus)/dt"""
+    def full_ydot_string(self, nucleus, indent="", *, dT=False):
+        """construct the python form of dY(nucleus)/dt, or of its
+        temperature derivative, stored in dYdt_dT, if dT is True"""
+
+        target = "dYdt_dT" if dT else "dYdt"
 
         ostr = ""
         if not self.nuclei_consumed[nucleus] + self.nuclei_produced[nucleus]:
             # this captures an inert nucleus
-            ostr += f"{indent}dYdt[j{nucleus.raw}] = 0.0\n\n"
+            ostr += f"{indent}{target}[j{nucleus.raw}] = 0.0\n\n"
         else:
-            ostr += f"{indent}dYdt[j{nucleus.raw}] = (\n"
+            ostr += f"{indent}{target}[j{nucleus.raw}] = (\n"
             for r in self.nuclei_consumed[nucleus]:
                 c = r.reactants.count(nucleus)
                 if c == 1:
-                    ostr += f"{indent}   -{r.ydot_string_py()}\n"
+                    ostr += f"{indent}   -{r.ydot_string_py(dT=dT)}\n"
                 else:
-                    ostr += f"{indent}   -{c}*{r.ydot_string_py()}\n"
+                    ostr += f"{indent}   -{c}*{r.ydot_string_py(dT=dT)}\n"
             for r in self.nuclei_produced[nucleus]:
                 c = r.products.count(nucleus)
                 if c == 1:
-                    ostr += f"{indent}   +{r.ydot_string_py()}\n"
+                    ostr += f"{indent}   +{r.ydot_string_py(dT=dT)}\n"
                 else:
-                    ostr += f"{indent}   +{c}*{r.ydot_string_py()}\n"
+                    ostr += f"{indent}   +{c}*{r.ydot_string_py(dT=dT)}\n"
             ostr += f"{indent}   )\n\n"
 
         return ostr
 
-    def full_jacobian_element_string(self, ydot_i_nucleus, y_j_nucleus, indent=""):
-        """return the Jacobian element dYdot(ydot_i_nucleus)/dY(y_j_nucleus)"""
+    def full_jacobian_element_string(self, ydot_i_nucleus, y_j_nucleus, indent="",
+                                     *, idx_str=None):
+        """return the Jacobian element dYdot(ydot_i_nucleus)/dY(y_j_nucleus).
+        By default this is stored in jac[i, j], but a different
+        target can be given with idx_str"""
 
         # this is the jac(i,j) string
-        idx_str = f"jac[j{ydot_i_nucleus.raw}, j{y_j_nucleus.raw}]"
+        if idx_str is None:
+            idx_str = f"jac[j{ydot_i_nucleus.raw}, j{y_j_nucleus.raw}]"
 
         ostr = ""
         if not self.nuclei_consumed[ydot_i_nucleus] + self.nuclei_produced[ydot_i_nucleus]:
@@ -85,21 +104,33 @@ class PythonNetwork(RateCollection):
 
         return ostr
 
-    def screening_string(self, indent=""):
+    def screening_string(self, indent="", *, screen_by_id=False, with_dT=False):
+        """section applying the screening factors to the rates.  If
+        screen_by_id is True, the screening function is selected by
+        an integer (see :meth:`screen_select_string`) instead of being
+        passed in.  If with_dT is True, the temperature derivatives of
+        the rates (rate_eval.{fname}_dT) are screened as well, and the
+        screening function (screen_func_dT) is one that also returns
+        the temperature derivative of the screening factor (see
+        :func:`pynucastro.screening.screen_func_with_dT`)."""
+        if screen_by_id:
+            screen_call = "screen_with_dT(screen_id, " if with_dT else "screen(screen_id, "
+        else:
+            screen_call = "screen_func_dT(" if with_dT else "screen_func("
+
         ostr = ""
         ostr += f"{indent}plasma_state = PlasmaState(T, rho, Y, Z)\n"
 
-        if not self.do_screening:
-            screening_map = []
-        else:
-            screening_map = get_screening_map(self.get_rates(),
-                                              symmetric_screening=self.symmetric_screening)
+        screening_map = self.get_screening_map()
 
         for i, scr in enumerate(screening_map):
             if not (scr.n1.dummy or scr.n2.dummy):
                 # calculate the screening factor
                 ostr += f"\n{indent}scn_fac = ScreenFactors({scr.n1.Z}, {scr.n1.A}, {scr.n2.Z}, {scr.n2.A})\n"
-                ostr += f"{indent}scor = screen_func(plasma_state, scn_fac)\n"
+                if with_dT:
+                    ostr += f"{indent}scor, dscor_dT = {screen_call}plasma_state, scn_fac)\n"
+                else:
+                    ostr += f"{indent}scor = {screen_call}plasma_state, scn_fac)\n"
 
             if scr.name == "He4_He4_He4":
                 # we don't need to do anything here, but we want to avoid immediately applying the screening
@@ -110,13 +141,19 @@ class PythonNetwork(RateCollection):
                 assert screening_map[i - 1].name == "He4_He4_He4"
                 # handle the second part of the screening for 3-alpha
                 ostr += f"{indent}scn_fac2 = ScreenFactors({scr.n1.Z}, {scr.n1.A}, {scr.n2.Z}, {scr.n2.A})\n"
-                ostr += f"{indent}scor2 = screen_func(plasma_state, scn_fac2)\n"
+                if with_dT:
+                    ostr += f"{indent}scor2, dscor2_dT = {screen_call}plasma_state, scn_fac2)\n"
+                else:
+                    ostr += f"{indent}scor2 = {screen_call}plasma_state, scn_fac2)\n"
 
                 # there might be both the forward and reverse 3-alpha
                 # if we are doing symmetric screening
 
                 for r in scr.rates:
                     # use scor from the previous loop iteration
+                    if with_dT:
+                        ostr += f"{indent}rate_eval.{r.fname}_dT = (rate_eval.{r.fname}_dT * scor * scor2 +\n"
+                        ostr += f"{indent}    rate_eval.{r.fname} * (dscor_dT * scor2 + scor * dscor2_dT))\n"
                     ostr += f"{indent}rate_eval.{r.fname} *= scor * scor2\n"
             else:
                 # there might be several rates that have the same
@@ -124,12 +161,18 @@ class PythonNetwork(RateCollection):
                 # -- handle them all now
 
                 for r in scr.rates:
+                    if with_dT:
+                        ostr += f"{indent}rate_eval.{r.fname}_dT = rate_eval.{r.fname}_dT * scor + rate_eval.{r.fname} * dscor_dT\n"
                     ostr += f"{indent}rate_eval.{r.fname} *= scor\n"
 
         return ostr
 
-    def rates_string(self, indent=""):
-        """section for evaluating the rates and storing them in rate_eval"""
+    def rates_string(self, indent="", *, screen_by_id=False, with_dT=False):
+        """section for evaluating the rates and storing them in
+        rate_eval.  If with_dT is True, the screening is also applied
+        to the temperature derivatives of the rates, and the screening
+        function is passed in as screen_func_dT (see
+        :meth:`screening_string`)."""
 
         def format_rate_call(r, use_tf=True):
             args = ["rate_eval"]
@@ -166,8 +209,14 @@ class PythonNetwork(RateCollection):
         ostr += "\n"
 
         # apply screening factors, if we're given a screening function
-        ostr += f"{indent}if screen_func is not None:\n"
-        ostr += self.screening_string(indent=indent + 4*" ")
+        if screen_by_id:
+            ostr += f"{indent}if screen_id != 0:\n"
+        elif with_dT:
+            ostr += f"{indent}if screen_func_dT is not None:\n"
+        else:
+            ostr += f"{indent}if screen_func is not None:\n"
+        ostr += self.screening_string(indent=indent + 4*" ", screen_by_id=screen_by_id,
+                                      with_dT=with_dT)
 
         if self.approx_rates:
             ostr += f"\n{indent}# approximate rates\n"
@@ -176,33 +225,151 @@ class PythonNetwork(RateCollection):
 
         return ostr
 
-    def _write_network(self, outfile: str | Path = None):
+    @staticmethod
+    def screen_select_string(indent="", *, with_dT=False):
+        """the functions that map the screening functions distributed
+        with pynucastro to an integer id and back.  A function that
+        takes another numba function as an argument cannot be cached
+        by numba, so cached networks select the screening this way.
+        If with_dT is True, screen_with_dT() selects the versions that
+        also return the temperature derivative."""
+
+        screen_funcs = ["screen5", "chugunov_2007", "chugunov_2009", "potekhin_1998"]
+
+        ostr = ""
+        ostr += "screen_ids = {None: 0"
+        for i, name in enumerate(screen_funcs):
+            ostr += f", {name}: {i+1}"
+        ostr += "}\n\n"
+
+        ostr += "def get_screen_id(screen_func):\n"
+        ostr += f"{indent}try:\n"
+        ostr += f"{indent*2}return screen_ids[screen_func]\n"
+        ostr += f"{indent}except KeyError:\n"
+        ostr += f'{indent*2}raise ValueError("only the screening functions in pynucastro.screening "\n'
+        ostr += f'{indent*2}                 "can be used with a cached network") from None\n\n'
+
+        ostr += "@numba.njit()\n"
+        ostr += "def screen(screen_id, plasma_state, scn_fac):\n"
+        for i, name in enumerate(screen_funcs[:-1]):
+            ostr += f"{indent}if screen_id == {i+1}:\n"
+            ostr += f"{indent*2}return {name}(plasma_state, scn_fac)\n"
+        ostr += f"{indent}return {screen_funcs[-1]}(plasma_state, scn_fac)\n\n"
+
+        if with_dT:
+            ostr += "@numba.njit()\n"
+            ostr += "def screen_with_dT(screen_id, plasma_state, scn_fac):\n"
+            for i, name in enumerate(screen_funcs[:-1]):
+                ostr += f"{indent}if screen_id == {i+1}:\n"
+                ostr += f"{indent*2}return {name}_with_dT(plasma_state, scn_fac)\n"
+            ostr += f"{indent}return {screen_funcs[-1]}_with_dT(plasma_state, scn_fac)\n\n"
+
+        return ostr
+
+    def _write_network(self, outfile: str | Path | io.TextIOBase = None,
+                       *, cache=False, sparse_jacobian=False,
+                       temperature_derivatives=False, fused=False, zones=False):
         """
         This is the actual RHS for the system of ODEs that
-        this network describes.
+        this network describes.  outfile can be a file name or an
+        open text file; if it is None, the network is written to
+        stdout.
+
+        If cache is True, all of the numba functions in the module
+        are compiled with ``cache=True``, so the compiled code is
+        stored on disk (next to the module) and reused by later
+        processes.  Together with the generated ``warmup()``
+        function, this lets the compilation be done once ahead of
+        time.  This requires the network to be written to a file,
+        and only the screening functions distributed with pynucastro
+        can be used with the cached network.
+
+        If sparse_jacobian is True, only the structurally nonzero
+        Jacobian elements are written.  ``jacobian_eq`` then returns
+        the CSR data array (ordered by ``jac_indices`` and
+        ``jac_indptr``), ``jacobian`` returns a ``scipy.sparse`` CSR
+        matrix, and ``jac_sparsity()`` returns the sparsity pattern,
+        e.g. for ``solve_ivp(jac_sparsity=...)``.
+
+        If fused is True, the network also gets ``rhs_jac(t, Y, rho,
+        T, screen_func=None)``, which evaluates the rates once and
+        returns both dY/dt and the Jacobian (storing them in the
+        ``dYdt`` and ``jac`` arrays, if they are given).
+
+        If temperature_derivatives is True, the rate functions also
+        compute the temperature derivatives of the rates, and the
+        network gets:
+
+        * ``rhs_jac_dT(t, Y, rho, T, screen_func=None)``, returning
+          dY/dt, the Jacobian, and d(dY/dt)/dT.
+
+        * ``rhs_temp(t, y, rho, cv, screen_func=None)`` and
+          ``jacobian_temp(t, y, rho, cv, screen_func=None)``, the
+          righthand side and (dense) Jacobian of the system where
+          ``y = (Y, T)`` and the temperature evolves from the nuclear
+          energy release at constant density, ``dT/dt = eps / cv``,
+          for the specific heat cv (erg/g/K) given by the caller.
+
+        The temperature derivatives of the rates are analytic, and so
+        are those of the screening factors for the screening functions
+        distributed with pynucastro (see
+        :func:`pynucastro.screening.screen_func_with_dT`); any other
+        screening function is differenced in T.  Custom rates need to accept a
+        ``with_dT`` argument to their ``function_string_py()`` to be
+        used here.
+
+        If zones is True, the network also gets ``rhs_zones()`` and
+        ``burn_zones()``, which evaluate and integrate many
+        independent zones (at fixed density and temperature) in
+        parallel.  The integrator is built on the fused
+        ``rhs_jac_eq()``, so this implies fused.
         """
         # pylint: disable=arguments-differ
-        if outfile is None:
-            of = sys.stdout
-        else:
-            outfile = Path(outfile)
-            of = outfile.open("w")
+        if cache and (outfile is None or isinstance(outfile, io.TextIOBase)):
+            raise ValueError("numba caching requires the network to be written to a file")
+
+        fused = fused or zones
+
+        def rate_function_string(r):
+            if not temperature_derivatives:
+                return r.function_string_py()
+            if "with_dT" not in inspect.signature(r.function_string_py).parameters:
+                raise ValueError(f"rate {r} does not support temperature derivatives")
+            return r.function_string_py(with_dT=True)
+
+        # the network is assembled in memory first, so we can enable
+        # caching on all of the numba functions at once
+        of = io.StringIO()
 
         indent = 4*" "
 
         of.write("import numba\n")
         of.write("import numpy as np\n")
         of.write("from scipy import constants\n")
+        if sparse_jacobian:
+            of.write("from scipy import sparse\n")
         of.write("from numba.experimental import jitclass\n\n")
         of.write("from pynucastro.rates import TableIndex, TableInterpolator, TabularRate, Tfactors\n")
-        of.write("from pynucastro.screening import PlasmaState, ScreenFactors\n\n")
+        of.write("from pynucastro.screening import PlasmaState, ScreenFactors\n")
+        if cache:
+            of.write("from pynucastro.screening import chugunov_2007, chugunov_2009, potekhin_1998, screen5\n")
+            if temperature_derivatives:
+                of.write("from pynucastro.screening import (chugunov_2007_with_dT, chugunov_2009_with_dT,\n")
+                of.write("                                  potekhin_1998_with_dT, screen5_with_dT)\n")
+        elif temperature_derivatives:
+            of.write("from pynucastro.screening import screen_func_with_dT\n")
+        of.write("\n")
 
         # integer keys
 
         for i, n in enumerate(self.unique_nuclei):
             of.write(f"j{n.raw} = {i}\n")
 
-        of.write(f"nnuc = {len(self.unique_nuclei)}\n\n")
+        of.write(f"nnuc = {len(self.unique_nuclei)}\n")
+        if temperature_derivatives:
+            # the index of the temperature in the (Y, T) system
+            of.write("jtemp = nnuc\n")
+        of.write("\n")
 
         # nuclei properties
 
@@ -270,11 +437,17 @@ class PythonNetwork(RateCollection):
         of.write("@jitclass([\n")
         for r in self.all_rates:
             of.write(f'{indent}("{r.fname}", numba.float64),\n')
+        if temperature_derivatives:
+            for r in self.all_rates:
+                of.write(f'{indent}("{r.fname}_dT", numba.float64),\n')
         of.write("])\n")
         of.write("class RateEval:\n")
         of.write(f"{indent}def __init__(self):\n")
         for r in self.all_rates:
             of.write(f"{indent*2}self.{r.fname} = np.nan\n")
+        if temperature_derivatives:
+            for r in self.all_rates:
+                of.write(f"{indent*2}self.{r.fname}_dT = np.nan\n")
 
         of.write("\n")
 
@@ -295,6 +468,16 @@ class PythonNetwork(RateCollection):
         of.write("def ye(Y):\n")
         of.write(f"{indent}return np.sum(Z * Y)/np.sum(A * Y)\n\n")
 
+        if temperature_derivatives and nuclei_pfs:
+            # needed for the derivatives of the partition functions
+            of.write("@numba.njit()\n")
+            of.write("def interp_slope(x, xp, fp):\n")
+            of.write(f'{indent}"""return the derivative of np.interp(x, xp, fp) with respect to x"""\n')
+            of.write(f"{indent}if x <= xp[0] or x >= xp[-1]:\n")
+            of.write(f"{indent*2}return 0.0\n")
+            of.write(f"{indent}i = np.searchsorted(xp, x)\n")
+            of.write(f"{indent}return (fp[i] - fp[i-1]) / (xp[i] - xp[i-1])\n\n")
+
         # the functions to evaluate the temperature dependence of the rates
 
         _rate_func_written = []
@@ -304,69 +487,222 @@ class PythonNetwork(RateCollection):
                 for cr in r.get_child_rates():
                     if cr in _rate_func_written:
                         continue
-                    of.write(cr.function_string_py())
+                    of.write(rate_function_string(cr))
                     _rate_func_written.append(cr)
 
                 # now write out the function that computes the
                 # approximate rate
-                of.write(r.function_string_py())
+                of.write(rate_function_string(r))
             else:
                 if r in _rate_func_written:
                     continue
-                of.write(r.function_string_py())
+                of.write(rate_function_string(r))
                 _rate_func_written.append(r)
 
+        if cache:
+            of.write(self.screen_select_string(indent=indent, with_dT=temperature_derivatives))
+            screen_arg = "screen_id"
+            screen_value = "get_screen_id(screen_func)"
+            screen_arg_dT = screen_arg
+            screen_value_dT = screen_value
+        else:
+            screen_arg = "screen_func"
+            screen_value = "screen_func"
+            screen_arg_dT = "screen_func_dT"
+            screen_value_dT = "screen_func_with_dT(screen_func)"
+
+        # the pieces of the rhs and Jacobian functions -- these are
+        # shared by the separate and fused versions
+
+        rates_str = self.rates_string(indent=indent, screen_by_id=cache)
+
+        ydot_str = ""
+        for n in self.unique_nuclei:
+            ydot_str += self.full_ydot_string(n, indent=indent)
+
+        jac_str = ""
+        if sparse_jacobian:
+            # the rates with everything but their composition dependence
+            jac_str += f"{indent}rate_vals = np.empty(({len(self.rates)}), dtype=np.float64)\n"
+            for i, r in enumerate(self.rates):
+                jac_str += f"{indent}rate_vals[{i}] = {r.rate_factor_string_py()}\n"
+            jac_str += "\n"
+
+            jac_str += f"{indent}for c in range(len(jac_position)):\n"
+            jac_str += f"{indent*2}k = jac_term[c]\n"
+            jac_str += f"{indent*2}term = jac_term_coeff[k] * rate_vals[jac_term_rate[k]]\n"
+            jac_str += f"{indent*2}for m in range(jac_term_yidx.shape[1]):\n"
+            jac_str += f"{indent*3}term *= Y[jac_term_yidx[k, m]]**jac_term_yexp[k, m]\n"
+            jac_str += f"{indent*2}jac[jac_position[c]] += jac_stoich[c] * term\n\n"
+            jac_shape = "(jac_nnz)"
+        else:
+            # now fill each Jacobian element
+            for n_i in self.unique_nuclei:
+                for n_j in self.unique_nuclei:
+                    jac_str += self.full_jacobian_element_string(n_i, n_j, indent=indent)
+            jac_shape = "(nnuc, nnuc)"
+
         # the rhs() function
 
         of.write("def rhs(t, Y, rho, T, screen_func=None):\n")
-        of.write(f"{indent}return rhs_eq(t, Y, rho, T, screen_func)\n\n")
+        of.write(f"{indent}return rhs_eq(t, Y, rho, T, {screen_value})\n\n")
 
         of.write("@numba.njit()\n")
-        of.write("def rhs_eq(t, Y, rho, T, screen_func):\n\n")
+        of.write(f"def rhs_eq(t, Y, rho, T, {screen_arg}):\n\n")
 
         # get the rates
         of.write(f"{indent}tf = Tfactors(T)\n")
         of.write(f"{indent}rate_eval = RateEval()\n\n")
 
-        of.write(self.rates_string(indent=indent))
+        of.write(rates_str)
 
         of.write("\n")
 
         of.write(f"{indent}dYdt = np.zeros((nnuc), dtype=np.float64)\n\n")
 
         # now make the RHSs
-        for n in self.unique_nuclei:
-            of.write(self.full_ydot_string(n, indent=indent))
+        of.write(ydot_str)
 
         of.write(f"{indent}return dYdt\n\n")
 
         # the jacobian() function
 
-        of.write("def jacobian(t, Y, rho, T, screen_func=None):\n")
-        of.write(f"{indent}return jacobian_eq(t, Y, rho, T, screen_func)\n\n")
+        if sparse_jacobian:
+            jstr = self._get_jacobian_structure()
+
+            of.write("# the sparsity pattern of the Jacobian, in CSR form\n")
+            of.write(f"jac_indptr = np.array({jstr['indptr'].tolist()}, dtype=np.int32)\n")
+            of.write(f"jac_indices = np.array({jstr['indices'].tolist()}, dtype=np.int32)\n")
+            of.write(f"jac_nnz = {len(jstr['indices'])}\n\n")
+
+            # each rate contributes a term drate/dY_j for each of its
+            # distinct reactants j, which is added to the Jacobian
+            # elements of the nuclei it changes
+            of.write("# the Jacobian terms: term k is jac_term_coeff[k] * rate_vals[jac_term_rate[k]] *\n")
+            of.write("# prod_m Y[jac_term_yidx[k, m]]**jac_term_yexp[k, m]\n")
+            of.write(f"jac_term_rate = np.array({jstr['term_rate'].tolist()}, dtype=np.int32)\n")
+            of.write(f"jac_term_coeff = np.array({jstr['term_ycoeff'].tolist()}, dtype=np.float64)\n")
+            of.write(f"jac_term_yidx = np.array({jstr['yidx'].tolist()}, dtype=np.int32).reshape({jstr['yidx'].shape})\n")
+            of.write(f"jac_term_yexp = np.array({jstr['yexp'].astype(int).tolist()}, dtype=np.int32).reshape({jstr['yexp'].shape})\n\n")
+
+            of.write("# contribution c adds jac_stoich[c] * term jac_term[c] to jac[jac_position[c]]\n")
+            of.write(f"jac_position = np.array({jstr['position'].tolist()}, dtype=np.int32)\n")
+            of.write(f"jac_stoich = np.array({jstr['stoich'].tolist()}, dtype=np.float64)\n")
+            of.write(f"jac_term = np.array({jstr['term'].tolist()}, dtype=np.int32)\n\n")
+
+            of.write("def jac_sparsity():\n")
+            of.write(f'{indent}"""return the sparsity pattern of the Jacobian as a scipy.sparse CSR matrix"""\n')
+            of.write(f"{indent}return sparse.csr_matrix((np.ones(jac_nnz, dtype=np.bool_), jac_indices, jac_indptr),\n")
+            of.write(f"{indent}                         shape=(nnuc, nnuc))\n\n")
+
+            of.write("def jacobian(t, Y, rho, T, screen_func=None):\n")
+            of.write(f"{indent}return sparse.csr_matrix((jacobian_eq(t, Y, rho, T, {screen_value}), jac_indices, jac_indptr),\n")
+            of.write(f"{indent}                         shape=(nnuc, nnuc))\n\n")
+        else:
+            of.write("def jacobian(t, Y, rho, T, screen_func=None):\n")
+            of.write(f"{indent}return jacobian_eq(t, Y, rho, T, {screen_value})\n\n")
 
         of.write("@numba.njit()\n")
-        of.write("def jacobian_eq(t, Y, rho, T, screen_func):\n\n")
+        of.write(f"def jacobian_eq(t, Y, rho, T, {screen_arg}):\n\n")
 
         # get the rates
         of.write(f"{indent}tf = Tfactors(T)\n")
         of.write(f"{indent}rate_eval = RateEval()\n\n")
 
-        of.write(self.rates_string(indent=indent))
+        of.write(rates_str)
 
         of.write("\n")
 
-        of.write(f"{indent}jac = np.zeros((nnuc, nnuc), dtype=np.float64)\n\n")
-
-        # now fill each Jacobian element
-        for n_i in self.unique_nuclei:
-            for n_j in self.unique_nuclei:
-                of.write(self.full_jacobian_element_string(n_i, n_j, indent=indent))
-
-        of.write(f"{indent}return jac\n")
+        of.write(f"{indent}jac = np.zeros({jac_shape}, dtype=np.float64)\n\n")
+
+        of.write(jac_str)
+
+        of.write(f"{indent}return jac\n\n")
+
+        if fused:
+            self._write_fused_functions(of, indent, rates_str=rates_str,
+                                        ydot_str=ydot_str, jac_str=jac_str,
+                                        jac_shape=jac_shape, screen_arg=screen_arg,
+                                        screen_value=screen_value,
+                                        sparse_jacobian=sparse_jacobian)
+
+        if temperature_derivatives:
+            # the temperature derivatives have the same form as the
+            # RHSs, with each rate replaced by its derivative
+            ydot_dT_str = ""
+            for n in self.unique_nuclei:
+                ydot_dT_str += self.full_ydot_string(n, indent=indent, dT=True)
+
+            self._write_temperature_functions(of, indent,
+                                              rates_str=self.rates_string(indent=indent, screen_by_id=cache,
+                                                                          with_dT=True),
+                                              ydot_str=ydot_str, ydot_dT_str=ydot_dT_str,
+                                              jac_str=jac_str, jac_shape=jac_shape,
+                                              screen_arg=screen_arg, screen_value=screen_value,
+                                              screen_arg_dT=screen_arg_dT,
+                                              screen_value_dT=screen_value_dT,
+                                              sparse_jacobian=sparse_jacobian)
+
+        # the versions over many zones
+
+        if zones:
+            self._write_zones_functions(of, indent, jac_shape=jac_shape,
+                                        screen_arg=screen_arg, screen_value=screen_value,
+                                        sparse_jacobian=sparse_jacobian)
+
+        # ahead-of-time compilation
+
+        if fused:
+            of.write("def warmup(screen_funcs=(None,), fused=False):\n")
+            of.write(f'{indent}"""compile rhs_eq and jacobian_eq (or rhs_jac_eq, if fused is True)\n')
+            of.write(f"{indent}for the argument types used by rhs and jacobian (float t, rho, and T\n")
+            of.write(f"{indent}and contiguous float64 arrays) and each of the screening functions in\n")
+            of.write(f"{indent}screen_funcs, without evaluating the network")
+        else:
+            of.write("def warmup(screen_funcs=(None,)):\n")
+            of.write(f'{indent}"""compile rhs_eq and jacobian_eq for the argument types used by rhs\n')
+            of.write(f"{indent}and jacobian (float t, rho, and T and contiguous float64 arrays) and\n")
+            of.write(f"{indent}each of the screening functions in screen_funcs, without evaluating\n")
+            of.write(f"{indent}the network")
+        if temperature_derivatives:
+            of.write(".  The kernels of rhs_jac_dT, rhs_temp,\n")
+            of.write(f'{indent}and jacobian_temp are compiled as well"""\n')
+        else:
+            of.write('"""\n')
+        of.write(f"{indent}for screen_func in screen_funcs:\n")
+        of.write(f"{indent*2}sig = (numba.float64, numba.float64[::1], numba.float64, numba.float64,\n")
+        of.write(f"{indent*2}       numba.typeof({screen_value}))\n")
+        jac_type = "numba.float64[::1]" if sparse_jacobian else "numba.float64[:, ::1]"
+        if fused:
+            of.write(f"{indent*2}if fused:\n")
+            of.write(f"{indent*3}rhs_jac_eq.compile(sig + (numba.float64[::1], {jac_type}))\n")
+            of.write(f"{indent*2}else:\n")
+            of.write(f"{indent*3}rhs_eq.compile(sig)\n")
+            of.write(f"{indent*3}jacobian_eq.compile(sig)\n")
+        else:
+            of.write(f"{indent*2}rhs_eq.compile(sig)\n")
+            of.write(f"{indent*2}jacobian_eq.compile(sig)\n")
+        if temperature_derivatives:
+            of.write(f"{indent*2}sig_dT = sig[:-1] + (numba.typeof({screen_value_dT}),)\n")
+            of.write(f"{indent*2}rhs_jac_dT_eq.compile(sig_dT + (numba.float64[::1], {jac_type}, numba.float64[::1]))\n")
+            of.write(f"{indent*2}rhs_temp_eq.compile(sig)\n")
+            of.write(f"{indent*2}jacobian_temp_eq.compile(sig_dT)\n")
+
+        source = of.getvalue()
+        if cache:
+            source = source.replace("@numba.njit()", "@numba.njit(cache=True)")
+            source = source.replace("@numba.njit(parallel=True)", "@numba.njit(cache=True, parallel=True)")
 
-        if outfile is not None:
-            of.close()
+        if outfile is None:
+            sys.stdout.write(source)
+        elif isinstance(outfile, io.TextIOBase):
+            # we were given an open file (e.g. from compile()), so
+            # there is nowhere to copy the tables to
+            outfile.write(source)
+            return
+        else:
+            outfile = Path(outfile)
+            outfile.write_text(source)
 
         # Copy any tables in the network to the current directory
         # if the table file cannot be found, print a warning and continue.
@@ -388,3 +724,313 @@ class PythonNetwork(RateCollection):
                     shutil.copy(rtoki_file, odir or Path.cwd())
                 else:
                     warnings.warn(UserWarning(f'Table metadata file {tr.rfile} not found.'))
+
+    @staticmethod
+    def _write_fused_functions(of, indent, *, rates_str, ydot_str, jac_str,
+                               jac_shape, screen_arg, screen_value, sparse_jacobian):
+        """write rhs_jac(), which evaluates the rates only once and
+        stores both dY/dt and the Jacobian in the arrays passed in.
+        The strings passed in are the pieces of the rhs and Jacobian
+        functions built in :meth:`_write_network`."""
+
+        of.write("def rhs_jac(t, Y, rho, T, screen_func=None, *, dYdt=None, jac=None):\n")
+        of.write(f'{indent}"""evaluate both dY/dt and the Jacobian, computing the rates only once.\n')
+        of.write(f"{indent}The results are stored in dYdt and jac, if they are given, to avoid\n")
+        if sparse_jacobian:
+            of.write(f"{indent}allocating new arrays.  jac holds the CSR data of the Jacobian, ordered\n")
+            of.write(f'{indent}by jac_indices and jac_indptr"""\n')
+        else:
+            of.write(f'{indent}allocating new arrays"""\n')
+        of.write(f"{indent}if dYdt is None:\n")
+        of.write(f"{indent*2}dYdt = np.empty((nnuc), dtype=np.float64)\n")
+        of.write(f"{indent}if jac is None:\n")
+        of.write(f"{indent*2}jac = np.empty({jac_shape}, dtype=np.float64)\n")
+        of.write(f"{indent}rhs_jac_eq(t, Y, rho, T, {screen_value}, dYdt, jac)\n")
+        of.write(f"{indent}return dYdt, jac\n\n")
+
+        of.write("@numba.njit()\n")
+        of.write(f"def rhs_jac_eq(t, Y, rho, T, {screen_arg}, dYdt, jac):\n\n")
+
+        # get the rates
+        of.write(f"{indent}tf = Tfactors(T)\n")
+        of.write(f"{indent}rate_eval = RateEval()\n\n")
+
+        of.write(rates_str)
+
+        of.write("\n")
+
+        # every element of dYdt is set in the RHSs
+        of.write(ydot_str)
+
+        # but only the nonzero Jacobian elements are
+        of.write(f"{indent}jac[...] = 0.0\n\n")
+
+        of.write(jac_str)
+
+    @staticmethod
+    def _write_temperature_functions(of, indent, *, rates_str, ydot_str, ydot_dT_str,
+                                     jac_str, jac_shape, screen_arg, screen_value,
+                                     screen_arg_dT, screen_value_dT, sparse_jacobian):
+        """write the functions that need the temperature derivatives
+        of the rates: rhs_jac_dT() and the righthand side and Jacobian
+        of the system with the energy equation, rhs_temp() and
+        jacobian_temp().  The strings passed in are the pieces of the
+        rhs and Jacobian functions built in :meth:`_write_network`."""
+
+        # the fused rhs_jac_dT() function
+
+        of.write("def rhs_jac_dT(t, Y, rho, T, screen_func=None, *, dYdt=None, jac=None, dYdt_dT=None):\n")
+        of.write(f'{indent}"""evaluate dY/dt, the Jacobian, and the temperature derivative of dY/dt,\n')
+        of.write(f"{indent}computing the rates only once.  The results are stored in dYdt, jac, and\n")
+        of.write(f'{indent}dYdt_dT, if they are given, to avoid allocating new arrays"""\n')
+        of.write(f"{indent}if dYdt is None:\n")
+        of.write(f"{indent*2}dYdt = np.empty((nnuc), dtype=np.float64)\n")
+        of.write(f"{indent}if jac is None:\n")
+        of.write(f"{indent*2}jac = np.empty({jac_shape}, dtype=np.float64)\n")
+        of.write(f"{indent}if dYdt_dT is None:\n")
+        of.write(f"{indent*2}dYdt_dT = np.empty((nnuc), dtype=np.float64)\n")
+        of.write(f"{indent}rhs_jac_dT_eq(t, Y, rho, T, {screen_value_dT}, dYdt, jac, dYdt_dT)\n")
+        of.write(f"{indent}return dYdt, jac, dYdt_dT\n\n")
+
+        of.write("@numba.njit()\n")
+        of.write(f"def rhs_jac_dT_eq(t, Y, rho, T, {screen_arg_dT}, dYdt, jac, dYdt_dT):\n\n")
+
+        of.write(f"{indent}tf = Tfactors(T)\n")
+        of.write(f"{indent}rate_eval = RateEval()\n\n")
+
+        of.write(rates_str)
+
+        of.write("\n")
+
+        of.write(ydot_str)
+
+        of.write(f"{indent}jac[...] = 0.0\n\n")
+
+        of.write(jac_str)
+
+        of.write(ydot_dT_str)
+
+        # the system with the energy equation
+
+        of.write("def rhs_temp(t, y, rho, cv, screen_func=None):\n")
+        of.write(f'{indent}"""the righthand side of the system y = (Y, T), where the temperature\n')
+        of.write(f"{indent}y[jtemp] evolves at constant density from the nuclear energy release,\n")
+        of.write(f'{indent}dT/dt = eps / cv, for the specific heat cv (erg/g/K)"""\n')
+        of.write(f"{indent}return rhs_temp_eq(t, y, rho, cv, {screen_value})\n\n")
+
+        of.write("@numba.njit()\n")
+        of.write(f"def rhs_temp_eq(t, y, rho, cv, {screen_arg}):\n\n")
+        of.write(f"{indent}dydt = np.empty((nnuc+1), dtype=np.float64)\n")
+        of.write(f"{indent}dydt[:nnuc] = rhs_eq(t, y[:nnuc], rho, y[jtemp], {screen_arg})\n")
+        of.write(f"{indent}dydt[jtemp] = -constants.Avogadro * np.sum(mass * dydt[:nnuc]) / cv\n")
+        of.write(f"{indent}return dydt\n\n")
+
+        of.write("def jacobian_temp(t, y, rho, cv, screen_func=None):\n")
+        of.write(f'{indent}"""the Jacobian of the system y = (Y, T) (see rhs_temp)"""\n')
+        if sparse_jacobian:
+            of.write(f"{indent}return sparse.csr_matrix(jacobian_temp_eq(t, y, rho, cv, {screen_value_dT}))\n\n")
+        else:
+            of.write(f"{indent}return jacobian_temp_eq(t, y, rho, cv, {screen_value_dT})\n\n")
+
+        of.write("@numba.njit()\n")
+        of.write(f"def jacobian_temp_eq(t, y, rho, cv, {screen_arg_dT}):\n\n")
+        of.write(f"{indent}dYdt = np.empty((nnuc), dtype=np.float64)\n")
+        of.write(f"{indent}jac = np.empty({jac_shape}, dtype=np.float64)\n")
+        of.write(f"{indent}dYdt_dT = np.empty((nnuc), dtype=np.float64)\n")
+        of.write(f"{indent}rhs_jac_dT_eq(t, y[:nnuc], rho, y[jtemp], {screen_arg_dT}, dYdt, jac, dYdt_dT)\n\n")
+
+        of.write(f"{indent}jac_temp = np.zeros((nnuc+1, nnuc+1), dtype=np.float64)\n")
+        if sparse_jacobian:
+            of.write(f"{indent}for i in range(nnuc):\n")
+            of.write(f"{indent*2}for k in range(jac_indptr[i], jac_indptr[i+1]):\n")
+            of.write(f"{indent*3}jac_temp[i, jac_indices[k]] = jac[k]\n")
+        else:
+            of.write(f"{indent}jac_temp[:nnuc, :nnuc] = jac\n")
+        of.write(f"{indent}jac_temp[:nnuc, jtemp] = dYdt_dT\n\n")
+
+        of.write(f"{indent}# dT/dt = -N_A sum_i mass_i dY_i/dt / cv\n")
+        of.write(f"{indent}for j in range(nnuc+1):\n")
+        of.write(f"{indent*2}jac_temp[jtemp, j] = -constants.Avogadro * np.sum(mass * jac_temp[:nnuc, j]) / cv\n\n")
+        of.write(f"{indent}return jac_temp\n\n")
+
+    @staticmethod
+    def _write_zones_functions(of, indent, *, jac_shape, screen_arg, screen_value,
+                               sparse_jacobian):
+        """write the functions that work on many independent zones at
+        once, in parallel: rhs_zones() and the integrator
+        burn_zones()"""
+
+        of.write("def zone_arrays(nzones, *args):\n")
+        of.write(f'{indent}"""broadcast each of the scalars or arrays in args to a contiguous\n')
+        of.write(f'{indent}float64 array of length nzones"""\n')
+        of.write(f"{indent}return tuple(np.ascontiguousarray(np.broadcast_to(np.asarray(a, dtype=np.float64), (nzones,)))\n")
+        of.write(f"{indent}             for a in args)\n\n")
+
+        # the rhs
+
+        of.write("def rhs_zones(t, Y, rho, T, screen_func=None):\n")
+        of.write(f'{indent}"""evaluate dY/dt for many independent zones at once, in parallel.\n')
+        of.write(f"{indent}Y has shape (nzones, nnuc), and rho and T are either arrays of length\n")
+        of.write(f'{indent}nzones or scalars"""\n')
+        of.write(f"{indent}Y = np.ascontiguousarray(Y, dtype=np.float64)\n")
+        of.write(f"{indent}rho, T = zone_arrays(Y.shape[0], rho, T)\n")
+        of.write(f"{indent}return rhs_zones_eq(t, Y, rho, T, {screen_value})\n\n")
+
+        of.write("@numba.njit(parallel=True)\n")
+        of.write(f"def rhs_zones_eq(t, Y, rho, T, {screen_arg}):\n\n")
+        of.write(f"{indent}dYdt = np.empty_like(Y)\n")
+        of.write(f"{indent}for i in numba.prange(Y.shape[0]):\n")
+        of.write(f"{indent*2}dYdt[i, :] = rhs_eq(t, Y[i, :], rho[i], T[i], {screen_arg})\n")
+        of.write(f"{indent}return dYdt\n\n")
+
+        # the integrator
+
+        of.write("def burn_zones(Y0, rho, T, tmax, screen_func=None, *, rtol=1.e-6, atol=1.e-10,\n")
+        of.write("               max_steps=100000):\n")
+        of.write(f'{indent}"""integrate dY/dt from t = 0 to tmax for many independent zones at\n')
+        of.write(f"{indent}once, in parallel, holding rho and T fixed in each zone.  Y0 has shape\n")
+        of.write(f"{indent}(nzones, nnuc), and rho and T are either arrays of length nzones or\n")
+        of.write(f"{indent}scalars.  Each zone is integrated with an adaptive, L-stable, second\n")
+        of.write(f"{indent}order Rosenbrock method (the method of MATLAB's ode23s) using the\n")
+        of.write(f"{indent}analytic Jacobian.  This returns Y at tmax and the number of steps\n")
+        of.write(f'{indent}taken in each zone"""\n')
+        of.write(f"{indent}Y0 = np.ascontiguousarray(Y0, dtype=np.float64)\n")
+        of.write(f"{indent}rho, T = zone_arrays(Y0.shape[0], rho, T)\n")
+        of.write(f"{indent}Y, nsteps = burn_zones_eq(Y0, rho, T, float(tmax), {screen_value},\n")
+        of.write(f"{indent}                          float(rtol), float(atol), int(max_steps))\n")
+        of.write(f"{indent}failed = np.nonzero(nsteps < 0)[0]\n")
+        of.write(f"{indent}if len(failed) > 0:\n")
+        of.write(f'{indent*2}raise RuntimeError(f"integration failed in zones {{failed.tolist()}}")\n')
+        of.write(f"{indent}return Y, nsteps\n\n")
+
+        of.write("@numba.njit(parallel=True)\n")
+        of.write(f"def burn_zones_eq(Y0, rho, T, tmax, {screen_arg}, rtol, atol, max_steps):\n\n")
+        of.write(f"{indent}Y = np.empty_like(Y0)\n")
+        of.write(f"{indent}nsteps = np.empty((Y0.shape[0]), dtype=np.int64)\n")
+        of.write(f"{indent}for i in numba.prange(Y0.shape[0]):\n")
+        of.write(f"{indent*2}y, n = burn_zone_eq(Y0[i, :], rho[i], T[i], tmax, {screen_arg}, rtol, atol, max_steps)\n")
+        of.write(f"{indent*2}Y[i, :] = y\n")
+        of.write(f"{indent*2}nsteps[i] = n\n")
+        of.write(f"{indent}return Y, nsteps\n\n")
+
+        of.write("@numba.njit()\n")
+        of.write(f"def burn_zone_eq(Y0, rho, T, tmax, {screen_arg}, rtol, atol, max_steps):\n")
+        of.write(f'{indent}"""integrate a single zone (see burn_zones).  The number of steps\n')
+        of.write(f'{indent}returned is -1 if the integration failed"""\n\n')
+
+        of.write(f"{indent}# the coefficients of the Rosenbrock method\n")
+        of.write(f"{indent}d = 1.0 / (2.0 + np.sqrt(2.0))\n")
+        of.write(f"{indent}e32 = 6.0 + np.sqrt(2.0)\n\n")
+
+        of.write(f"{indent}y = Y0.copy()\n")
+        of.write(f"{indent}f0 = np.empty((nnuc), dtype=np.float64)\n")
+        of.write(f"{indent}jac = np.empty({jac_shape}, dtype=np.float64)\n")
+        of.write(f"{indent}W = np.empty((nnuc, nnuc), dtype=np.float64)\n\n")
+
+        of.write(f"{indent}t = 0.0\n")
+        of.write(f"{indent}rhs_jac_eq(t, y, rho, T, {screen_arg}, f0, jac)\n\n")
+
+        of.write(f"{indent}# the initial timestep limits the change of each Y\n")
+        of.write(f"{indent}h = tmax\n")
+        of.write(f"{indent}for k in range(nnuc):\n")
+        of.write(f"{indent*2}if f0[k] != 0.0:\n")
+        of.write(f"{indent*3}h = min(h, 0.01 * (atol + rtol * abs(y[k])) / abs(f0[k]))\n\n")
+
+        of.write(f"{indent}nsteps = 0\n")
+        of.write(f"{indent}while t < tmax:\n")
+        of.write(f"{indent*2}if nsteps >= max_steps or t + h == t:\n")
+        of.write(f"{indent*3}return y, -1\n")
+        of.write(f"{indent*2}nsteps += 1\n")
+        of.write(f"{indent*2}h = min(h, tmax - t)\n\n")
+
+        of.write(f"{indent*2}# W = I - h d J\n")
+        if sparse_jacobian:
+            of.write(f"{indent*2}W[:, :] = 0.0\n")
+            of.write(f"{indent*2}for i in range(nnuc):\n")
+            of.write(f"{indent*3}for k in range(jac_indptr[i], jac_indptr[i+1]):\n")
+            of.write(f"{indent*4}W[i, jac_indices[k]] = -h * d * jac[k]\n")
+        else:
+            of.write(f"{indent*2}W[:, :] = -h * d * jac\n")
+        of.write(f"{indent*2}for k in range(nnuc):\n")
+        of.write(f"{indent*3}W[k, k] += 1.0\n\n")
+
+        of.write(f"{indent*2}k1 = np.linalg.solve(W, f0)\n")
+        of.write(f"{indent*2}f1 = rhs_eq(t + 0.5 * h, y + 0.5 * h * k1, rho, T, {screen_arg})\n")
+        of.write(f"{indent*2}k2 = np.linalg.solve(W, f1 - k1) + k1\n")
+        of.write(f"{indent*2}y_new = y + h * k2\n")
+        of.write(f"{indent*2}f2 = rhs_eq(t + h, y_new, rho, T, {screen_arg})\n")
+        of.write(f"{indent*2}k3 = np.linalg.solve(W, f2 - e32 * (k2 - f1) - 2.0 * (k1 - f0))\n\n")
+
+        of.write(f"{indent*2}# the error estimate compares to a third order solution\n")
+        of.write(f"{indent*2}err = h / 6.0 * (k1 - 2.0 * k2 + k3)\n")
+        of.write(f"{indent*2}scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))\n")
+        of.write(f"{indent*2}err_norm = np.sqrt(np.mean((err / scale)**2))\n\n")
+
+        of.write(f"{indent*2}if not np.isfinite(err_norm):\n")
+        of.write(f"{indent*3}h *= 0.2\n")
+        of.write(f"{indent*3}continue\n\n")
+
+        of.write(f"{indent*2}if err_norm <= 1.0:\n")
+        of.write(f"{indent*3}t += h\n")
+        of.write(f"{indent*3}y = y_new\n")
+        of.write(f"{indent*3}rhs_jac_eq(t, y, rho, T, {screen_arg}, f0, jac)\n\n")
+
+        of.write(f"{indent*2}if err_norm == 0.0:\n")
+        of.write(f"{indent*3}h *= 5.0\n")
+        of.write(f"{indent*2}else:\n")
+        of.write(f"{indent*3}h *= min(5.0, max(0.2, 0.8 * err_norm**(-1.0/3.0)))\n\n")
+
+        of.write(f"{indent}return y, nsteps\n\n")
+
+    def compile(self, *, sparse_jacobian=False, temperature_derivatives=False,
+                fused=False, zones=False):
+        """Generate the python network in memory and execute it,
+        without writing a module file.  This returns a module object
+        holding everything :meth:`write_network` would output, in
+        particular the ``rhs(t, Y, rho, T, screen_func=None)`` and
+        ``jacobian(t, Y, rho, T, screen_func=None)`` functions.
+
+        If sparse_jacobian is True, the Jacobian is generated in CSR
+        form, and if temperature_derivatives is True, the functions
+        that need the temperature derivatives of the rates, including
+        those for the system with the energy equation, are generated
+        as well.  If fused is True, ``rhs_jac()`` is generated, and if
+        zones is True, the functions that evaluate and integrate many
+        zones in parallel are generated (see :meth:`write_network`).
+
+        The most recently compiled modules are cached by a hash of the
+        generated source, so compiling an identical network again
+        returns the same module (and reuses any numba compilation
+        already done).
+        """
+        # pylint: disable=exec-used
+        assert self._distinguishable_rates(), "ERROR: Rates not uniquely identified by Rate.fname"
+
+        buf = io.StringIO()
+        self._write_network(buf, sparse_jacobian=sparse_jacobian,
+                            temperature_derivatives=temperature_derivatives,
+                            fused=fused, zones=zones)
+        source = buf.getvalue()
+
+        key = hashlib.sha256(source.encode()).hexdigest()
+        module = _compiled_networks.get(key)
+        if module is not None:
+            _compiled_networks.move_to_end(key)
+            return module
+
+        name = f"pynucastro_network_{key[:16]}"
+        filename = f"<{name}>"
+        # make the source available to tracebacks and numba's error
+        # messages
+        linecache.cache[filename] = (len(source), None,
+                                     source.splitlines(keepends=True), filename)
+        module = types.ModuleType(name)
+        exec(compile(source, filename, "exec"), module.__dict__)
+        _compiled_networks[key] = module
+
+        # evict the least recently used networks
+        while len(_compiled_networks) > _MAX_COMPILED_NETWORKS:
+            _, old_module = _compiled_networks.popitem(last=False)
+            linecache.cache.pop(f"<{old_module.__name__}>", None)
+
+        return module
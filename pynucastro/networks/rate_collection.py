@@ -18,16 +18,18 @@ from matplotlib.patches import ConnectionPatch
 from matplotlib.scale import SymmetricalLogTransform
 from matplotlib.ticker import MaxNLocator
 from mpl_toolkits.axes_grid1 import make_axes_locatable
+from scipy import sparse
 
 # Import Rate
 from pynucastro.constants import constants
 from pynucastro.nucdata import Nucleus, PeriodicTable
 from pynucastro.rates import (ApproximateRate, DerivedRate, Library, Rate,
-                              RateFileError, RatePair, TabularRate,
-                              find_duplicate_rates, is_allowed_dupe, load_rate)
+                              RateFileError, RatePair, ReacLibRate, TableIndex,
+                              TabularRate, find_duplicate_rates,
+                              is_allowed_dupe, load_rate)
 from pynucastro.rates.library import _rate_name_to_nuc, capitalize_rid
-from pynucastro.screening import (get_screening_map, make_plasma_state,
-                                  make_screen_factors)
+from pynucastro.screening import (get_screening_map, make_plasma_state_array,
+                                  make_screen_factors_array, screen_all_pairs)
 
 mpl.rcParams['figure.dpi'] = 100
 
@@ -470,6 +472,10 @@ class RateCollection:
 
     def _build_collection(self):
 
+        # the screening map depends on the rates, so it needs to be
+        # recomputed
+        self._screening_cache = None
+
         # get the unique nuclei
         u = []
         for r in self.rates:
@@ -577,6 +583,14 @@ class RateCollection:
         self.all_rates = (self.reaclib_rates + self.custom_rates +
                           self.tabular_rates + self.approx_rates + self.derived_rates)
 
+        # the Jacobian structure and stoichiometry matrix (and the
+        # pattern of the LU decomposition used by the integrator)
+        # depend only on the rates, so they are built the first time
+        # they are needed
+        self._jac_structure = None
+        self._stoich_matrix = None
+        self._lu_pattern = None
+
         # finally check for duplicate rates -- these are not
         # allowed
         if self.find_duplicate_links():
@@ -926,38 +940,138 @@ class RateCollection:
 
         return rvals
 
-    def evaluate_jacobian(self, rho, T, comp, screen_func=None):
-        """return an array of the form J_ij = dYdot_i/dY_j for the network"""
+    def _get_jacobian_structure(self):
+        """build (once) the information needed to evaluate the
+        Jacobian: the CSR sparsity pattern and, for each nonzero
+        contribution, the rate, the nucleus we differentiate with
+        respect to, and the stoichiometric coefficient.
+
+        Each rate contributes a term drate/dY_j for each distinct
+        reactant j.  For term t, the Y-dependence of the derivative is
+        ycoeff[t] * prod_m Y[yidx[t, m]]**yexp[t, m]."""
+
+        if self._jac_structure is not None:
+            return self._jac_structure
+
+        nuc_index = {n: i for i, n in enumerate(self.unique_nuclei)}
+
+        term_rate = []
+        term_y = []
+        term_ycoeff = []
+        rows = []
+        cols = []
+        stoich = []
+        contrib_term = []
+
+        for irate, r in enumerate(self.rates):
+            # net number of each nucleus produced by this rate
+            net = collections.Counter(r.products)
+            net.subtract(r.reactants)
+
+            reactants = sorted(set(r.reactants))
+            for n_j in reactants:
+                t = len(term_rate)
+                term_rate.append(irate)
+                term_ycoeff.append(r.reactants.count(n_j))
+                term_y.append([(nuc_index[n_k], r.reactants.count(n_k) - (n_k == n_j))
+                               for n_k in reactants])
+
+                for n_i, c in net.items():
+                    if c == 0:
+                        continue
+                    rows.append(nuc_index[n_i])
+                    cols.append(nuc_index[n_j])
+                    stoich.append(c)
+                    contrib_term.append(t)
+
+        nnuc = len(self.unique_nuclei)
+        nterms = len(term_rate)
+
+        # the Y-dependence, padded with Y[0]**0 = 1
+        maxr = max((len(ty) for ty in term_y), default=0)
+        yidx = np.zeros((nterms, maxr), dtype=np.int64)
+        yexp = np.zeros((nterms, maxr), dtype=np.float64)
+        for t, ty in enumerate(term_y):
+            for m, (k, e) in enumerate(ty):
+                yidx[t, m] = k
+                yexp[t, m] = e
+
+        # the sparsity pattern -- several contributions can land on the
+        # same element, so map each to its position in the CSR data
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        flat = rows * nnuc + cols
+        elements, position = np.unique(flat, return_inverse=True)
+        indices = (elements % nnuc).astype(np.int32)
+        indptr = np.searchsorted(elements // nnuc, np.arange(nnuc+1)).astype(np.int32)
+
+        self._jac_structure = {"indptr": indptr,
+                               "indices": indices,
+                               "term_rate": np.array(term_rate, dtype=np.int64),
+                               "term_ycoeff": np.array(term_ycoeff, dtype=np.float64),
+                               "yidx": yidx,
+                               "yexp": yexp,
+                               "position": position.reshape(-1).astype(np.int64),
+                               "stoich": np.array(stoich, dtype=np.float64),
+                               "term": np.array(contrib_term, dtype=np.int64)}
+        return self._jac_structure
+
+    def get_jacobian_sparsity(self):
+        """return the structural sparsity pattern of the Jacobian,
+        J_ij = dYdot_i/dY_j, as a boolean ``scipy.sparse`` CSR
+        matrix ordered by ``self.unique_nuclei``.  This depends only
+        on the stoichiometry of the rates, and is suitable, e.g., for
+        the ``jac_sparsity`` argument of ``solve_ivp``."""
+
+        jstr = self._get_jacobian_structure()
+        nnuc = len(self.unique_nuclei)
+        return sparse.csr_matrix((np.ones(len(jstr["indices"]), dtype=bool),
+                                  jstr["indices"], jstr["indptr"]),
+                                 shape=(nnuc, nnuc))
+
+    def evaluate_jacobian(self, rho, T, comp, screen_func=None, *, dense=False):
+        """return the Jacobian J_ij = dYdot_i/dY_j for the network,
+        ordered by ``self.unique_nuclei``.  By default this is a
+        ``scipy.sparse`` CSR matrix with the structural sparsity
+        pattern of the network (see :meth:`get_jacobian_sparsity`);
+        if dense is True, a dense NumPy array is returned instead.
+
+        Each rate is evaluated only once."""
 
-        # the rate.eval_jacobian_term does not compute the screening,
-        # so we multiply by the factors afterwards
+        jstr = self._get_jacobian_structure()
+
+        # the Jacobian terms don't include the screening, so we
+        # multiply by the factors afterwards
         if screen_func is not None:
             screen_factors = self.evaluate_screening(rho, T, comp, screen_func)
         else:
             screen_factors = {}
 
-        nnuc = len(self.unique_nuclei)
-        jac = np.zeros((nnuc, nnuc), dtype=np.float64)
-
-        for i, n_i in enumerate(self.unique_nuclei):
-            for j, n_j in enumerate(self.unique_nuclei):
-
-                # we are considering dYdot(n_i) / dY(n_j)
+        ymolar = comp.get_molar()
+        y_e = comp.eval_ye()
+        ys = np.array([ymolar[n] for n in self.unique_nuclei], dtype=np.float64)
 
-                jac[i, j] = 0.0
-
-                for r in self.nuclei_consumed[n_i]:
-                    # how many of n_i are destroyed by this reaction
-                    c = r.reactants.count(n_i)
-                    jac[i, j] -= c * screen_factors.get(r, 1.0) *\
-                        r.eval_jacobian_term(T, rho, comp, n_j)
+        # everything about each rate except its composition dependence
+        rate_vals = np.empty(len(self.rates), dtype=np.float64)
+        for irate, r in enumerate(self.rates):
+            val = r.prefactor * rho**r.dens_exp * r.eval(T, rho=rho, comp=comp)
+            if r.weak_type == 'electron_capture' and not isinstance(r, TabularRate):
+                val = val * y_e
+            rate_vals[irate] = val * screen_factors.get(r, 1.0)
 
-                for r in self.nuclei_produced[n_i]:
-                    # how many of n_i are produced by this reaction
-                    c = r.products.count(n_i)
-                    jac[i, j] += c * screen_factors.get(r, 1.0) *\
-                        r.eval_jacobian_term(T, rho, comp, n_j)
+        # drate/dY_j for each term
+        dterm = jstr["term_ycoeff"] * rate_vals[jstr["term_rate"]] * \
+            np.prod(ys[jstr["yidx"]]**jstr["yexp"], axis=1)
 
+        nnuc = len(self.unique_nuclei)
+        data = np.bincount(jstr["position"],
+                           weights=jstr["stoich"] * dterm[jstr["term"]],
+                           minlength=len(jstr["indices"]))
+        jac = sparse.csr_matrix((data, jstr["indices"], jstr["indptr"]),
+                                shape=(nnuc, nnuc))
+
+        if dense:
+            return jac.toarray()
         return jac
 
     def validate(self, other_library, *, forward_only=True):
@@ -1059,45 +1173,60 @@ class RateCollection:
     def evaluate_screening(self, rho, T, composition, screen_func):
         """Evaluate the screening factors for each rate, using one of the
         methods in :py:mod:`pynucastro.screening`"""
-        # this follows the same logic as BaseCxxNetwork._compute_screening_factors()
-        factors = {}
         ys = composition.get_molar()
-        plasma_state = make_plasma_state(T, rho, ys)
-        if not self.do_screening:
-            screening_map = []
-        else:
-            screening_map = get_screening_map(self.get_rates(),
-                                              symmetric_screening=self.symmetric_screening)
-
-        for i, scr in enumerate(screening_map):
-            if not (scr.n1.dummy or scr.n2.dummy):
-                scn_fac = make_screen_factors(scr.n1, scr.n2)
-                scor = screen_func(plasma_state, scn_fac)
-            if scr.name == "He4_He4_He4":
-                # we don't need to do anything here, but we want to avoid
-                # immediately applying the screening
-                pass
-            elif scr.name == "He4_He4_He4_dummy":
-                # make sure the previous iteration was the first part of 3-alpha
-                assert screening_map[i - 1].name == "He4_He4_He4"
-                # handle the second part of the screening for 3-alpha
-                scn_fac2 = make_screen_factors(scr.n1, scr.n2)
-                scor2 = screen_func(plasma_state, scn_fac2)
-
-                # there might be both the forward and reverse 3-alpha
-                # if we are doing symmetric screening
-                for r in scr.rates:
-                    # use scor from the previous loop iteration
-                    # pylint: disable-next=possibly-used-before-assignment
-                    factors[r] = scor * scor2
+        states = make_plasma_state_array(T, rho, list(ys.values()),
+                                         [n.Z for n in ys])
+        scn_facs, pair_idx, pair_rates = self.get_screening_pairs()
+        scor = screen_all_pairs(screen_func, states, scn_facs)[0, :]
+
+        factors = {}
+        for p, r in zip(pair_idx, pair_rates):
+            # 3-alpha gets the product of the factors of two pairs
+            factors[r] = factors.get(r, 1.0) * scor[p]
+        return factors
+
+    def _get_screening_cache(self):
+        key = (self.do_screening, self.symmetric_screening)
+        if self._screening_cache is None or self._screening_cache[0] != key:
+            if not self.do_screening:
+                screening_map = []
             else:
+                screening_map = get_screening_map(self.get_rates(),
+                                                  symmetric_screening=self.symmetric_screening)
+
+            # this follows the same logic as BaseCxxNetwork._compute_screening_factors()
+            pair_idx = []
+            pair_rates = []
+            for i, scr in enumerate(screening_map):
+                if scr.name == "He4_He4_He4_dummy":
+                    # make sure the previous pair was the first part of 3-alpha
+                    assert screening_map[i - 1].name == "He4_He4_He4"
                 # there might be several rates that have the same
                 # reactants and therefore the same screening applies
-                # -- handle them all now
                 for r in scr.rates:
-                    factors[r] = scor
-
-        return factors
+                    pair_idx.append(i)
+                    pair_rates.append(r)
+            scn_facs = make_screen_factors_array([(scr.n1, scr.n2) for scr in screening_map])
+
+            self._screening_cache = (key, screening_map,
+                                     (scn_facs, np.array(pair_idx, dtype=np.int64), pair_rates))
+        return self._screening_cache
+
+    def get_screening_map(self):
+        """return the list of :class:`ScreeningPair` objects that need
+        to be screened for this network.  This is computed once and
+        cached until the rates or the screening options change, so it
+        should not be modified."""
+        return self._get_screening_cache()[1]
+
+    def get_screening_pairs(self):
+        """return the :class:`ScreenFactorsArray` for the pairs of
+        nuclei in the screening map, an array of pair indices, and the
+        list of rates that each of those pairs applies to.  The 3-alpha
+        rate is screened by the product of the factors of two pairs, so
+        it appears twice.  Like :meth:`get_screening_map`, this is
+        cached."""
+        return self._get_screening_cache()[2]
 
     def evaluate_ydots(self, rho, T, composition, screen_func=None, rate_filter=None):
         """evaluate net rate of change of molar abundance for each nucleus
@@ -1211,6 +1340,171 @@ class RateCollection:
 
         return act
 
+    def _get_stoich_matrix(self):
+        """return the (sparse) matrix of the net number of each nucleus
+        produced by each rate, of shape (nnuc, nrates)"""
+
+        if self._stoich_matrix is None:
+            nuc_index = {n: i for i, n in enumerate(self.unique_nuclei)}
+            rows = []
+            cols = []
+            vals = []
+            for irate, r in enumerate(self.rates):
+                net = collections.Counter(r.products)
+                net.subtract(r.reactants)
+                for n, c in net.items():
+                    if c != 0:
+                        rows.append(nuc_index[n])
+                        cols.append(irate)
+                        vals.append(c)
+            self._stoich_matrix = sparse.csr_matrix(
+                (np.array(vals, dtype=np.float64), (rows, cols)),
+                shape=(len(self.unique_nuclei), len(self.rates)))
+        return self._stoich_matrix
+
+    def _batch_states(self, rho, T, X):
+        """broadcast the batched state inputs against each other,
+        returning 1-d arrays rho and T and the 2-d array X"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if X.shape[-1] != len(self.unique_nuclei):
+            raise ValueError("X must have one mass fraction per nucleus in unique_nuclei")
+        rho = np.asarray(rho, dtype=np.float64)
+        T = np.asarray(T, dtype=np.float64)
+        nstates = np.broadcast_shapes(rho.shape, T.shape, X.shape[:-1])
+        if len(nstates) != 1:
+            raise ValueError("rho, T, and X must describe a 1-d list of states")
+        rho = np.broadcast_to(rho, nstates)
+        T = np.broadcast_to(T, nstates)
+        X = np.broadcast_to(X, nstates + X.shape[-1:])
+        return rho, T, X
+
+    def evaluate_rates_batch(self, rho, T, X, screen_func=None):
+        """evaluate the rates for many thermodynamic states at once.
+        This is the batched counterpart of :meth:`evaluate_rates`.
+
+        rho: the densities (g/cm^3), an array of shape (nstates,)
+        or a scalar
+
+        T: the temperatures (K), an array of shape (nstates,) or a
+        scalar
+
+        X: the mass fractions, an array of shape (nstates, nnuc), with
+        the nuclei ordered as in self.unique_nuclei
+
+        screen_func: (optional) a screening function to apply to the rates
+
+        Returns an array of shape (nstates, nrates) of the rates as
+        dY/dt, with the rates ordered as in self.rates.
+        """
+
+        rho, T, X = self._batch_states(rho, T, X)
+        nstates = len(T)
+
+        A = np.array([n.A for n in self.unique_nuclei], dtype=np.float64)
+        Z = np.array([n.Z for n in self.unique_nuclei], dtype=np.float64)
+        Y = X / A
+        y_e = X @ (Z / A) / X.sum(axis=1)
+
+        nuc_index = {n: i for i, n in enumerate(self.unique_nuclei)}
+
+        rvals = np.empty((nstates, len(self.rates)), dtype=np.float64)
+        comps = None
+
+        for irate, r in enumerate(self.rates):
+            if isinstance(r, TabularRate):
+                # pylint: disable-next=protected-access
+                val = 10.0**r._interpolate(T, rho * y_e, TableIndex.RATE.value)
+            elif isinstance(r, (ReacLibRate, ApproximateRate)):
+                val = r.eval(T)
+            else:
+                # we don't know if a custom rate can work on arrays,
+                # so evaluate it one state at a time
+                if comps is None:
+                    comps = []
+                    for k in range(nstates):
+                        comp = Composition(self.unique_nuclei)
+                        comp.set_array(X[k, :])
+                        comps.append(comp)
+                val = np.array([r.eval(T[k], rho=rho[k], comp=comps[k])
+                                for k in range(nstates)])
+
+            val = r.prefactor * rho**r.dens_exp * val
+            if r.weak_type == 'electron_capture' and not isinstance(r, TabularRate):
+                val = val * y_e
+
+            yfac = np.ones(nstates)
+            for q in r.reactants:
+                yfac = yfac * Y[:, nuc_index[q]]
+            rvals[:, irate] = yfac * val
+
+        if screen_func is not None:
+            rate_index = {r: i for i, r in enumerate(self.rates)}
+            scn_facs, pair_idx, pair_rates = self.get_screening_pairs()
+            scor = screen_all_pairs(screen_func, make_plasma_state_array(T, rho, Y, Z),
+                                    scn_facs)
+            for p, r in zip(pair_idx, pair_rates):
+                irate = rate_index.get(r)
+                if irate is not None:
+                    rvals[:, irate] *= scor[:, p]
+
+        return rvals
+
+    def evaluate_ydots_batch(self, rho, T, X, screen_func=None):
+        """evaluate the net rate of change of molar abundance for each
+        nucleus for many thermodynamic states at once.  This is the
+        batched counterpart of :meth:`evaluate_ydots`, and takes the
+        same arguments as :meth:`evaluate_rates_batch`.
+
+        Returns an array of shape (nstates, nnuc), with the nuclei
+        ordered as in self.unique_nuclei.
+        """
+
+        rvals = self.evaluate_rates_batch(rho, T, X, screen_func=screen_func)
+        return np.asarray((self._get_stoich_matrix() @ rvals.T).T)
+
+    def evaluate_energy_generation_batch(self, rho, T, X,
+                                         screen_func=None, return_enu=False):
+        """evaluate the specific energy generation rate of the network
+        for many thermodynamic states at once.  This is the batched
+        counterpart of :meth:`evaluate_energy_generation`, and takes
+        the same arguments as :meth:`evaluate_rates_batch`.
+
+        Returns an array of shape (nstates,) of the energy generation
+        rate (erg/g/s).  If return_enu is True, the neutrino losses
+        from tabular weak rates are returned as well.
+        """
+
+        rho, T, X = self._batch_states(rho, T, X)
+        ydots = self.evaluate_ydots_batch(rho, T, X, screen_func=screen_func)
+
+        # ion binding energy contributions. basically e=mc^2
+        mass = np.array([((nuc.A - nuc.Z) * constants.m_n_MeV +
+                          nuc.Z * (constants.m_p_MeV + constants.m_e_MeV) -
+                          nuc.A * nuc.nucbind) * constants.MeV2erg
+                         for nuc in self.unique_nuclei])
+
+        # convert from molar value to erg/g/s
+        enuc = -constants.N_A * (ydots @ mass)
+
+        # subtract neutrino losses for tabular weak reactions
+        A = np.array([n.A for n in self.unique_nuclei], dtype=np.float64)
+        Z = np.array([n.Z for n in self.unique_nuclei], dtype=np.float64)
+        y_e = X @ (Z / A) / X.sum(axis=1)
+        nuc_index = {n: i for i, n in enumerate(self.unique_nuclei)}
+
+        enu = np.zeros(len(T))
+        for r in self.rates:
+            if isinstance(r, TabularRate):
+                nuc = r.reactants[0]
+                # pylint: disable-next=protected-access
+                nu_loss = 10.0**r._interpolate(T, rho * y_e, TableIndex.NU.value)
+                enu += constants.N_A * X[:, nuc_index[nuc]] / nuc.A * nu_loss
+
+        enuc -= enu
+        if return_enu:
+            return enuc, enu
+        return enuc
+
     def _get_network_chart(self, rho, T, composition):
         """a network chart is a dict, keyed by rate that holds a list of tuples (Nucleus, ydot)"""
 
@@ -1667,7 +1961,7 @@ class RateCollection:
         to set the cutoff of values that we show, relative to the peak.  Any
         Jacobian element smaller than this will not be shown."""
 
-        jac = self.evaluate_jacobian(rho, T, comp, screen_func=screen_func)
+        jac = self.evaluate_jacobian(rho, T, comp, screen_func=screen_func, dense=True)
 
         valid_max = np.abs(jac).max()
 
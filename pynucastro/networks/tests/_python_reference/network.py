@@ -419,3 +419,14 @@ def jacobian_eq(t, Y, rho, T, screen_func):
        )
 
     return jac
+
+def warmup(screen_funcs=(None,)):
+    """compile rhs_eq and jacobian_eq for the argument types used by rhs
+    and jacobian (float t, rho, and T and contiguous float64 arrays) and
+    each of the screening functions in screen_funcs, without evaluating
+    the network"""
+    for screen_func in screen_funcs:
+        sig = (numba.float64, numba.float64[::1], numba.float64, numba.float64,
+               numba.typeof(screen_func))
+        rhs_eq.compile(sig)
+        jacobian_eq.compile(sig)
@@ -113,6 +113,56 @@ def He4_Mg24__Si28__removed(rate_eval, tf):
         del app
         del sys.modules["app"]
 
+    def test_burn_zones(self, pynet):
+        app = pynet.compile(zones=True)
+
+        # the zone functions are only generated on request
+        assert not hasattr(pynet.compile(), "burn_zones")
+
+        rho = 1.e7
+        T = np.array([2.5e9, 3.e9, 3.5e9])
+
+        X0 = np.zeros(app.nnuc)
+        X0[app.jhe4] = 0.5
+        X0[app.jmg24] = 0.5
+
+        Y0 = np.tile(X0 / app.A, (len(T), 1))
+
+        ydots = app.rhs_zones(0.0, Y0, rho, T, chugunov_2007)
+        for i, T_zone in enumerate(T):
+            assert ydots[i, :] == approx(app.rhs(0.0, Y0[i, :], rho, T_zone, chugunov_2007),
+                                         rel=1.e-14, abs=0.0)
+
+        tmax = 1.e-3
+        Y, nsteps = app.burn_zones(Y0, rho, T, tmax, chugunov_2007,
+                                   rtol=1.e-8, atol=1.e-14)
+        assert (nsteps > 0).all()
+
+        for i, T_zone in enumerate(T):
+            sol = solve_ivp(app.rhs, [0, tmax], Y0[i, :], method="BDF",
+                            jac=app.jacobian, args=(rho, T_zone, chugunov_2007),
+                            rtol=1.e-10, atol=1.e-16)
+            assert Y[i, :] == approx(sol.y[:, -1], rel=1.e-5, abs=1.e-20)
+
+        with pytest.raises(RuntimeError):
+            app.burn_zones(Y0, rho, T, tmax, chugunov_2007, max_steps=2)
+
+    def test_temperature_derivatives(self, pynet):
+        app = pynet.compile(temperature_derivatives=True)
+
+        rho = 1.e7
+        T = 2.1e9
+
+        Y = np.ones(app.nnuc) / app.nnuc
+
+        for screen_func in [None, chugunov_2007]:
+            _, _, ydot_dT = app.rhs_jac_dT(0.0, Y, rho, T, screen_func)
+
+            dT = 1.e-6 * T
+            ydot_dT_fd = (app.rhs(0.0, Y, rho, T + dT, screen_func) -
+                          app.rhs(0.0, Y, rho, T - dT, screen_func)) / (2.0 * dT)
+            assert ydot_dT == approx(ydot_dT_fd, rel=1.e-6)
+
     def test_to_composition(self, pynet):
         pynet.write_network("app.py")
         app = importlib.import_module("app")
@@ -1,11 +1,16 @@
+import importlib.util
+import linecache
 import shutil
 from pathlib import Path
 
 import numpy as np
 import pytest
 from numpy.testing import assert_allclose
+from scipy import constants
 
 from pynucastro import networks
+from pynucastro.networks import python_network
+from pynucastro.screening import screen5
 
 
 class TestFullPythonNetwork:
@@ -69,3 +74,182 @@ class TestFullPythonNetwork:
                                    4.712856e-06])
 
         assert_allclose(ydot, ydot_benchmark, rtol=1.e-6)
+
+    def test_compile(self, fn):
+        net = fn.compile()
+
+        # compiling the same network again reuses the module
+        assert fn.compile() is net
+
+        # only the most recently compiled networks are kept
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(python_network, "_MAX_COMPILED_NETWORKS", 1)
+            sparse_net = fn.compile(sparse_jacobian=True)
+            assert list(python_network._compiled_networks.values()) == [sparse_net]
+            assert f"<{net.__name__}>" not in linecache.cache
+            assert f"<{sparse_net.__name__}>" in linecache.cache
+            assert fn.compile() is not net
+
+        X = np.zeros(net.nnuc)
+        X[:] = 1.0 / net.nnuc
+        Y = X * net.nnuc
+
+        rho = 1.e8
+        T = 1.e9
+
+        ydot = net.rhs(0.0, Y, rho, T)
+
+        ydot_benchmark = np.array([-1.129734e-03,  1.979093e-03, -1.702699e+06,  5.667057e+05,
+                                   6.454310e+02,  1.044892e-03, -1.1838042e-2,  1.268268e-02,
+                                   4.712856e-06])
+
+        assert_allclose(ydot, ydot_benchmark, rtol=1.e-6)
+
+        comp = net.to_composition(Y)
+        jac = fn.evaluate_jacobian(rho, T, comp, dense=True)
+        assert_allclose(net.jacobian(0.0, Y, rho, T), jac, rtol=1.e-12, atol=0)
+
+    def test_write_network_cache(self, fn, tmp_path):
+        fn.write_network(outfile=tmp_path/"cached_network.py", cache=True)
+
+        spec = importlib.util.spec_from_file_location("cached_network",
+                                                      tmp_path/"cached_network.py")
+        net = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(net)
+
+        # compile ahead of time -- this stores the compiled code
+        net.warmup(screen_funcs=(None, screen5))
+        assert len(net.rhs_eq.signatures) == 1
+        assert list((tmp_path/"__pycache__").glob("cached_network.rhs_eq-*.nbi"))
+
+        X = np.zeros(net.nnuc)
+        X[:] = 1.0 / net.nnuc
+        Y = X * net.nnuc
+
+        rho = 1.e8
+        T = 1.e9
+
+        ref = fn.compile()
+        for screen_func in [None, screen5]:
+            assert_allclose(net.rhs(0.0, Y, rho, T, screen_func),
+                            ref.rhs(0.0, Y, rho, T, screen_func), rtol=1.e-14)
+            assert_allclose(net.jacobian(0.0, Y, rho, T, screen_func),
+                            ref.jacobian(0.0, Y, rho, T, screen_func), rtol=1.e-14)
+
+        # no new compilation was needed for the calls
+        assert len(net.rhs_eq.signatures) == 1
+
+        with pytest.raises(ValueError):
+            net.rhs(0.0, Y, rho, T, lambda state, scn_fac: 1.0)
+
+        with pytest.raises(ValueError):
+            fn.write_network(cache=True)
+
+    def test_sparse_jacobian(self, fn):
+        net = fn.compile()
+        sparse_net = fn.compile(sparse_jacobian=True)
+        assert sparse_net is not net
+
+        X = np.zeros(net.nnuc)
+        X[:] = 1.0 / net.nnuc
+        Y = X * net.nnuc
+
+        rho = 1.e8
+        T = 1.e9
+
+        jac = net.jacobian(0.0, Y, rho, T, screen5)
+        sparse_jac = sparse_net.jacobian(0.0, Y, rho, T, screen5)
+        assert sparse_jac.format == "csr"
+        assert sparse_jac.nnz == sparse_net.jac_nnz < net.nnuc**2
+        assert_allclose(sparse_jac.toarray(), jac, rtol=1.e-14, atol=0)
+
+        # everything outside of the sparsity pattern is zero
+        sparsity = sparse_net.jac_sparsity().toarray()
+        assert (sparsity == fn.get_jacobian_sparsity().toarray()).all()
+        assert (jac[~sparsity] == 0.0).all()
+
+    @pytest.mark.parametrize("sparse_jacobian", [False, True])
+    def test_rhs_jac(self, fn, sparse_jacobian):
+        # the fused function is only generated on request
+        assert not hasattr(fn.compile(sparse_jacobian=sparse_jacobian), "rhs_jac")
+
+        net = fn.compile(sparse_jacobian=sparse_jacobian, fused=True)
+        net.warmup(screen_funcs=(screen5,), fused=True)
+        assert len(net.rhs_jac_eq.signatures) == 1
+
+        X = np.zeros(net.nnuc)
+        X[:] = 1.0 / net.nnuc
+        Y = X * net.nnuc
+
+        rho = 1.e8
+        T = 1.e9
+
+        ydot, jac = net.rhs_jac(0.0, Y, rho, T, screen5)
+        assert_allclose(ydot, net.rhs(0.0, Y, rho, T, screen5), rtol=0, atol=0)
+        if sparse_jacobian:
+            assert_allclose(jac, net.jacobian(0.0, Y, rho, T, screen5).data, rtol=0, atol=0)
+        else:
+            assert_allclose(jac, net.jacobian(0.0, Y, rho, T, screen5), rtol=0, atol=0)
+
+        # the results are stored in the arrays we pass in
+        ydot_buf = np.full_like(ydot, np.nan)
+        jac_buf = np.full_like(jac, np.nan)
+        ydot2, jac2 = net.rhs_jac(0.0, Y, rho, T, screen5, dYdt=ydot_buf, jac=jac_buf)
+        assert ydot2 is ydot_buf and jac2 is jac_buf
+        assert_allclose(ydot_buf, ydot, rtol=0, atol=0)
+        assert_allclose(jac_buf, jac, rtol=0, atol=0)
+
+        # no new compilation was needed for the calls
+        assert len(net.rhs_jac_eq.signatures) == 1
+
+    @pytest.mark.parametrize("sparse_jacobian", [False, True])
+    def test_temperature_derivatives(self, fn, sparse_jacobian):
+        net = fn.compile(sparse_jacobian=sparse_jacobian, temperature_derivatives=True)
+
+        X = np.zeros(net.nnuc)
+        X[:] = 1.0 / net.nnuc
+        Y = X * net.nnuc
+
+        # stay away from the table grid points of the tabular rates,
+        # where the derivative is discontinuous
+        rho = 1.e8
+        T = 1.2e9
+
+        for screen_func in [None, screen5]:
+            ydot, jac, ydot_dT = net.rhs_jac_dT(0.0, Y, rho, T, screen_func)
+            assert_allclose(ydot, net.rhs(0.0, Y, rho, T, screen_func), rtol=1.e-14)
+            if sparse_jacobian:
+                jac_ref = net.jacobian(0.0, Y, rho, T, screen_func)
+                assert_allclose(jac, jac_ref.data, rtol=1.e-14)
+                jac = jac_ref.toarray()
+            else:
+                assert_allclose(jac, net.jacobian(0.0, Y, rho, T, screen_func), rtol=1.e-14)
+
+            dT = 1.e-6 * T
+            ydot_dT_fd = (net.rhs(0.0, Y, rho, T + dT, screen_func) -
+                          net.rhs(0.0, Y, rho, T - dT, screen_func)) / (2.0 * dT)
+            assert_allclose(ydot_dT, ydot_dT_fd, rtol=1.e-6)
+
+            # now the system with the energy equation
+            cv = 1.e8
+            y = np.append(Y, T)
+
+            f = net.rhs_temp(0.0, y, rho, cv, screen_func)
+            assert_allclose(f[:net.nnuc], ydot, rtol=1.e-14)
+            assert f[net.jtemp] == pytest.approx(net.energy_release(ydot) / cv, rel=1.e-12)
+
+            jac_temp = net.jacobian_temp(0.0, y, rho, cv, screen_func)
+            if sparse_jacobian:
+                jac_temp = jac_temp.toarray()
+            assert_allclose(jac_temp[:net.nnuc, :net.nnuc], jac, rtol=1.e-14)
+            assert_allclose(jac_temp[:net.nnuc, net.jtemp], ydot_dT, rtol=1.e-14)
+
+            y_p = y.copy()
+            y_p[net.jtemp] += dT
+            y_m = y.copy()
+            y_m[net.jtemp] -= dT
+            f_dT_fd = (net.rhs_temp(0.0, y_p, rho, cv, screen_func) -
+                       net.rhs_temp(0.0, y_m, rho, cv, screen_func)) / (2.0 * dT)
+            assert_allclose(jac_temp[:, net.jtemp], f_dT_fd, rtol=1.e-6)
+            assert_allclose(jac_temp[net.jtemp, :net.nnuc],
+                            -constants.Avogadro * (net.mass @ jac) / cv, rtol=1.e-12)
@@ -46,3 +46,34 @@ class TestNSE:
         assert nse_Xs[2] == pytest.approx(0.006705879462385593, rel=1.0e-10)
         assert nse_Xs[3] == pytest.approx(0.5003022847190655, rel=1.0e-10)
         assert nse_Xs[4] == pytest.approx(0.02081096528594651, rel=1.0e-10)
+
+    @pytest.mark.parametrize("init_guess", [(0.0, 0.0), (-30.0, -30.0), (10.0, -40.0)])
+    def test_nse_init_guess(self, pynet, init_guess):
+
+        rho = 1.0e7
+        T = 6.0e9
+        ye = 0.5
+
+        ref_comp, ref_sol = pynet.get_comp_nse(rho, T, ye, use_coulomb_corr=True,
+                                               return_sol=True)
+        nse_comp, sol = pynet.get_comp_nse(rho, T, ye, init_guess=init_guess,
+                                           use_coulomb_corr=True, return_sol=True)
+
+        assert sol == pytest.approx(ref_sol, rel=1.0e-10)
+        for nuc, X in nse_comp.X.items():
+            assert X == pytest.approx(ref_comp.X[nuc], rel=1.0e-8)
+
+        assert sum(nse_comp.X.values()) == pytest.approx(1.0, abs=1.0e-13)
+        assert nse_comp.eval_ye() == pytest.approx(ye, abs=1.0e-13)
+
+    @pytest.mark.parametrize("rho, T, ye", [(1.0e7, 6.0e9, 0.5), (1.0e9, 4.0e9, 0.495),
+                                            (1.0e5, 1.0e10, 0.7), (1.0e10, 8.0e9, 0.55)])
+    def test_nse_constraints(self, pynet, rho, T, ye):
+
+        nse_comp = pynet.get_comp_nse(rho, T, ye, use_coulomb_corr=True)
+
+        # the composition satisfies the NSE constraints to roundoff --
+        # the exponent of each X is a sum of terms as large as ~1e3
+        # that nearly cancel, so X itself is only good to ~1e-13
+        assert sum(nse_comp.X.values()) == pytest.approx(1.0, abs=1.0e-12)
+        assert nse_comp.eval_ye() == pytest.approx(ye, abs=1.0e-12)
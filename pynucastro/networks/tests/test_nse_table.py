@@ -2,6 +2,7 @@ from pathlib import Path
 
 import numpy as np
 import pytest
+from pytest import approx
 
 import pynucastro as pyna
 from pynucastro import Nucleus
@@ -62,12 +63,48 @@ class TestNSETable:
         base_path = Path(__file__).parent.relative_to(Path.cwd())
         ref_path = base_path/"_nse_table"
 
-        with open("nse.tbl") as new_table, open(f"{ref_path}/nse.tbl") as ref_table:
+        new = np.loadtxt("nse.tbl")
+        ref = np.loadtxt(f"{ref_path}/nse.tbl")
+        assert new.shape == ref.shape
 
-            new_lines = new_table.readlines()
-            ref_lines = ref_table.readlines()
+        # the benchmark was made with the old fsolve-based solver,
+        # whose solutions only satisfied the NSE constraints to ~1e-7,
+        # so we compare to 1e-6 relative.  The atol only matters for
+        # entries that are many orders of magnitude below the others
+        # in their column (like X ~ 1e-99).  dAbar/dt is a sum of weak
+        # rates that nearly cancel, so it is at the roundoff level
+        # for some states and is compared with a separate tolerance.
+        dabardt = 6
+        assert np.delete(new, dabardt, axis=1) == approx(np.delete(ref, dabardt, axis=1),
+                                                         rel=1.e-6, abs=1.e-30)
+        assert new[:, dabardt] == approx(ref[:, dabardt], abs=1.e-12)
 
-            for new, ref in zip(new_lines, ref_lines):
-                if new.startswith("#"):
-                    continue
-                assert new == ref
+    def test_generate_table_parallel(self, nse_net, tmp_path):
+
+        Ts = np.logspace(9.6, 10.4, 3)
+        rhos = np.logspace(7, 10, 4)
+        yes = np.linspace(0.43, 0.5, 3)
+
+        serial_file = tmp_path / "serial.tbl"
+        parallel_file = tmp_path / "parallel.tbl"
+
+        nse_net.generate_table(rho_values=rhos,
+                               T_values=Ts,
+                               Ye_values=yes,
+                               comp_reduction_func=self.get_reduced_comp,
+                               outfile=serial_file)
+
+        nse_net.generate_table(rho_values=rhos,
+                               T_values=Ts,
+                               Ye_values=yes,
+                               comp_reduction_func=self.get_reduced_comp,
+                               outfile=parallel_file, nprocs=2)
+
+        serial = np.loadtxt(serial_file)
+        parallel = np.loadtxt(parallel_file)
+
+        # dAbar/dt is a sum of weak rates that nearly cancel, so it
+        # depends on the initial guess at the roundoff level
+        dabardt = 6
+        assert np.all(np.delete(parallel, dabardt, axis=1) == np.delete(serial, dabardt, axis=1))
+        assert parallel[:, dabardt] == approx(serial[:, dabardt], abs=1.e-12)
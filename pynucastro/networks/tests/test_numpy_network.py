@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 from numpy.testing import assert_allclose
 
 import pynucastro as pyna
+from pynucastro.screening import chugunov_2007
 
 
 class TestNumpyNetwork:
@@ -36,6 +38,29 @@ class TestNumpyNetwork:
     def temp(self):
         return 1e8
 
+    def test_count_matrices(self, net):
+        net.clear_arrays()
+
+        # the reactants of he4(aa,g)c12
+        assert net.reactant_idx[-1, 0] == net.unique_nuclei.index(pyna.Nucleus("he4"))
+        assert net.reactant_count[-1, 0] == 3
+        assert (net.reactant_count[-1, 1:] == 0).all()
+
+        for i, r in enumerate(net.rates):
+            for n in set(r.reactants):
+                j = net.unique_nuclei.index(n)
+                assert net.nuc_cons_count_sparse[j, i] == r.reactants.count(n)
+            for n in set(r.products):
+                j = net.unique_nuclei.index(n)
+                assert net.nuc_prod_count_sparse[j, i] == r.products.count(n)
+
+        assert net.nuc_cons_count_sparse.nnz == sum(len(set(r.reactants)) for r in net.rates)
+        assert net.nuc_prod_count_sparse.nnz == sum(len(set(r.products)) for r in net.rates)
+
+        assert_allclose(net.nuc_prod_count, net.nuc_prod_count_sparse.toarray())
+        assert_allclose(net.nuc_cons_count, net.nuc_cons_count_sparse.toarray())
+        assert net.nuc_used.shape == (len(net.rates), len(net.unique_nuclei))
+
     def test_yfac_arr(self, net, comp):
         expected = [0.0001666666666666666, 0.0001538461538461538,
                     0.00021978021978021975, 0.0001538461538461538,
@@ -95,3 +120,139 @@ class TestNumpyNetwork:
         activity_arr = net.evaluate_activity_arr(temp)
 
         assert_allclose(activity_arr, expected, rtol=1e-10, atol=1e-100)
+
+    def test_evaluate_rates_arr_screening(self, net, rho, comp, temp):
+        rv = net.evaluate_rates(rho=rho, T=temp, composition=comp,
+                                screen_func=chugunov_2007)
+        expected = [rv[r] for r in net.rates]
+
+        net.clear_arrays()
+        net.update_yfac_arr(comp)
+        net.update_prefac_arr(rho, comp)
+        rates_arr = net.evaluate_rates_arr(temp, screen_func=chugunov_2007)
+
+        assert_allclose(rates_arr, expected, rtol=1e-10, atol=1e-100)
+
+
+class TestNumpyNetworkRateTypes:
+    """Make sure the vectorized methods handle approximate, derived, and
+    tabular rates."""
+
+    @pytest.fixture(scope="class")
+    def approx_net(self, reaclib_library):
+        lib = reaclib_library.linking_nuclei(["p", "he4", "mg24",
+                                              "al27", "si28", "p31", "s32"])
+        net = pyna.NumpyNetwork(libraries=[lib])
+        net.make_ap_pg_approx()
+        net.remove_nuclei(["al27", "p31"])
+        return net
+
+    @pytest.fixture(scope="class")
+    def derived_net(self, reaclib_library):
+        lib = reaclib_library.linking_nuclei(["p", "he4", "fe52", "co55",
+                                              "ni56", "cu59"],
+                                             with_reverse=False)
+        rates = lib.get_rates()
+        derived = [pyna.DerivedRate(r, compute_Q=False, use_pf=True)
+                   for r in rates if not r.weak]
+        return pyna.NumpyNetwork(rates=rates + derived)
+
+    @pytest.fixture(scope="class")
+    def tabular_net(self, reaclib_library, tabular_library):
+        lib = reaclib_library.linking_nuclei(["p", "he4", "c12", "o16",
+                                              "ne20", "na23", "mg24"],
+                                             with_reverse=False)
+        tlib = tabular_library.linking_nuclei(["ne23", "na23", "mg23"])
+        return pyna.NumpyNetwork(libraries=[lib, tlib])
+
+    @pytest.mark.parametrize("net_name, rho, T",
+                             [("approx_net", 1.e7, 2.5e9),
+                              ("derived_net", 1.e8, 4.2e9),
+                              ("tabular_net", 1.e9, 1.2e9)])
+    @pytest.mark.parametrize("screen_func", [None, chugunov_2007])
+    def test_evaluate_rates_arr(self, request, net_name, rho, T, screen_func):
+        net = request.getfixturevalue(net_name)
+
+        comp = pyna.Composition(net.unique_nuclei)
+        comp.set_solar_like()
+
+        rv = net.evaluate_rates(rho=rho, T=T, composition=comp,
+                                screen_func=screen_func)
+        expected = [rv[r] for r in net.rates]
+
+        net.clear_arrays()
+        net.update_yfac_arr(comp)
+        net.update_prefac_arr(rho, comp)
+        rates_arr = net.evaluate_rates_arr(T, screen_func=screen_func)
+
+        assert_allclose(rates_arr, expected, rtol=1e-10, atol=1e-100)
+
+        ydots = net.evaluate_ydots(rho=rho, T=T, composition=comp,
+                                   screen_func=screen_func)
+        expected = [ydots[nuc] for nuc in net.unique_nuclei]
+
+        assert_allclose(net.evaluate_ydots_arr(T, screen_func=screen_func),
+                        expected, rtol=1e-10, atol=1e-30)
+
+    @pytest.mark.parametrize("net_name", ["approx_net", "derived_net", "tabular_net"])
+    def test_evaluate_rates_arr_batched(self, request, net_name):
+        net = request.getfixturevalue(net_name)
+
+        comps = []
+        for seed in [1, 2, 3]:
+            comp = pyna.Composition(net.unique_nuclei)
+            comp.set_random(seed=seed)
+            comps.append(comp)
+        rho = np.array([1.e8, 3.e8, 1.e9])
+        T = np.array([1.2e9, 2.5e9, 3.3e9])
+
+        net.clear_arrays()
+        net.update_yfac_arr(comps)
+        net.update_prefac_arr(rho, comps)
+        rates_arr = net.evaluate_rates_arr(T, screen_func=chugunov_2007)
+        ydots_arr = net.evaluate_ydots_arr(T, screen_func=chugunov_2007)
+        assert rates_arr.shape == (len(T), len(net.rates))
+        assert ydots_arr.shape == (len(T), len(net.unique_nuclei))
+
+        for k, comp in enumerate(comps):
+            net.update_yfac_arr(comp)
+            net.update_prefac_arr(rho[k], comp)
+            assert_allclose(rates_arr[k], net.evaluate_rates_arr(T[k], screen_func=chugunov_2007),
+                            rtol=1e-12, atol=1e-100)
+            assert_allclose(ydots_arr[k], net.evaluate_ydots_arr(T[k], screen_func=chugunov_2007),
+                            rtol=1e-12, atol=1e-100)
+
+        # a single composition and density with many temperatures
+        net.update_yfac_arr(comps[0])
+        net.update_prefac_arr(rho[0], comps[0])
+        rates_arr = net.evaluate_rates_arr(T)
+        for k, T0 in enumerate(T):
+            assert_allclose(rates_arr[k], net.evaluate_rates_arr(T0), rtol=1e-12, atol=1e-100)
+
+        # the compositions given to update_yfac_arr and update_prefac_arr
+        # must agree
+        net.update_yfac_arr(comps)
+        net.update_prefac_arr(rho, comps[0])
+        with pytest.raises(ValueError):
+            net.evaluate_rates_arr(T, screen_func=chugunov_2007)
+
+    def test_evaluate_rates_arr_chunks(self, tabular_net, monkeypatch):
+        net = tabular_net
+
+        comps = []
+        for seed in range(5):
+            comp = pyna.Composition(net.unique_nuclei)
+            comp.set_random(seed=seed)
+            comps.append(comp)
+        rho = np.logspace(8, 9, 5)
+        T = np.linspace(1.e9, 3.e9, 5)
+
+        net.update_yfac_arr(comps)
+        net.update_prefac_arr(rho, comps)
+        rates_arr = net.evaluate_rates_arr(T, screen_func=chugunov_2007)
+
+        # evaluate two states at a time
+        monkeypatch.setattr(pyna.networks.numpy_network, "_MAX_CHUNK_ELEMENTS",
+                            2 * net.coef_arr.size)
+        assert_allclose(net.evaluate_rates_arr(T, screen_func=chugunov_2007), rates_arr,
+                        rtol=1e-14, atol=1e-100)
@@ -1,5 +1,6 @@
 # unit tests for rates
 import importlib
+import io
 import sys
 from pathlib import Path
 
@@ -96,6 +97,11 @@ def N14_p__O15__generic(rate_eval, tf):
 
         assert r_custom.function_string_py() == func
 
+    def test_temperature_derivatives(self, pynet):
+        # MyRate doesn't know how to compute its temperature derivative
+        with pytest.raises(ValueError):
+            pynet.write_network(outfile=io.StringIO(), temperature_derivatives=True)
+
     def test_evaluate_ydots(self, pynet):
         rho = 1.e4
         T = 4e7
@@ -47,6 +47,13 @@ class TestPythonNetwork:
         jac4 = rate4.jacobian_string_py(rate4.reactants[0])
         assert jac4 == "5.00000000000000e-01*rho**2*ye(Y)*2*Y[jp]*rate_eval.p_p__d__weak__electron_capture"
 
+    def test_rate_factor_string(self, rate1, rate2, rate4):
+        assert rate1.rate_factor_string_py() == "rho*rate_eval.p_C13__N14"
+
+        assert rate2.rate_factor_string_py() == "5.00000000000000e-01*rho**2*rate_eval.p_p_He4__He3_He3"
+
+        assert rate4.rate_factor_string_py() == "5.00000000000000e-01*rho**2*ye(Y)*rate_eval.p_p__d__weak__electron_capture"
+
     def test_function_string(self, rate1, rate2, rate3, rate4):
 
         ostr1 = """
@@ -2,6 +2,7 @@ import importlib
 import sys
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 import pynucastro as pyna
@@ -62,3 +63,57 @@ class TestPythonPartitionNetwork:
         # remove imported module from cache
         del der_net
         del sys.modules["der_net"]
+
+    def test_partition_derivatives(self, pynet):
+        """test the temperature derivatives of the rates with
+        partition functions from the python network"""
+        der_net = pynet.compile(temperature_derivatives=True)
+
+        def eval_rates(T):
+            rate_eval = der_net.RateEval()
+            tf = pyna.Tfactors(T)
+            der_net.p_Co55__He4_Fe52__derived(rate_eval, tf)
+            der_net.Ni56__p_Co55__derived(rate_eval, tf)
+            return rate_eval
+
+        # the partition functions are linearly interpolated, so we
+        # stay away from the temperatures they are tabulated at
+        for T in [3.3e9, 5.7e9]:
+            dT = 1.e-6 * T
+            rate_eval = eval_rates(T)
+            rate_eval_p = eval_rates(T + dT)
+            rate_eval_m = eval_rates(T - dT)
+
+            for name in ["p_Co55__He4_Fe52__derived", "Ni56__p_Co55__derived"]:
+                drate_dT_fd = (getattr(rate_eval_p, name) - getattr(rate_eval_m, name)) / (2.0 * dT)
+                assert getattr(rate_eval, f"{name}_dT") == pytest.approx(drate_dT_fd, rel=1.e-6)
+
+        rho = 1.e7
+        Y = np.ones(der_net.nnuc) / der_net.nnuc
+        _, _, ydot_dT = der_net.rhs_jac_dT(0.0, Y, rho, T)
+        ydot_dT_fd = (der_net.rhs(0.0, Y, rho, T + dT) -
+                      der_net.rhs(0.0, Y, rho, T - dT)) / (2.0 * dT)
+        assert ydot_dT == pytest.approx(ydot_dT_fd, rel=1.e-6)
+
+    def test_partition_derivatives_repeated(self, reaclib_library):
+        """the products of the reverse of O16 + O16 -> He4 + Si28
+        are identical nuclei, so the partition function correction
+        has a pf(O16)**2 factor.  pf(O16) only departs from 1 at
+        high temperatures."""
+        fwd = reaclib_library.get_rate_by_name("o16(o16,a)si28")
+        rev = pyna.DerivedRate(rate=fwd, compute_Q=False, use_pf=True)
+        assert rev.products == [pyna.Nucleus("o16"), pyna.Nucleus("o16")]
+
+        net = pyna.PythonNetwork(rates=[fwd, rev])
+        der_net = net.compile(temperature_derivatives=True)
+
+        def eval_rate(T):
+            rate_eval = der_net.RateEval()
+            getattr(der_net, rev.fname)(rate_eval, pyna.Tfactors(T))
+            return rate_eval
+
+        for T in [1.73e10, 2.37e10]:
+            dT = 1.e-6 * T
+            drate_dT_fd = (getattr(eval_rate(T + dT), rev.fname) -
+                           getattr(eval_rate(T - dT), rev.fname)) / (2.0 * dT)
+            assert getattr(eval_rate(T), f"{rev.fname}_dT") == pytest.approx(drate_dT_fd, rel=1.e-6)
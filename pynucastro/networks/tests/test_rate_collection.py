@@ -1,5 +1,7 @@
 # unit tests for a rate collection
+import numpy as np
 import pytest
+from pytest import approx
 
 import pynucastro as pyna
 
@@ -121,3 +123,73 @@ class TestUnimportantRates:
         assert rc.rates[0] not in unimportant
         assert rc.rates[3] not in unimportant
         assert unimportant.keys() == expected
+
+
+class TestRateCollectionBatch:
+    @pytest.fixture(scope="class")
+    def rc(self, reaclib_library, tabular_library):
+        # a network with ReacLib, derived, tabular, and approximate rates
+        fwd = reaclib_library.derived_forward().linking_nuclei(
+            ["p", "he4", "o16", "ne20", "na23", "mg24"],
+            with_reverse=False, print_warning=False)
+        derived = [pyna.DerivedRate(rate=r, compute_Q=False, use_pf=True)
+                   for r in fwd.get_rates()]
+        weak = tabular_library.get_rate_by_name(["na23(,)ne23", "ne23(,)na23"])
+
+        _rc = pyna.RateCollection(libraries=[fwd, pyna.Library(rates=derived)],
+                                  rates=weak)
+        _rc.make_ap_pg_approx(intermediate_nuclei=["na23"])
+        return _rc
+
+    @pytest.fixture(scope="class")
+    def states(self, rc):
+        rng = np.random.default_rng(seed=12)
+        nstates = 5
+        rho = 10.0**rng.uniform(7.5, 9.0, nstates)
+        T = rng.uniform(1.e9, 3.e9, nstates)
+        X = rng.dirichlet(np.ones(len(rc.unique_nuclei)), nstates)
+        return rho, T, X
+
+    def _comp(self, rc, X):
+        comp = pyna.Composition(rc.unique_nuclei)
+        comp.set_array(X)
+        return comp
+
+    def test_evaluate_rates_batch(self, rc, states):
+        assert rc.tabular_rates and rc.derived_rates and rc.approx_rates
+
+        for screen_func in [None, pyna.screening.chugunov_2007]:
+            rvals = rc.evaluate_rates_batch(*states, screen_func=screen_func)
+            assert rvals.shape == (len(states[1]), len(rc.rates))
+
+            for k, (rho, T, X) in enumerate(zip(*states)):
+                expected = rc.evaluate_rates(rho, T, self._comp(rc, X),
+                                             screen_func=screen_func)
+                assert rvals[k, :] == approx([expected[r] for r in rc.rates],
+                                             rel=1.e-14, abs=0)
+
+    def test_evaluate_ydots_batch(self, rc, states):
+        ydots = rc.evaluate_ydots_batch(*states, screen_func=pyna.screening.screen5)
+        assert ydots.shape == (len(states[1]), len(rc.unique_nuclei))
+
+        for k, (rho, T, X) in enumerate(zip(*states)):
+            expected = rc.evaluate_ydots(rho, T, self._comp(rc, X),
+                                         screen_func=pyna.screening.screen5)
+            expected = np.array([expected[n] for n in rc.unique_nuclei])
+            assert ydots[k, :] == approx(expected, rel=1.e-12,
+                                         abs=1.e-12 * np.abs(expected).max())
+
+    def test_evaluate_energy_generation_batch(self, rc, states):
+        enuc, enu = rc.evaluate_energy_generation_batch(*states, return_enu=True)
+
+        for k, (rho, T, X) in enumerate(zip(*states)):
+            expected = rc.evaluate_energy_generation(rho, T, self._comp(rc, X),
+                                                     return_enu=True)
+            assert enuc[k] == approx(expected[0], rel=1.e-10)
+            assert enu[k] == approx(expected[1], rel=1.e-12)
+
+    def test_single_state(self, rc, states):
+        rho, T, X = states
+        rvals = rc.evaluate_rates_batch(rho[0], T[0], X[0, :])
+        assert rvals.shape == (1, len(rc.rates))
+        assert rvals[0, :] == approx(rc.evaluate_rates_batch(*states)[0, :])
@@ -1,4 +1,5 @@
 # unit tests for a rate collection
+import numpy as np
 import pytest
 from pytest import approx
 
@@ -59,3 +60,36 @@ class TestRateCollectionJacobian:
 
         assert jac_alpha_alpha == approx(jac[0, 0])
         assert jac_c12_c12 == approx(jac[1, 1])
+
+    def test_jac_sparse(self, rc, comp):
+        rho = 1.e6
+        T = 5.e8
+
+        jac = rc.evaluate_jacobian(rho, T, comp, screen_func=pyna.screening.screen5)
+        assert jac.format == "csr"
+
+        dense = rc.evaluate_jacobian(rho, T, comp,
+                                     screen_func=pyna.screening.screen5, dense=True)
+        assert isinstance(dense, np.ndarray)
+        assert dense == approx(jac.toarray())
+
+        # compare to summing the individual rate terms
+        screen_factors = rc.evaluate_screening(rho, T, comp, pyna.screening.screen5)
+        for i, n_i in enumerate(rc.unique_nuclei):
+            for j, n_j in enumerate(rc.unique_nuclei):
+                val = 0.0
+                for r in rc.rates:
+                    c = r.products.count(n_i) - r.reactants.count(n_i)
+                    val += c * screen_factors.get(r, 1.0) * \
+                        r.eval_jacobian_term(T, rho, comp, n_j)
+                assert dense[i, j] == approx(val, rel=1.e-13, abs=1.e-100)
+
+    def test_jac_sparsity(self, rc):
+        sparsity = rc.get_jacobian_sparsity()
+
+        # rows are ordered He4, C12, O16, Ne20 -- nothing depends on Ne20
+        expected = np.array([[1, 1, 1, 0],
+                             [1, 1, 0, 0],
+                             [1, 1, 1, 0],
+                             [1, 1, 1, 0]], dtype=bool)
+        assert (sparsity.toarray() == expected).all()
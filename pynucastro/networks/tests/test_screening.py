@@ -31,6 +31,32 @@ class TestScreening:
         # two triple-alpha screening steps
         assert screening_map[2].rates[0] == screening_map[3].rates[0] == rc.rates[4]
 
+    def test_screening_cache(self, rc):
+        rc2 = networks.RateCollection(rates=rc.get_rates())
+
+        screening_map = rc2.get_screening_map()
+        assert [scr.name for scr in screening_map] == \
+            [scr.name for scr in get_screening_map(rc.get_rates())]
+        assert rc2.get_screening_map() is screening_map
+
+        scn_facs, pair_idx, pair_rates = rc2.get_screening_pairs()
+        assert list(scn_facs.z1) == [scr.n1.Z for scr in screening_map]
+        assert list(scn_facs.z2) == [scr.n2.Z for scr in screening_map]
+        assert list(pair_idx) == [0, 1, 1, 1, 2, 3]
+        assert pair_rates == [r for scr in screening_map for r in scr.rates]
+        assert rc2.get_screening_pairs()[0] is scn_facs
+
+        # changing the screening options or the rates invalidates the cache
+        rc2.do_screening = False
+        assert not rc2.get_screening_map()
+        rc2.do_screening = True
+        assert len(rc2.get_screening_map()) == 4
+
+        rc2.remove_rates(rc.rates[4])
+        assert len(rc2.get_screening_map()) == 2
+        rc2.add_rates(rc.rates[4])
+        assert len(rc2.get_screening_map()) == 4
+
     def test_screening_chugunov_2007(self, rc):
         c = networks.Composition(rc.unique_nuclei)
         c.set_solar_like()
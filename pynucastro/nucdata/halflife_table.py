@@ -1,13 +1,19 @@
 from pathlib import Path
 
+import numpy as np
+
+from pynucastro._cache import get_cache_file, read_npz, write_npz
+
 
 class HalfLifeTable:
     """
     Read the table of halflives (in seconds) extracted from the Nubase
-    compilation in halflife2020.txt
+    compilation in halflife2020.txt.  If use_cache is True, a binary
+    copy of the parsed table is kept in the pynucastro cache directory
+    and used on subsequent reads of the same file.
     """
 
-    def __init__(self, filename: str | Path = None) -> None:
+    def __init__(self, filename: str | Path = None, use_cache=False) -> None:
 
         self.halflife = {}
 
@@ -18,9 +24,19 @@ class HalfLifeTable:
             datafile_name = 'halflife2020.txt'
             self.filename = nucdata_dir/'AtomicMassEvaluation'/datafile_name
 
-        self._read_table()
+        self._read_table(use_cache)
 
-    def _read_table(self) -> None:
+    def _read_table(self, use_cache=False) -> None:
+
+        cache_file = None
+        if use_cache:
+            cache_file = get_cache_file("halflife_table", self.filename)
+            data = read_npz(cache_file)
+            if data is not None:
+                # stable nuclei are stored with a NaN halflife
+                taus = ["stable" if np.isnan(tau) else tau for tau in data["tau"].tolist()]
+                self.halflife = dict(zip(zip(data["A"].tolist(), data["Z"].tolist()), taus))
+                return
 
         with open(self.filename, "r") as f:
             # skip the header
@@ -34,6 +50,12 @@ class HalfLifeTable:
 
                 self.halflife[int(A), int(Z)] = tau
 
+        if cache_file is not None:
+            AZ = np.array(list(self.halflife), dtype=np.int64).reshape(-1, 2)
+            taus = [np.nan if tau == "stable" else tau for tau in self.halflife.values()]
+            write_npz(cache_file, A=AZ[:, 0], Z=AZ[:, 1],
+                      tau=np.array(taus, dtype=np.float64))
+
     def get_halflife(self, a: int, z: int) -> float | str:
         try:
             return self.halflife[a, z]
@@ -1,5 +1,9 @@
 from pathlib import Path
 
+import numpy as np
+
+from pynucastro._cache import get_cache_file, read_npz, write_npz
+
 
 class MassTable:
     """
@@ -14,9 +18,11 @@ class MassTable:
     The only required variable to construct an instance of this class is : var filename:
     that contains the .txt table file with the nuclei and their mass excess. If this
     variable is not provided, then mass_excess2020.txt is considered by default.
+    If use_cache is True, a binary copy of the parsed table is kept in the
+    pynucastro cache directory and used on subsequent reads of the same file.
     """
 
-    def __init__(self, filename: str | Path = None):
+    def __init__(self, filename: str | Path = None, use_cache=False):
 
         self.mass_diff = {}
 
@@ -27,9 +33,18 @@ class MassTable:
             datafile_name = 'mass_excess2020.txt'
             self.filename = nucdata_dir/'AtomicMassEvaluation'/datafile_name
 
-        self._read_table()
+        self._read_table(use_cache)
 
-    def _read_table(self) -> None:
+    def _read_table(self, use_cache=False) -> None:
+
+        cache_file = None
+        if use_cache:
+            cache_file = get_cache_file("mass_table", self.filename)
+            data = read_npz(cache_file)
+            if data is not None:
+                self.mass_diff = dict(zip(zip(data["A"].tolist(), data["Z"].tolist()),
+                                          data["dm"].tolist()))
+                return
 
         with self.filename.open("r") as f:
             # skip the header
@@ -37,6 +52,11 @@ class MassTable:
                 A, Z, dm = line.strip().split()[:3]
                 self.mass_diff[int(A), int(Z)] = float(dm)
 
+        if cache_file is not None:
+            AZ = np.array(list(self.mass_diff), dtype=np.int64).reshape(-1, 2)
+            write_npz(cache_file, A=AZ[:, 0], Z=AZ[:, 1],
+                      dm=np.array(list(self.mass_diff.values()), dtype=np.float64))
+
     def get_mass_diff(self, a: int, z: int) -> float:
         try:
             return self.mass_diff[a, z]
@@ -2,6 +2,7 @@
 Classes and methods to interface with files storing rate data.
 """
 
+import functools
 import re
 from pathlib import Path
 
@@ -16,13 +17,28 @@ _pynucastro_dir = Path(__file__).parents[1]
 _pynucastro_rates_dir = _pynucastro_dir/'library'
 _pynucastro_tabular_dir = _pynucastro_rates_dir/'tabular'
 
-# read the various tables with nuclear properties at the module-level
-_mass_table = MassTable()
-_halflife_table = HalfLifeTable()
-_spin_table = SpinTable(reliable=True)
+# the various tables with nuclear properties are read once, the first
+# time they are needed, and shared by all Nucleus objects
 
-# read the partition function table once and store it at the module-level
-_pcollection = PartitionFunctionCollection(use_high_temperatures=True, use_set='frdm')
+
+@functools.cache
+def _get_mass_table():
+    return MassTable(use_cache=True)
+
+
+@functools.cache
+def _get_halflife_table():
+    return HalfLifeTable(use_cache=True)
+
+
+@functools.cache
+def _get_spin_table():
+    return SpinTable(reliable=True, use_cache=True)
+
+
+@functools.cache
+def _get_pcollection():
+    return PartitionFunctionCollection(use_high_temperatures=True, use_set='frdm')
 
 
 class UnsupportedNucleus(Exception):
@@ -123,20 +139,20 @@ class Nucleus:
 
         # set the number of spin states
         try:
-            self.spin_states = _spin_table.get_spin_states(a=self.A, z=self.Z)
+            self.spin_states = _get_spin_table().get_spin_states(a=self.A, z=self.Z)
         except NotImplementedError:
             self.spin_states = None
 
-        # set a partition function object to every nucleus
-        try:
-            self.partition_function = _pcollection.get_partition_function(self.short_spec_name)
-        except ValueError:
-            self.partition_function = None
+        # the partition function is looked up the first time it is
+        # accessed, since reading the tables is expensive
+        self._partition_function = None
+        self._partition_function_set = False
 
         # nuclear mass
         try:
-            mass_H = _mass_table.get_mass_diff(a=1, z=1) + constants.m_u_MeV
-            self.dm = _mass_table.get_mass_diff(a=self.A, z=self.Z)
+            mass_table = _get_mass_table()
+            mass_H = mass_table.get_mass_diff(a=1, z=1) + constants.m_u_MeV
+            self.dm = mass_table.get_mass_diff(a=self.A, z=self.Z)
             self.A_nuc = float(self.A) + self.dm / constants.m_u_MeV
             self.mass = self.A * constants.m_u_MeV + self.dm
             B = (self.Z * mass_H + self.N * constants.m_n_MeV) - self.mass
@@ -150,10 +166,27 @@ class Nucleus:
 
         # halflife
         try:
-            self.tau = _halflife_table.get_halflife(a=self.A, z=self.Z)
+            self.tau = _get_halflife_table().get_halflife(a=self.A, z=self.Z)
         except NotImplementedError:
             self.tau = None
 
+    @property
+    def partition_function(self):
+        """the :class:`PartitionFunction` object for this nucleus, or
+        None if it is not tabulated"""
+        if not self._partition_function_set:
+            try:
+                self._partition_function = _get_pcollection().get_partition_function(self.short_spec_name)
+            except ValueError:
+                self._partition_function = None
+            self._partition_function_set = True
+        return self._partition_function
+
+    @partition_function.setter
+    def partition_function(self, pf):
+        self._partition_function = pf
+        self._partition_function_set = True
+
     @classmethod
     def from_cache(cls, name, dummy=False):
         key = (name.lower(), dummy)
@@ -231,7 +264,7 @@ def get_all_nuclei():
 
     nuc_list = []
 
-    for (A, Z) in _mass_table.mass_diff:
+    for (A, Z) in _get_mass_table().mass_diff:
         if Z == 0 and A == 1:
             nuc = "n"
         else:
@@ -3,6 +3,8 @@ from pathlib import Path
 import numpy as np
 from scipy.interpolate import InterpolatedUnivariateSpline
 
+from pynucastro._cache import get_cache_file, read_npz, write_npz
+
 
 class PartitionFunction:
     """
@@ -106,7 +108,8 @@ class PartitionFunction:
         self.interpolant_order = order
 
     def eval(self, T):
-        """Return the interpolated partition function value for the temperature T."""
+        """Return the interpolated partition function value for the
+        temperature T, which can be a scalar or a NumPy array."""
 
         # lazily construct the interpolant object, since it's pretty expensive
         if not self._interpolant:
@@ -116,7 +119,10 @@ class PartitionFunction:
                 k=self.interpolant_order
             )
         try:
-            T = float(T)/1.0e9
+            if np.ndim(T) == 0:
+                T = float(T)/1.0e9
+            else:
+                T = np.asarray(T, dtype=np.float64)/1.0e9
         except ValueError:
             print("invalid temperature")
             raise
@@ -131,15 +137,26 @@ class PartitionFunctionTable:
     "ni56". The table files are stored in the ``PartitionFunction``
     subdirectory.
 
+    The :class:`PartitionFunction` objects are only created when they
+    are first requested.  If use_cache is True, a binary copy of the
+    parsed table is kept in the pynucastro cache directory and used
+    on subsequent reads of the same file.
+
     :var name:         the name of the table (as defined in the data file)
     :var temperatures: an array of temperature values
     """
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, use_cache=False):
         self._partition_function = {}
         self.name = None
         self.temperatures = None
-        self._read_table(file_name)
+
+        # the tabulated values, one row for each nucleus, and a
+        # dictionary mapping the nucleus name to its row
+        self._values = None
+        self._nuclei_rows = {}
+
+        self._read_table(file_name, use_cache)
 
     def _add_nuclide_pfun(self, nuc, pfun):
         assert isinstance(nuc, str)
@@ -148,16 +165,31 @@ class PartitionFunctionTable:
 
     def get_nuclei(self):
         """Return a set of the nuclei this table supports."""
-        return set(self._partition_function)
+        return set(self._nuclei_rows) | set(self._partition_function)
 
     def get_partition_function(self, nuc):
         """Return the :class:`PartitionFunction` object for a specific nucleus."""
         assert isinstance(nuc, str)
+        if nuc not in self._partition_function and nuc in self._nuclei_rows:
+            pfun = PartitionFunction(nuc, self.name, self.temperatures,
+                                     self._values[self._nuclei_rows[nuc]])
+            self._add_nuclide_pfun(nuc, pfun)
         if nuc in self._partition_function:
             return self._partition_function[nuc]
         return None
 
-    def _read_table(self, file_name: str | Path):
+    def _read_table(self, file_name: str | Path, use_cache=False):
+        cache_file = None
+        if use_cache:
+            cache_file = get_cache_file("partition_function", file_name)
+            data = read_npz(cache_file)
+            if data is not None:
+                self.name = str(data["name"])
+                self.temperatures = data["temperatures"]
+                self._values = data["values"]
+                self._nuclei_rows = {nuc: i for i, nuc in enumerate(data["nuclei"].tolist())}
+                return
+
         with Path(file_name).open("r") as fin:
 
             # get headers name
@@ -184,13 +216,20 @@ class PartitionFunctionTable:
                 if ls:
                     lines.append(ls)
 
-        # Using .pop(0) twice we construct each nucleus partition function.
-        while lines:
-            nuc = lines.pop(0)
-            pfun_strings = lines.pop(0).split()
-            partitionfun = np.array(pfun_strings, dtype=np.float64)
-            pfun = PartitionFunction(nuc, self.name, self.temperatures, partitionfun)
-            self._add_nuclide_pfun(nuc, pfun)
+        # every other line is a nucleus, followed by its partition
+        # function values
+        nuclei = lines[0::2]
+        self._values = np.array([pfun_strings.split() for pfun_strings in lines[1::2]],
+                                dtype=np.float64).reshape(len(nuclei), -1)
+        for i, nuc in enumerate(nuclei):
+            assert nuc not in self._nuclei_rows
+            self._nuclei_rows[nuc] = i
+
+        if cache_file is not None:
+            write_npz(cache_file, name=np.array(self.name),
+                      temperatures=self.temperatures,
+                      nuclei=np.array(nuclei, dtype=str),
+                      values=self._values)
 
 
 class PartitionFunctionCollection:
@@ -223,17 +262,10 @@ class PartitionFunctionCollection:
         nucdata_dir = Path(__file__).parent
         partition_function_dir = nucdata_dir/'PartitionFunction'
 
-        pft = PartitionFunctionTable(file_name=partition_function_dir/'etfsiq_low.txt')
-        self._add_table(pft)
-
-        pft = PartitionFunctionTable(file_name=partition_function_dir/'frdm_low.txt')
-        self._add_table(pft)
-
-        pft = PartitionFunctionTable(file_name=partition_function_dir/'etfsiq_high.txt')
-        self._add_table(pft)
-
-        pft = PartitionFunctionTable(file_name=partition_function_dir/'frdm_high.txt')
-        self._add_table(pft)
+        for table_name in ['etfsiq_low', 'frdm_low', 'etfsiq_high', 'frdm_high']:
+            pft = PartitionFunctionTable(file_name=partition_function_dir/f'{table_name}.txt',
+                                         use_cache=True)
+            self._add_table(pft)
 
     def get_nuclei(self):
         """Return a set of all the nuclei this collection supports."""
@@ -1,5 +1,9 @@
 from pathlib import Path
 
+import numpy as np
+
+from pynucastro._cache import get_cache_file, read_npz, write_npz
+
 
 class SpinTable:
     """
@@ -10,9 +14,13 @@ class SpinTable:
 
     The variable reliable switch between using all the values of the tables, excluding the nuclei
     where only intervals are given and the values measured by strong experimental arguments.
+
+    If use_cache is True, a binary copy of the parsed table is kept in the pynucastro
+    cache directory and used on subsequent reads of the same file.
     """
 
-    def __init__(self, datafile: str | Path = None, reliable: bool = False) -> None:
+    def __init__(self, datafile: str | Path = None, reliable: bool = False,
+                 use_cache=False) -> None:
 
         self._spin_states = {}
         self.reliable = reliable
@@ -24,16 +32,33 @@ class SpinTable:
             datafile_name = 'nubase2020_1.txt'
             self.datafile = nucdata_dir/'AtomicMassEvaluation'/datafile_name
 
-        self._read_table()
+        self._read_table(use_cache)
 
-    def _read_table(self) -> None:
+    def _read_table(self, use_cache=False) -> None:
 
+        # the cache holds the full table, with a flag marking the
+        # experimentally measured values, so it serves both settings
+        # of reliable
+        cache_file = None
+        if use_cache:
+            cache_file = get_cache_file("spin_table", self.datafile)
+            data = read_npz(cache_file)
+            if data is not None:
+                for A, Z, spin_states, measured in zip(data["A"].tolist(), data["Z"].tolist(),
+                                                       data["spin_states"].tolist(),
+                                                       data["measured"].tolist()):
+                    if measured or not self.reliable:
+                        self._spin_states[A, Z] = spin_states
+                return
+
+        rows = []
         with self.datafile.open("r") as f:
 
             for line in f.readlines()[4:]:
 
                 A, Z, _, spin_states, experimental = line.strip().split()[:5]
                 A, Z, spin_states = int(A), int(Z), int(spin_states)
+                rows.append((A, Z, spin_states, experimental == 's'))
 
                 if self.reliable:
                     if experimental == 's':
@@ -43,6 +68,11 @@ class SpinTable:
                 else:
                     self._spin_states[A, Z] = spin_states
 
+        if cache_file is not None:
+            table = np.array(rows, dtype=np.int64).reshape(-1, 4)
+            write_npz(cache_file, A=table[:, 0], Z=table[:, 1],
+                      spin_states=table[:, 2], measured=table[:, 3].astype(bool))
+
     def get_spin_states(self, a: int, z: int) -> int:
         try:
             return self._spin_states[a, z]
@@ -0,0 +1,21 @@
+from pytest import approx
+
+from pynucastro.nucdata.halflife_table import HalfLifeTable
+
+
+class TestHalfLife:
+    def test_halflife_table(self):
+        _tau = HalfLifeTable()
+        assert _tau.get_halflife(a=1, z=0) == approx(609.8)
+        assert _tau.get_halflife(a=4, z=2) == "stable"
+
+    def test_halflife_table_cache(self, tmp_path, monkeypatch):
+
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", str(tmp_path))
+
+        # the first read creates the cache, the second one uses it
+        for _ in range(2):
+            _tau = HalfLifeTable(use_cache=True)
+            assert len(list(tmp_path.glob("halflife_table-*.npz"))) == 1
+            assert _tau.halflife == HalfLifeTable().halflife
+            assert _tau.get_halflife(a=4, z=2) == "stable"
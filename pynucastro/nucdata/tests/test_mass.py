@@ -9,3 +9,14 @@ class TestMass:
         assert _dm.get_mass_diff(a=1, z=0) == approx(8.0713181)
         assert _dm.get_mass_diff(a=4, z=2) == approx(2.42491587)
         assert _dm.get_mass_diff(a=295, z=118) == approx(201.37)
+
+    def test_mass_table_cache(self, tmp_path, monkeypatch):
+
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", str(tmp_path))
+
+        # the first read creates the cache, the second one uses it
+        for _ in range(2):
+            _dm = MassTable(use_cache=True)
+            assert len(list(tmp_path.glob("mass_table-*.npz"))) == 1
+            assert _dm.mass_diff == MassTable().mass_diff
+            assert _dm.get_mass_diff(a=4, z=2) == approx(2.42491587)
@@ -111,3 +111,23 @@ class TestPartition:
 
         assert self.pf_collection_frdm.get_partition_function('ne19') == ne19_pf_frdm_high + ne19_pf_frdm_low
         assert self.pf_collection_etfsiq.get_partition_function('co60') == co60_pf_etfsiq_low + co60_pf_etfsiq_high
+
+    def test_pf_table_cache(self, tmp_path, monkeypatch):
+
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", str(tmp_path))
+
+        # the first read creates the cache, the second one uses it
+        for _ in range(2):
+            pf_table = PartitionFunctionTable(dir_frdm_high, use_cache=True)
+            assert len(list(tmp_path.glob("partition_function-*.npz"))) == 1
+
+            assert pf_table.name == self.pf_table_frdm_high.name
+            assert all(pf_table.temperatures == self.pf_table_frdm_high.temperatures)
+            assert pf_table.get_nuclei() == self.pf_table_frdm_high.get_nuclei()
+
+            po188_pf_frdm_high = pf_table.get_partition_function('po188')
+            assert all(po188_pf_frdm_high.partition_function == ANSWER_FRDM_HIGH)
+            assert all(po188_pf_frdm_high.temperature == TEMPERATURES_HIGH)
+            assert pf_table.get_partition_function('po188') is po188_pf_frdm_high
+
+            assert pf_table.get_partition_function('xx999') is None
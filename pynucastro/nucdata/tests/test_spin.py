@@ -34,3 +34,15 @@ class TestSpin:
         assert self.spintable_gs_not_reliable.get_spin_states(a=91, z=46) == 8
         assert self.spintable_gs_not_reliable.get_spin_states(a=275, z=107) == 6
         assert self.spintable_gs_not_reliable.get_spin_states(a=11, z=8) == 4
+
+    def test_spin_table_cache(self, tmp_path, monkeypatch):
+
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", str(tmp_path))
+
+        # both settings of reliable share the same cache file
+        for _ in range(2):
+            for reliable, spintable in [(True, self.spintable_gs_reliable),
+                                        (False, self.spintable_gs_not_reliable)]:
+                cached = SpinTable(reliable=reliable, use_cache=True)
+                assert len(list(tmp_path.glob("spin_table-*.npz"))) == 1
+                assert cached._spin_states == spintable._spin_states  # pylint: disable=protected-access
@@ -151,10 +151,12 @@ class ApproximateRate(Rate):
 
         raise NotImplementedError(f"approximation type {self.approx_type} not supported")
 
-    def function_string_py(self):
+    def function_string_py(self, *, with_dT=False):
         """
         Return a string containing python function that computes the
-        approximate rate
+        approximate rate.  If with_dT is True, the function also
+        stores the temperature derivative of the rate in
+        rate_eval.{fname}_dT
         """
 
         if self.approx_type != "ap_pg":
@@ -175,6 +177,14 @@ class ApproximateRate(Rate):
             # now the approximation
             string += "    rate = r_ag + r_ap * r_pg / (r_pg + r_pa)\n"
 
+            if with_dT:
+                string += f"    drdT_ag = rate_eval.{self.rates['A(a,g)B'].fname}_dT\n"
+                string += f"    drdT_ap = rate_eval.{self.rates['A(a,p)X'].fname}_dT\n"
+                string += f"    drdT_pg = rate_eval.{self.rates['X(p,g)B'].fname}_dT\n"
+                string += f"    drdT_pa = rate_eval.{self.rates['X(p,a)A'].fname}_dT\n"
+                string += "    drate_dT = (drdT_ag + drdT_ap * r_pg / (r_pg + r_pa) + r_ap * drdT_pg / (r_pg + r_pa) -\n"
+                string += "                r_ap * r_pg * (drdT_pg + drdT_pa) / (r_pg + r_pa)**2)\n"
+
         else:
 
             # first we need to get all of the rates that make this up
@@ -186,7 +196,18 @@ class ApproximateRate(Rate):
             # now the approximation
             string += "    rate = r_ga + r_pa * r_gp / (r_pg + r_pa)\n"
 
-        string += f"    rate_eval.{self.fname} = rate\n\n"
+            if with_dT:
+                string += f"    drdT_ga = rate_eval.{self.rates['B(g,a)A'].fname}_dT\n"
+                string += f"    drdT_pa = rate_eval.{self.rates['X(p,a)A'].fname}_dT\n"
+                string += f"    drdT_gp = rate_eval.{self.rates['B(g,p)X'].fname}_dT\n"
+                string += f"    drdT_pg = rate_eval.{self.rates['X(p,g)B'].fname}_dT\n"
+                string += "    drate_dT = (drdT_ga + drdT_pa * r_gp / (r_pg + r_pa) + r_pa * drdT_gp / (r_pg + r_pa) -\n"
+                string += "                r_pa * r_gp * (drdT_pg + drdT_pa) / (r_pg + r_pa)**2)\n"
+
+        string += f"    rate_eval.{self.fname} = rate\n"
+        if with_dT:
+            string += f"    rate_eval.{self.fname}_dT = drate_dT\n"
+        string += "\n"
         return string
 
     def function_string_cxx(self, dtype="double", specifiers="inline", leave_open=False, extra_args=()):
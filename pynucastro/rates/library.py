@@ -1,15 +1,19 @@
 import collections
+import collections.abc
 import io
 import re
 from os import walk
 from pathlib import Path
 
+import numpy as np
+
+from pynucastro._cache import get_cache_file, read_npz, write_npz
 from pynucastro.nucdata import Nucleus, UnsupportedNucleus
 from pynucastro.rates.known_duplicates import (find_duplicate_rates,
                                                is_allowed_dupe)
 from pynucastro.rates.rate import (DerivedRate, Rate, RateFileError,
-                                   ReacLibRate, TabularRate, _find_rate_file,
-                                   get_rates_dir, load_rate)
+                                   ReacLibRate, SingleSet, TabularRate,
+                                   _find_rate_file, get_rates_dir, load_rate)
 
 
 def list_known_rates() -> None:
@@ -112,6 +116,210 @@ def capitalize_rid(rid, delimiter):
     return rid_mod
 
 
+def _nuclei_key(nuclei):
+    """ return a hashable key for a list of nuclei that does not
+    depend on their ordering """
+    return tuple(sorted(nuclei))
+
+
+class _LibraryIndex:
+    """
+    An inverted index for the rates in a Library, mapping the
+    (sorted) reactants and products, as well as the individual nuclei
+    participating as a reactant or product, to the ids of the rates
+    containing them.  We also store the position of each rate in the
+    library, so results can be returned in library order.
+    """
+
+    def __init__(self, rates):
+        self.position = {}
+        self._next_position = 0
+
+        self.by_reactants = collections.defaultdict(dict)
+        self.by_products = collections.defaultdict(dict)
+        self.by_reactant = collections.defaultdict(dict)
+        self.by_product = collections.defaultdict(dict)
+
+        # the rates from the cache don't need to be built to be indexed
+        link = rates.link if isinstance(rates, _CachedRates) else rates.__getitem__
+        for rid in rates:
+            self.add(rid, link(rid))
+
+    def __len__(self):
+        return len(self.position)
+
+    def add(self, rid, r):
+        """ add the rate r with id rid to the index """
+        if rid not in self.position:
+            self.position[rid] = self._next_position
+            self._next_position += 1
+
+        # dicts with None values are used as insertion-ordered sets
+        self.by_reactants[_nuclei_key(r.reactants)][rid] = None
+        self.by_products[_nuclei_key(r.products)][rid] = None
+        for nuc in r.reactants:
+            self.by_reactant[nuc][rid] = None
+        for nuc in r.products:
+            self.by_product[nuc][rid] = None
+
+    def remove(self, rid, r):
+        """ remove the rate r with id rid from the index """
+        self.position.pop(rid, None)
+        self.by_reactants[_nuclei_key(r.reactants)].pop(rid, None)
+        self.by_products[_nuclei_key(r.products)].pop(rid, None)
+        for nuc in r.reactants:
+            self.by_reactant[nuc].pop(rid, None)
+        for nuc in r.products:
+            self.by_product[nuc].pop(rid, None)
+
+    def sort(self, rids):
+        """ return the rate ids rids in library order """
+        return sorted(rids, key=self.position.__getitem__)
+
+    def candidates(self, rate_filter):
+        """ return the ids of the rates that can match the reactants
+        and products of the RateFilter rate_filter, or None if the
+        filter does not constrain the nuclei """
+
+        sets = []
+        for nuclei, by_all, by_each in [(rate_filter.reactants, self.by_reactants, self.by_reactant),
+                                        (rate_filter.products, self.by_products, self.by_product)]:
+            if not nuclei:
+                continue
+            if rate_filter.exact:
+                sets.append(by_all.get(_nuclei_key(nuclei), {}))
+            else:
+                sets += [by_each.get(nuc, {}) for nuc in nuclei]
+
+        if not sets:
+            return None
+
+        smallest = min(sets, key=len)
+        return [rid for rid in smallest if all(rid in s for s in sets)]
+
+
+_RateLink = collections.namedtuple("_RateLink", ["reactants", "products"])
+
+
+class _LibraryCache:
+    """
+    The columnar arrays written by Library._write_library_cache,
+    together with the rates built from them so far.  This is shared
+    by all of the libraries that use these rates (e.g., the sum of a
+    cached library and another library), so each rate is only built
+    once.
+    """
+
+    def __init__(self, data):
+        self.rids = data["rid"].tolist()
+        self.chunk_ptr = data["chunk_ptr"]
+        self.chapter = data["chapter"]
+        self.reaclib = data["reaclib"]
+        self.labelprops = data["labelprops"]
+        self.Q = data["Q"]
+        self.coeffs = data["coeffs"]
+        self.source_offsets = data["source_offsets"]
+        self.source_buffer = data["source_buffer"]
+        self.nucleus_names = data["nucleus_names"]
+        self.nuclei = data["nuclei"]
+        self.n_reactants = data["n_reactants"]
+
+        if len(self.chunk_ptr) != len(self.rids) + 1 or \
+           len(self.source_offsets) != len(self.chapter) + 1 or \
+           len(self.nuclei) != len(self.rids):
+            raise ValueError("inconsistent library cache")
+
+        self.built = [None] * len(self.rids)
+        self._links = None
+
+    def link(self, i):
+        """ return the reactants and products of rate i """
+        if self._links is None:
+            # the rows of nuclei are padded with -1
+            nucs = np.array([Nucleus.from_cache(name) for name in self.nucleus_names.tolist()] + [None],
+                            dtype=object)
+            n_nuclei = np.count_nonzero(self.nuclei >= 0, axis=1).tolist()
+            self._links = [_RateLink(row[:nr], row[nr:n])
+                           for row, nr, n in zip(nucs[self.nuclei].tolist(),
+                                                 self.n_reactants.tolist(), n_nuclei)]
+        return self._links[i]
+
+    def rate(self, i):
+        """ return rate i, building it the first time it is needed """
+        r = self.built[i]
+        if r is None:
+            for k in range(self.chunk_ptr[i], self.chunk_ptr[i+1]):
+                rk = self._chunk_rate(k, i)
+                r = rk if r is None else r + rk
+            self.built[i] = r
+        return r
+
+    def _chunk_rate(self, k, i):
+        """ build the rate in chunk k, which is part of rate i """
+        source = self.source_buffer[self.source_offsets[k]:self.source_offsets[k+1]].tobytes().decode("utf-8")
+        if not self.reaclib[k]:
+            return TabularRate(rfile=io.StringIO(source))
+        link = self.link(i)
+        labelprops = str(self.labelprops[k])
+        return ReacLibRate(chapter=int(self.chapter[k]), original_source=source,
+                           reactants=list(link.reactants), products=list(link.products),
+                           sets=[SingleSet(self.coeffs[k].tolist(), labelprops=labelprops)],
+                           labelprops=labelprops, Q=float(self.Q[k]))
+
+
+class _CachedRates(collections.abc.MutableMapping):
+    """
+    The rate dictionary of a Library read from the binary cache.
+    This behaves like a dict of rate id -> Rate, but a rate from the
+    cache is only built when it is accessed.  The ids, reactants, and
+    products of the rates are available without building them, so the
+    library can be indexed cheaply.
+    """
+
+    def __init__(self, cache, rates=None):
+        self._cache = cache
+        # the values are either the position of the rate in the
+        # cache or a Rate object added to the library
+        if rates is None:
+            rates = {rid: i for i, rid in enumerate(cache.rids)}
+        self._rates = rates
+
+    def __getitem__(self, rid):
+        r = self._rates[rid]
+        if isinstance(r, int):
+            return self._cache.rate(r)
+        return r
+
+    def __setitem__(self, rid, r):
+        self._rates[rid] = r
+
+    def __delitem__(self, rid):
+        del self._rates[rid]
+
+    def __iter__(self):
+        return iter(self._rates)
+
+    def __len__(self):
+        return len(self._rates)
+
+    def __contains__(self, rid):
+        return rid in self._rates
+
+    def copy(self):
+        """ return a copy that shares the cached rates """
+        return _CachedRates(self._cache, dict(self._rates))
+
+    def link(self, rid):
+        """ return an object with the reactants and products of the
+        rate rid, without building the rate """
+        r = self._rates[rid]
+        if isinstance(r, int):
+            if self._cache.built[r] is not None:
+                return self._cache.built[r]
+            return self._cache.link(r)
+        return r
+
+
 class Library:
     """
     A Library is a Rate container that reads a single file
@@ -120,16 +328,24 @@ class Library:
 
     The Library class also implements searching based on rules
     specified by RateFilter objects.
+
+    If use_cache is True, then a binary copy of the parsed library
+    file is stored in the pynucastro cache directory and used on
+    subsequent reads of the same file.  The rates are then only built
+    from the cached data as they are needed.
     """
 
-    def __init__(self, libfile=None, rates=None):
+    def __init__(self, libfile=None, rates=None, use_cache=False):
         self._library_file = libfile
+        self._use_cache = use_cache
         if rates:
             self._rates = None
             if isinstance(rates, Rate):
                 rates = [rates]
-            if isinstance(rates, dict):
-                self._rates = rates
+            if isinstance(rates, (dict, _CachedRates)):
+                # each library owns its dictionary, so the index can't
+                # be changed behind its back by another library
+                self._rates = rates.copy()
             elif isinstance(rates, (list, set)):
                 self._add_from_rate_list(rates)
             else:
@@ -138,6 +354,9 @@ class Library:
             self._rates = {}
         self._library_source_lines = collections.deque()
 
+        # the nucleus -> rate index is built the first time it is needed
+        self._index = None
+
         if self._library_file:
             self._library_file = _find_rate_file(self._library_file)
             self._read_library_file()
@@ -176,7 +395,30 @@ class Library:
                 raise ValueError(f"supplied a Rate object already in the Library: {r}")
             self._rates[rid] = r
 
+    def _get_index(self):
+        """ Return the index of the rates in this library, (re)building
+        it if needed. """
+        if self._index is None:
+            self._index = _LibraryIndex(self._rates)
+        return self._index
+
     def _read_library_file(self):
+        self._index = None
+
+        # if we have a binary copy of the parsed library, use it
+        cache_file = None
+        if self._use_cache:
+            cache_file = get_cache_file("library", self._library_file)
+            data = read_npz(cache_file)
+            if data is not None:
+                try:
+                    # the rates are only built when they are needed
+                    self._rates = _CachedRates(_LibraryCache(data))
+                except (KeyError, ValueError, IndexError):
+                    self._rates = {}
+                else:
+                    return
+
         # loop through library file, read lines
         with self._library_file.open("r") as flib:
             for line in flib:
@@ -184,6 +426,9 @@ class Library:
                 if ls.strip():
                     self._library_source_lines.append(ls)
 
+        # the parsed chunks we store in the cache
+        chunks = []
+
         # identify distinct rates from library lines
         current_chapter = None
         while True:
@@ -217,8 +462,8 @@ class Library:
                 rlines = [self._library_source_lines.popleft() for i in range(3)]
                 rate_type = "reaclib"
             if rlines:
-                sio = io.StringIO('\n'.join([f'{chapter}'] +
-                                            rlines))
+                source = '\n'.join([f'{chapter}'] + rlines)
+                sio = io.StringIO(source)
                 #print(sio.getvalue())
                 try:
                     if rate_type == "reaclib":
@@ -230,11 +475,76 @@ class Library:
                 except UnsupportedNucleus:
                     pass
                 else:
-                    rid = r.get_rate_id()
-                    if rid in self._rates:
-                        self._rates[rid] = self._rates[rid] + r
-                    else:
-                        self._rates[rid] = r
+                    chunks.append((source, r))
+                    self._merge_rate(r)
+
+        if cache_file is not None:
+            self._write_library_cache(cache_file, chunks, list(self._rates))
+
+    def _merge_rate(self, r):
+        """ Add the rate r to the library, combining it with an existing
+        rate with the same id. """
+        rid = r.get_rate_id()
+        if rid in self._rates:
+            self._rates[rid] = self._rates[rid] + r
+        else:
+            self._rates[rid] = r
+        self._index = None
+
+    @staticmethod
+    def _write_library_cache(cache_file, chunks, rids):
+        """ Store the parsed library chunks as columnar arrays in
+        cache_file.  Each chunk is a tuple of its source text and the
+        rate parsed from it (a single-set ReacLibRate or a
+        TabularRate), and rids are the ids of the rates in the
+        library, which combine the chunks with the same id. """
+
+        # group the chunks by rate, keeping their order in the file
+        position = {rid: i for i, rid in enumerate(rids)}
+        rate_of_chunk = np.array([position[r.get_rate_id()] for _, r in chunks], dtype=np.int64)
+        order = np.argsort(rate_of_chunk, kind="stable")
+        chunks = [chunks[k] for k in order]
+        chunk_ptr = np.searchsorted(rate_of_chunk[order], np.arange(len(rids) + 1))
+
+        nchunks = len(chunks)
+        chapter = np.full(nchunks, -1, dtype=np.int32)
+        reaclib = np.zeros(nchunks, dtype=bool)
+        labelprops = np.full(nchunks, "", dtype="U6")
+        Q = np.zeros(nchunks)
+        coeffs = np.zeros((nchunks, 7))
+
+        for k, (_, r) in enumerate(chunks):
+            if not isinstance(r, ReacLibRate):
+                continue
+            reaclib[k] = True
+            chapter[k] = r.chapter
+            labelprops[k] = r.sets[0].labelprops
+            Q[k] = r.Q
+            coeffs[k, :] = r.sets[0].a
+
+        # the nuclei of each rate, so the library can be indexed
+        # without building the rates: each row holds the positions
+        # of the nuclei in nucleus_names, padded with -1
+        links = [chunks[k][1] for k in chunk_ptr[:-1]]
+        codes = {}
+        rows = [[codes.setdefault(n.raw, len(codes)) for n in r.reactants + r.products]
+                for r in links]
+        width = max((len(row) for row in rows), default=0)
+        nuclei = np.array([row + [-1] * (width - len(row)) for row in rows],
+                          dtype=np.int32).reshape(len(rows), width)
+        n_reactants = np.array([len(r.reactants) for r in links], dtype=np.int8)
+
+        # store the source text as a single byte buffer + offsets
+        encoded = [source.encode("utf-8") for source, _ in chunks]
+        offsets = np.zeros(nchunks + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(e) for e in encoded])
+        source_buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        write_npz(cache_file, rid=np.array(rids, dtype=str), chunk_ptr=chunk_ptr,
+                  chapter=chapter, reaclib=reaclib, labelprops=labelprops, Q=Q,
+                  coeffs=coeffs, nucleus_names=np.array(list(codes), dtype=str),
+                  nuclei=nuclei, n_reactants=n_reactants,
+                  source_offsets=offsets, source_buffer=source_buffer)
 
     def write_to_file(self, filename, prepend_rates_dir=False):
         """
@@ -269,7 +579,7 @@ class Library:
 
     def __add__(self, other):
         """ Add two libraries to get a library containing rates from both. """
-        new_rates = self._rates
+        new_rates = self._rates.copy()
         for rid, r in other._rates.items():
             if rid in new_rates:
                 if r != new_rates[rid]:
@@ -308,11 +618,11 @@ class Library:
 
     def get_rate_by_nuclei(self, reactants, products):
         """given a list of reactants and products, return any matching rates"""
-        reactants = sorted(Nucleus.cast_list(reactants))
-        products = sorted(Nucleus.cast_list(products))
-        _tmp = [r for r in self.get_rates() if
-                sorted(r.reactants) == reactants and
-                sorted(r.products) == products]
+        index = self._get_index()
+        reactant_rids = index.by_reactants.get(_nuclei_key(Nucleus.cast_list(reactants)), {})
+        product_rids = index.by_products.get(_nuclei_key(Nucleus.cast_list(products)), {})
+        _tmp = [self._rates[rid] for rid in
+                index.sort(rid for rid in reactant_rids if rid in product_rids)]
 
         if not _tmp:
             return None
@@ -393,20 +703,25 @@ class Library:
 
         if isinstance(rate, Rate):
             rid = rate.get_rate_id()
-            self._rates.pop(rid)
         elif isinstance(rate, str):
             rid = self.get_rate_by_name(rate).get_rate_id()
-            self._rates.pop(rid)
         else:
             # we assume that a rate id as provided
-            self._rates.pop(rate)
+            rid = rate
+        r = self._rates.pop(rid)
+
+        if self._index is not None:
+            self._index.remove(rid, r)
 
     def add_rate(self, rate):
         """Manually add a rate by giving a Rate object"""
 
         if isinstance(rate, Rate):
             if rate not in self._rates:
-                self._rates[rate.get_rate_id()] = rate
+                rid = rate.get_rate_id()
+                self._rates[rid] = rate
+                if self._index is not None:
+                    self._index.add(rid, rate)
         else:
             raise TypeError("invalid Rate object")
 
@@ -423,9 +738,17 @@ class Library:
 
         nucleus_set = set(Nucleus.cast_list(nuclist))
 
-        # Discard rates with nuclei that are not in nucleus_set
+        # Discard rates with nuclei that are not in nucleus_set.  We
+        # only need to consider the rates whose reactants are all in
+        # nucleus_set
+        index = self._get_index()
+        candidates = [rid for key, rids in index.by_reactants.items()
+                      if all(nuc in nucleus_set for nuc in key)
+                      for rid in rids]
+
         filtered_rates = []
-        for r in self.get_rates():
+        for rid in index.sort(candidates):
+            r = self._rates[rid]
             include = True
             for nuc in r.reactants:
                 if nuc not in nucleus_set:
@@ -464,12 +787,20 @@ class Library:
             filter_specifications = [filter_spec]
         else:
             filter_specifications = list(filter_spec)
-        matching_rates = {}
-        for rid, r in self._rates.items():
-            for f in filter_specifications:
-                if f.matches(r):
-                    matching_rates[rid] = r
-                    break
+
+        # filters that specify reactants or products only need to
+        # check the rates the index says contain those nuclei
+        index = self._get_index()
+        matching_rids = set()
+        for f in filter_specifications:
+            candidates = index.candidates(f)
+            if candidates is None:
+                candidates = self._rates
+            for rid in candidates:
+                if rid not in matching_rids and f.matches(self._rates[rid]):
+                    matching_rids.add(rid)
+
+        matching_rates = {rid: self._rates[rid] for rid in index.sort(matching_rids)}
         if matching_rates:
             return Library(rates=matching_rates)
         return None
@@ -696,7 +1027,7 @@ class ReacLibLibrary(Library):
 
     def __init__(self):
         libfile = 'reaclib_default2_20220329'
-        Library.__init__(self, libfile=libfile)
+        Library.__init__(self, libfile=libfile, use_cache=True)
 
 
 class TabularLibrary(Library):
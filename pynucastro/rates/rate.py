@@ -2,6 +2,7 @@
 Classes and methods to interface with files storing rate data.
 """
 
+import hashlib
 import io
 import math
 import warnings
@@ -43,6 +44,8 @@ except ImportError:
         return wrap(cls_or_spec)
 
 
+from pynucastro._cache import (get_cache_file, read_npy_mmap, read_npz,
+                               write_npy, write_npz)
 from pynucastro.constants import constants
 from pynucastro.nucdata import Nucleus, UnsupportedNucleus
 
@@ -140,6 +143,52 @@ class Tfactors:
         return np.array([1, self.T9i, self.T913i, self.T913, self.T9, self.T953, self.lnT9])
 
 
+def _tfactors_array(T):
+    """ the vectorized counterpart of :class:`Tfactors`: return the
+    temperature factors (T9, T9i, T913i, T913, T953, lnT9) for the
+    temperature T (Kelvin), which can be a scalar or a NumPy array """
+
+    if np.ndim(T) == 0:
+        # plain floats are much faster than 0-d arrays
+        T9 = float(T)/1.e9
+        lnT9 = math.log(T9)
+    else:
+        T9 = np.asarray(T, dtype=np.float64)/1.e9
+        lnT9 = np.log(T9)
+    T9i = 1.0/T9
+    T913i = T9i**(1./3.)
+    T913 = T9**(1./3.)
+    T953 = T9**(5./3.)
+    return T9, T9i, T913i, T913, T953, lnT9
+
+
+def _ln_set_rate(a, tf):
+    """ return the log of the rate of a set with coefficients a, given
+    the temperature factors tf from :func:`_tfactors_array`.  Each
+    a[i] can be a scalar or an array broadcastable with the factors """
+
+    T9, T9i, T913i, T913, T953, lnT9 = tf
+    return (a[0] +
+            a[1]*T9i +
+            a[2]*T913i +
+            a[3]*T913 +
+            a[4]*T9 +
+            a[5]*T953 +
+            a[6]*lnT9)
+
+
+def _dln_set_rate_dT9(a, tf):
+    """ return the derivative of :func:`_ln_set_rate` with respect to T9 """
+
+    _, T9i, T913i, T913, _, _ = tf
+    return (-a[1] * T9i * T9i +
+            -(1./3.) * a[2] * T913i * T9i +
+            (1./3.) * a[3] * T913i * T913i +
+            a[4] +
+            (5./3.) * a[5] * T913 * T913 +
+            a[6] * T9i)
+
+
 class SingleSet:
     """ a set in Reaclib is one piece of a rate, in the form
 
@@ -308,6 +357,38 @@ class SingleSet:
         string += ";"
         return string
 
+    def dln_set_string_dT9_py(self, prefix="dset_dT", plus_equal=False):
+        """
+        return a string containing the python code for d/dT9 ln(set)
+        """
+        if plus_equal:
+            string = f"{prefix} += "
+        else:
+            string = f"{prefix} = "
+
+        if all(q == 0.0 for q in self.a[1:]):
+            string += "0.0"
+            return string
+
+        string += "("
+        if not self.a[1] == 0.0:
+            string += f" {-self.a[1]}*tf.T9i*tf.T9i"
+        if not self.a[2] == 0.0:
+            string += f" + -(1.0/3.0)*{self.a[2]}*tf.T913i*tf.T9i"
+        if not self.a[3] == 0.0:
+            string += f" + (1.0/3.0)*{self.a[3]}*tf.T913i*tf.T913i"
+        if not (self.a[4] == 0.0 and self.a[5] == 0.0 and self.a[6] == 0.0):
+            indent = len(prefix)*" "
+            string += f"\n{indent}    "
+        if not self.a[4] == 0.0:
+            string += f" + {self.a[4]}"
+        if not self.a[5] == 0.0:
+            string += f" + (5.0/3.0)*{self.a[5]}*tf.T913*tf.T913"
+        if not self.a[6] == 0.0:
+            string += f" + {self.a[6]}*tf.T9i"
+        string += ")"
+        return string
+
 
 class Rate:
     """The base reaction rate class.  Most rate types will subclass
@@ -628,10 +709,12 @@ class Rate:
                 nuc = n
         return nuc
 
-    def ydot_string_py(self):
+    def ydot_string_py(self, *, dT=False):
         """
         Return a string containing the term in a dY/dt equation
-        in a reaction network corresponding to this rate.
+        in a reaction network corresponding to this rate.  If dT is
+        True, the temperature derivative of the term is returned
+        instead.
         """
 
         ydot_string_components = []
@@ -659,7 +742,10 @@ class Rate:
                 ydot_string_components.append(f"Y[j{r.raw}]")
 
         # rate_eval.{fname}
-        ydot_string_components.append(f"rate_eval.{self.fname}")
+        if dT:
+            ydot_string_components.append(f"rate_eval.{self.fname}_dT")
+        else:
+            ydot_string_components.append(f"rate_eval.{self.fname}")
 
         return "*".join(ydot_string_components)
 
@@ -717,6 +803,35 @@ class Rate:
 
         return "*".join(jac_string_components)
 
+    def rate_factor_string_py(self):
+        """
+        Return a string containing this rate's term in a dY/dt
+        equation without its composition dependence, i.e., the
+        prefactor, density and electron fraction dependence times
+        the rate.
+        """
+
+        components = []
+
+        # prefactor
+        if self.prefactor != 1.0:
+            components.append(f"{self.prefactor:1.14e}")
+
+        # density dependence
+        if self.dens_exp == 1:
+            components.append("rho")
+        elif self.dens_exp != 0:
+            components.append(f"rho**{self.dens_exp}")
+
+        # electron fraction dependence
+        if self.weak_type == 'electron_capture' and not self.tabular:
+            components.append("ye(Y)")
+
+        # rate_eval.{fname}
+        components.append(f"rate_eval.{self.fname}")
+
+        return "*".join(components)
+
     def eval_jacobian_term(self, T, rho, comp, y_i):
         """Evaluate drate/d(y_i), y_i is a Nucleus object.  This rate
         term has the full composition and density dependence, i.e.:
@@ -878,6 +993,10 @@ class ReacLibRate(Rate):
         self.rate_eval_needs_rho = False
         self.rate_eval_needs_comp = False
 
+        # the set coefficients stacked into an array, created on demand
+        self._set_coeffs = None
+        self._set_coeffs_key = None
+
         if isinstance(rfile, Path):
             # read in the file, parse the different sets and store them as
             # SingleSet objects in sets[]
@@ -1182,26 +1301,53 @@ class ReacLibRate(Rate):
 
         return f'{self.rid} <{self.label.strip()}_{ssrc}_{sweak}_{srev}>'
 
-    def function_string_py(self):
+    @staticmethod
+    def _pf_chain_terms(nuclei, sep):
+        """return the terms of the temperature derivative of the
+        product of the partition functions of nuclei (joined by sep),
+        via the product rule.  The factors are differentiated by
+        position, so a nucleus that appears twice gives two terms."""
+        return [sep.join([f"{nuc}_pf" for j, nuc in enumerate(nuclei) if j != k] + [f"d{n}_pf_dT"])
+                for k, n in enumerate(nuclei)]
+
+    def function_string_py(self, *, with_dT=False):
         """
         Return a string containing python function that computes the
-        rate
+        rate.  If with_dT is True, the function also stores the
+        temperature derivative of the rate in rate_eval.{fname}_dT
         """
 
         fstring = ""
         fstring += "@numba.njit()\n"
         fstring += f"def {self.fname}(rate_eval, tf):\n"
         fstring += f"    # {self.rid}\n"
-        fstring += "    rate = 0.0\n\n"
+        fstring += "    rate = 0.0\n"
+        if with_dT:
+            fstring += "    drate_dT = 0.0\n"
+        fstring += "\n"
 
         for s in self.sets:
             fstring += f"    # {s.labelprops[0:5]}\n"
-            set_string = s.set_string_py(prefix="rate", plus_equal=True)
+            if with_dT:
+                # we have set_rate = exp(f(T9)), so
+                # dset_rate/dT = set_rate * df/dT9 / 1.e9
+                set_string = s.set_string_py(prefix="set_rate")
+                set_string += "\n" + s.dln_set_string_dT9_py(prefix="dln_set_rate_dT9")
+                set_string += "\nrate += set_rate"
+                set_string += "\ndrate_dT += set_rate * dln_set_rate_dT9 / 1.e9"
+            else:
+                set_string = s.set_string_py(prefix="rate", plus_equal=True)
             for t in set_string.split("\n"):
                 fstring += "    " + t + "\n"
+            if with_dT:
+                fstring += "\n"
 
+        if not with_dT:
+            fstring += "\n"
+        fstring += f"    rate_eval.{self.fname} = rate\n"
+        if with_dT:
+            fstring += f"    rate_eval.{self.fname}_dT = drate_dT\n"
         fstring += "\n"
-        fstring += f"    rate_eval.{self.fname} = rate\n\n"
         return fstring
 
     def function_string_cxx(self, dtype="double", specifiers="inline", leave_open=False, extra_args=()):
@@ -1251,43 +1397,77 @@ class ReacLibRate(Rate):
 
         return fstring
 
+    def _get_set_coeffs(self):
+        """ return the coefficients of all the sets as an array of
+        shape (nsets, 7), rebuilding it if the sets have changed """
+
+        key = tuple(id(s) for s in self.sets)
+        if self._set_coeffs is None or key != self._set_coeffs_key:
+            self._set_coeffs = np.array([s.a for s in self.sets],
+                                        dtype=np.float64).reshape(-1, 7)
+            self._set_coeffs_key = key
+        return self._set_coeffs
+
+    def _set_coeffs_broadcast(self, ndim):
+        """ return the set coefficients as an array of shape
+        (7, nsets, 1, ...), broadcastable with ndim-dimensional
+        temperature factors """
+
+        a = self._get_set_coeffs().T
+        return a.reshape(a.shape + (1,) * ndim)
+
     def eval(self, T, *, rho=None, comp=None):
-        """ evauate the reaction rate for temperature T """
+        """ evaluate the reaction rate for temperature T.  T can be a
+        scalar or a NumPy array of temperatures. """
+        _ = rho  # unused by this subclass
+        _ = comp  # unused by this subclass
 
-        tf = Tfactors(T)
-        r = 0.0
-        for s in self.sets:
-            f = s.f()
-            r += f(tf)
+        tf = _tfactors_array(T)
 
-        return r
+        if np.ndim(tf[0]) == 0:
+            r = 0.0
+            for s in self.sets:
+                r += float(np.exp(_ln_set_rate(s.a, tf)))
+            return r
+
+        set_rates = np.exp(_ln_set_rate(self._set_coeffs_broadcast(tf[0].ndim), tf))
+        return np.sum(set_rates, axis=0)
 
     def eval_deriv(self, T, *, rho=None, comp=None):
-        """ evauate the derivative of reaction rate with respect to T """
+        """ evaluate the derivative of reaction rate with respect to T.
+        T can be a scalar or a NumPy array of temperatures. """
         _ = rho  # unused by this subclass
         _ = comp  # unused by this subclass
 
-        tf = Tfactors(T)
-        drdT = 0.0
-        for s in self.sets:
-            dfdT = s.dfdT()
-            drdT += dfdT(tf)
+        tf = _tfactors_array(T)
 
-        return drdT
+        if np.ndim(tf[0]) == 0:
+            drdT = 0.0
+            for s in self.sets:
+                drdT += float(np.exp(_ln_set_rate(s.a, tf))) * _dln_set_rate_dT9(s.a, tf) / 1.e9
+            return drdT
+
+        a = self._set_coeffs_broadcast(tf[0].ndim)
+        dset_rates_dT = np.exp(_ln_set_rate(a, tf)) * _dln_set_rate_dT9(a, tf) / 1.e9
+        return np.sum(dset_rates_dT, axis=0)
 
     def get_rate_exponent(self, T0):
         """
         for a rate written as a power law, r = r_0 (T/T0)**nu, return
-        nu corresponding to T0
+        nu corresponding to T0.  T0 can be a scalar or a NumPy array.
         """
 
         # nu = dln r /dln T, so we need dr/dT
+        T0 = np.asarray(T0, dtype=np.float64)
         r1 = self.eval(T0)
         dT = 1.e-8*T0
         r2 = self.eval(T0 + dT)
 
         drdT = (r2 - r1)/dT
-        return (T0/r1)*drdT
+        nu = (T0/r1)*drdT
+        if np.ndim(nu) == 0:
+            return float(nu)
+        return nu
 
     def plot(self, Tmin=1.e8, Tmax=1.6e9, rhoYmin=3.9e8, rhoYmax=2.e9,
              figsize=(10, 10)):
@@ -1308,10 +1488,7 @@ class ReacLibRate(Rate):
         fig, ax = plt.subplots(figsize=figsize)
 
         temps = np.logspace(np.log10(Tmin), np.log10(Tmax), 100)
-        r = np.zeros_like(temps)
-
-        for n, T in enumerate(temps):
-            r[n] = self.eval(T)
+        r = self.eval(temps)
 
         ax.loglog(temps, r)
         ax.set_xlabel(r"$T$")
@@ -1334,7 +1511,11 @@ if numba is not None:
         ('table_rhoy_lines', numba.int32),
         ('table_temp_lines', numba.int32),
         ('rhoy', numba.float64[:]),
-        ('temp', numba.float64[:])
+        ('temp', numba.float64[:]),
+        ('rhoy_min', numba.float64),
+        ('rhoy_max', numba.float64),
+        ('temp_min', numba.float64),
+        ('temp_max', numba.float64)
     ]
 else:
     interpolator_spec = []
@@ -1355,6 +1536,13 @@ class TableInterpolator:
         self.rhoy = self.data[::self.table_temp_lines, TableIndex.RHOY.value]
         self.temp = self.data[0:self.table_temp_lines, TableIndex.T.value]
 
+        # store the table bounds so we don't need to recompute them
+        # for every point we interpolate
+        self.rhoy_min = self.rhoy.min()
+        self.rhoy_max = self.rhoy.max()
+        self.temp_min = self.temp.min()
+        self.temp_max = self.temp.max()
+
     def _get_logT_idx(self, logt0):
         """return the index into the temperatures such that
         T[i-1] < t0 <= T[i].  We return i-1 here, corresponding to
@@ -1382,9 +1570,10 @@ class TableInterpolator:
 
         return irhoy * self.table_temp_lines + jtemp
 
-    def interpolate(self, logrhoy, logT, component):
-        """given logrhoy and logT, do bilinear interpolation to
-        find the value of the data component in the table"""
+    def _bilinear_coeffs(self, irhoy, jT, component):
+        """return the coefficients A, B, C, D of the bilinear
+        interpolant of the data component in the box with lower left
+        corner (irhoy, jT) -- see :meth:`_bilinear`"""
 
         # We are going to do bilinear interpolation.  We create a
         # polynomial of the form:
@@ -1398,18 +1587,6 @@ class TableInterpolator:
         # box with corners (i,j) to (i+1,j+1), and solve for
         # A, B, C, D
 
-        # find the T and rhoY in the data table corresponding to the
-        # lower left
-
-        if logT < self.temp.min() or logT > self.temp.max():
-            raise ValueError("temperature out of table bounds")
-
-        if logrhoy < self.rhoy.min() or logrhoy > self.rhoy.max():
-            raise ValueError("rhoy out of table bounds")
-
-        irhoy = self._get_logrhoy_idx(logrhoy)
-        jT = self._get_logT_idx(logT)
-
         # note: rhoy and T are already stored as log
 
         dlogrho = self.rhoy[irhoy+1] - self.rhoy[irhoy]
@@ -1434,11 +1611,213 @@ class TableInterpolator:
         B = (f_ip1j - f_ij) / dlogrho
         A = (f_ip1jp1 - B * dlogrho - C * dlogT - D) / (dlogrho * dlogT)
 
+        return A, B, C, D
+
+    def _bilinear(self, irhoy, jT, logrhoy, logT, component):
+        """do bilinear interpolation of the data component in the box
+        with lower left corner (irhoy, jT)"""
+
+        A, B, C, D = self._bilinear_coeffs(irhoy, jT, component)
+
         r = (A * (logrhoy - self.rhoy[irhoy]) * (logT - self.temp[jT]) +
              B * (logrhoy - self.rhoy[irhoy]) + C * (logT - self.temp[jT]) + D)
 
         return r
 
+    def interpolate(self, logrhoy, logT, component):
+        """given logrhoy and logT, do bilinear interpolation to
+        find the value of the data component in the table"""
+
+        if logT < self.temp_min or logT > self.temp_max:
+            raise ValueError("temperature out of table bounds")
+
+        if logrhoy < self.rhoy_min or logrhoy > self.rhoy_max:
+            raise ValueError("rhoy out of table bounds")
+
+        # find the T and rhoY in the data table corresponding to the
+        # lower left
+
+        irhoy = self._get_logrhoy_idx(logrhoy)
+        jT = self._get_logT_idx(logT)
+
+        return self._bilinear(irhoy, jT, logrhoy, logT, component)
+
+    def interpolate_dlogT(self, logrhoy, logT, component):
+        """given logrhoy and logT, return the derivative of the
+        bilinear interpolant of the data component (see
+        :meth:`interpolate`) with respect to logT"""
+
+        if logT < self.temp_min or logT > self.temp_max:
+            raise ValueError("temperature out of table bounds")
+
+        if logrhoy < self.rhoy_min or logrhoy > self.rhoy_max:
+            raise ValueError("rhoy out of table bounds")
+
+        irhoy = self._get_logrhoy_idx(logrhoy)
+        jT = self._get_logT_idx(logT)
+
+        A, _, C, _ = self._bilinear_coeffs(irhoy, jT, component)
+
+        return A * (logrhoy - self.rhoy[irhoy]) + C
+
+    def interpolate_array(self, logrhoy, logT, components, clamp=False):
+        """given 1-d arrays logrhoy and logT of the same length, do
+        bilinear interpolation to find the value of each of the data
+        components (a 1-d integer array) at each point.  The result
+        has shape (len(logrhoy), len(components)).
+
+        If clamp is True, then points outside of the table are
+        evaluated at the nearest table boundary instead of raising
+        an error."""
+
+        npts = len(logrhoy)
+        ncomp = len(components)
+        r = np.empty((npts, ncomp))
+
+        for n in range(npts):
+            logrhoy0 = logrhoy[n]
+            logT0 = logT[n]
+
+            if clamp:
+                logT0 = min(max(logT0, self.temp_min), self.temp_max)
+                logrhoy0 = min(max(logrhoy0, self.rhoy_min), self.rhoy_max)
+            else:
+                if logT0 < self.temp_min or logT0 > self.temp_max:
+                    raise ValueError("temperature out of table bounds")
+
+                if logrhoy0 < self.rhoy_min or logrhoy0 > self.rhoy_max:
+                    raise ValueError("rhoy out of table bounds")
+
+            irhoy = self._get_logrhoy_idx(logrhoy0)
+            jT = self._get_logT_idx(logT0)
+
+            for m in range(ncomp):
+                r[n, m] = self._bilinear(irhoy, jT, logrhoy0, logT0, components[m])
+
+        return r
+
+
+def _read_tabular_table(table_path, header_lines):
+    """read the data of a tabular rate table file, skipping the first
+    header_lines lines, and return it as a 2-d array"""
+
+    t_data2d = []
+    with table_path.open() as tabular_file:
+        for i, line in enumerate(tabular_file):
+            # skip header lines
+            if i < header_lines:
+                continue
+            line = line.strip()
+            # skip empty lines
+            if not line:
+                continue
+            # split the column values on whitespace
+            t_data2d.append(line.split())
+
+    # convert the nested list of string values into a numpy float array
+    return np.array(t_data2d, dtype=np.float64)
+
+
+# the directories containing the tables that pynucastro provides.  We
+# pack all of the tables in each of these into a single binary
+# archive in the cache directory that is memory-mapped when reading
+# the tables, so processes share the same pages.
+_tabular_archive_dirs = (_pynucastro_tabular_dir, _pynucastro_suzuki_dir,
+                         _pynucastro_langanke_dir)
+
+# the archives we've opened in this process, keyed by directory
+_tabular_archives = {}
+
+
+def _build_tabular_archive(table_dir, data_file, index_file):
+    """parse all of the tables referenced by the tabular rate files in
+    table_dir and store them, flattened and concatenated, in the npy
+    file data_file, along with an index describing the location and
+    shape of each table in the npz file index_file"""
+
+    names = []
+    header_lines = []
+    shapes = []
+    tables = []
+
+    for rate_file in sorted(table_dir.glob("*-toki")):
+        try:
+            lines = [line.strip() for line in rate_file.read_text().splitlines()
+                     if line.strip()]
+            if lines[0] != "t":
+                continue
+            table_file = lines[2]
+            nheader = int(lines[3])
+        except (IndexError, ValueError, OSError):
+            continue
+
+        table_path = table_dir/table_file
+        if table_file in names or not table_path.is_file():
+            continue
+
+        table = _read_tabular_table(table_path, nheader)
+        names.append(table_file)
+        header_lines.append(nheader)
+        shapes.append(table.shape)
+        tables.append(table.ravel())
+
+    sizes = np.array([np.prod(shape) for shape in shapes], dtype=np.int64)
+    offsets = np.zeros(len(names), dtype=np.int64)
+    offsets[1:] = np.cumsum(sizes)[:-1]
+
+    data = np.concatenate(tables) if tables else np.zeros(0)
+
+    # the index is written last, since its presence marks the archive
+    # as complete
+    write_npy(data_file, data)
+    write_npz(index_file, names=np.array(names, dtype=str),
+              header_lines=np.array(header_lines, dtype=np.int64),
+              shapes=np.array(shapes, dtype=np.int64).reshape(-1, 2),
+              offsets=offsets)
+
+
+def _get_tabular_archive(table_dir):
+    """return the packed archive of the tables in table_dir as a tuple
+    (index, data), where index is a dictionary mapping the table file
+    names to (header_lines, shape, offset) into the read-only
+    memory-mapped array data.  The archive is built if needed.  None
+    is returned if the cache is disabled or unusable."""
+
+    if table_dir in _tabular_archives:
+        return _tabular_archives[table_dir]
+
+    # the archive name includes the size and modification time of all
+    # the tables, so changing any of them creates a new archive
+    h = hashlib.sha256()
+    for table_path in sorted(table_dir.glob("*.dat")):
+        st = table_path.stat()
+        h.update(f"{table_path.name} {st.st_size} {st.st_mtime_ns}\n".encode())
+
+    archive = None
+    data_file = get_cache_file("tabular", table_dir, suffix=".npy", digest=h.hexdigest())
+
+    if data_file is not None:
+        index_file = data_file.with_suffix(".npz")
+        index_data = read_npz(index_file)
+        if index_data is None:
+            _build_tabular_archive(table_dir, data_file, index_file)
+            index_data = read_npz(index_file)
+
+        data = read_npy_mmap(data_file)
+
+        if index_data is not None and data is not None:
+            index = {}
+            for name, nheader, shape, offset in zip(index_data["names"].tolist(),
+                                                    index_data["header_lines"].tolist(),
+                                                    index_data["shapes"].tolist(),
+                                                    index_data["offsets"].tolist()):
+                if offset + shape[0] * shape[1] <= len(data):
+                    index[name] = (nheader, tuple(shape), offset)
+            archive = (index, data)
+
+    _tabular_archives[table_dir] = archive
+    return archive
+
 
 class TabularRate(Rate):
     """A tabular rate.
@@ -1488,19 +1867,58 @@ class TabularRate(Rate):
         self._set_screening()
         self._set_print_representation()
 
-        self.get_tabular_rate()
+        # the table data and the interpolator are only created when
+        # they are first needed (see get_tabular_rate), but we make
+        # sure that the table exists now
+        self._tabular_data_table = None
+        self._interpolator = None
+        self.table_path = _find_rate_file(self.table_file)
 
-        # store the extrema of the thermodynamics
-        _rhoy = self.tabular_data_table[::self.table_temp_lines, TableIndex.RHOY.value]
-        _temp = self.tabular_data_table[0:self.table_temp_lines, TableIndex.T.value]
+    @property
+    def tabular_data_table(self):
+        """the table data, read on first access"""
+        if self._tabular_data_table is None:
+            self.get_tabular_rate()
+        return self._tabular_data_table
 
-        self.table_Tmin = 10.0**(_temp.min())
-        self.table_Tmax = 10.0**(_temp.max())
-        self.table_rhoYmin = 10.0**(_rhoy.min())
-        self.table_rhoYmax = 10.0**(_rhoy.max())
+    @tabular_data_table.setter
+    def tabular_data_table(self, data):
+        self._tabular_data_table = data
+        self._interpolator = None
 
-        self.interpolator = TableInterpolator(self.table_rhoy_lines, self.table_temp_lines,
-                                              self.tabular_data_table)
+    @property
+    def interpolator(self):
+        """the TableInterpolator for the table data, created on first
+        access"""
+        if self._interpolator is None:
+            self._interpolator = TableInterpolator(self.table_rhoy_lines, self.table_temp_lines,
+                                                   self.tabular_data_table)
+        return self._interpolator
+
+    def __getstate__(self):
+        # the jitclass interpolator cannot be pickled, but it is
+        # recreated from the table data on first access
+        state = self.__dict__.copy()
+        state["_interpolator"] = None
+        return state
+
+    # the extrema of the thermodynamics
+
+    @property
+    def table_Tmin(self):
+        return 10.0**self.interpolator.temp_min
+
+    @property
+    def table_Tmax(self):
+        return 10.0**self.interpolator.temp_max
+
+    @property
+    def table_rhoYmin(self):
+        return 10.0**self.interpolator.rhoy_min
+
+    @property
+    def table_rhoYmax(self):
+        return 10.0**self.interpolator.rhoy_max
 
     def __hash__(self):
         return hash(self.__repr__())
@@ -1596,10 +2014,20 @@ class TabularRate(Rate):
 
         return f'{self.rid} <{self.label.strip()}_{ssrc}>'
 
-    def function_string_py(self):
+    @staticmethod
+    def _pf_chain_terms(nuclei, sep):
+        """return the terms of the temperature derivative of the
+        product of the partition functions of nuclei (joined by sep),
+        via the product rule.  The factors are differentiated by
+        position, so a nucleus that appears twice gives two terms."""
+        return [sep.join([f"{nuc}_pf" for j, nuc in enumerate(nuclei) if j != k] + [f"d{n}_pf_dT"])
+                for k, n in enumerate(nuclei)]
+
+    def function_string_py(self, *, with_dT=False):
         """
         Return a string containing python function that computes the
-        rate
+        rate.  If with_dT is True, the function also stores the
+        temperature derivative of the rate in rate_eval.{fname}_dT
         """
 
         fstring = ""
@@ -1611,7 +2039,13 @@ class TabularRate(Rate):
         fstring += f"    {self.fname}_interpolator = TableInterpolator(*{self.fname}_info)\n"
 
         fstring += f"    r = {self.fname}_interpolator.interpolate(np.log10(rhoY), np.log10(T), TableIndex.RATE.value)\n"
-        fstring += f"    rate_eval.{self.fname} = 10.0**r\n\n"
+        fstring += f"    rate_eval.{self.fname} = 10.0**r\n"
+        if with_dT:
+            # the table is interpolated in log10(rate) and log10(T), so
+            # drate/dT = rate * dlog10(rate)/dlog10(T) / T
+            fstring += f"    drdlogT = {self.fname}_interpolator.interpolate_dlogT(np.log10(rhoY), np.log10(T), TableIndex.RATE.value)\n"
+            fstring += f"    rate_eval.{self.fname}_dT = rate_eval.{self.fname} * drdlogT / T\n"
+        fstring += "\n"
 
         return fstring
 
@@ -1620,34 +2054,48 @@ class TabularRate(Rate):
 
         # find .dat file and read it
         self.table_path = _find_rate_file(self.table_file)
-        t_data2d = []
-        with self.table_path.open() as tabular_file:
-            for i, line in enumerate(tabular_file):
-                # skip header lines
-                if i < self.table_header_lines:
-                    continue
-                line = line.strip()
-                # skip empty lines
-                if not line:
-                    continue
-                # split the column values on whitespace
-                t_data2d.append(line.split())
 
-        # convert the nested list of string values into a numpy float array
-        self.tabular_data_table = np.array(t_data2d, dtype=np.float64)
+        # the tables distributed with pynucastro are read from the
+        # memory-mapped binary archive, if possible
+        table = None
+        if self.table_path.parent in _tabular_archive_dirs:
+            archive = _get_tabular_archive(self.table_path.parent)
+            if archive is not None:
+                index, data = archive
+                nheader, shape, offset = index.get(self.table_path.name, (None, None, None))
+                if nheader == self.table_header_lines:
+                    size = shape[0] * shape[1]
+                    table = np.asarray(data[offset:offset+size]).reshape(shape)
+
+        if table is None:
+            table = _read_tabular_table(self.table_path, self.table_header_lines)
+
+        self.tabular_data_table = table
+
+    def _interpolate(self, T, rhoY, component):
+        """ interpolate the table component at temperature T and
+        electron density rhoY.  T and rhoY can be scalars or NumPy
+        arrays (which are broadcast against each other) """
+        if np.ndim(T) == 0 and np.ndim(rhoY) == 0:
+            return self.interpolator.interpolate(np.log10(rhoY), np.log10(T),
+                                                 component)
+
+        logrhoy, logT = np.broadcast_arrays(np.log10(rhoY), np.log10(T))
+        r = self.interpolator.interpolate_array(np.ascontiguousarray(logrhoy, dtype=np.float64).ravel(),
+                                                np.ascontiguousarray(logT, dtype=np.float64).ravel(),
+                                                np.array([component]))
+        return r[:, 0].reshape(logT.shape)
 
     def eval(self, T, *, rho=None, comp=None):
-        """ evauate the reaction rate for temperature T """
-        rhoY = rho * comp.eval_ye()
-        r = self.interpolator.interpolate(np.log10(rhoY), np.log10(T),
-                                          TableIndex.RATE.value)
+        """ evaluate the reaction rate for temperature T and density
+        rho.  T and rho can be scalars or NumPy arrays """
+        r = self._interpolate(T, rho * comp.eval_ye(), TableIndex.RATE.value)
         return 10.0**r
 
     def get_nu_loss(self, T, *, rho=None, comp=None):
-        """ get the neutrino loss rate for the reaction if tabulated"""
-        rhoY = rho * comp.eval_ye()
-        r = self.interpolator.interpolate(np.log10(rhoY), np.log10(T),
-                                          TableIndex.NU.value)
+        """ get the neutrino loss rate for the reaction if tabulated.
+        T and rho can be scalars or NumPy arrays """
+        r = self._interpolate(T, rho * comp.eval_ye(), TableIndex.NU.value)
         return 10**r
 
     def plot(self, *, Tmin=None, Tmax=None, rhoYmin=None, rhoYmax=None,
@@ -1813,15 +2261,28 @@ class DerivedRate(ReacLibRate):
             return r*z_r/z_p
         return r
 
-    def function_string_py(self):
+    @staticmethod
+    def _pf_chain_terms(nuclei, sep):
+        """return the terms of the temperature derivative of the
+        product of the partition functions of nuclei (joined by sep),
+        via the product rule.  The factors are differentiated by
+        position, so a nucleus that appears twice gives two terms."""
+        return [sep.join([f"{nuc}_pf" for j, nuc in enumerate(nuclei) if j != k] + [f"d{n}_pf_dT"])
+                for k, n in enumerate(nuclei)]
+
+    def function_string_py(self, *, with_dT=False):
         """
         Return a string containing python function that computes the
-        rate
+        rate.  If with_dT is True, the function also stores the
+        temperature derivative of the rate in rate_eval.{fname}_dT.
+        This uses the interp_slope() function written by
+        :class:`PythonNetwork` for the derivative of the partition
+        functions.
         """
 
         self._warn_about_missing_pf_tables()
 
-        fstring = super().function_string_py()
+        fstring = super().function_string_py(with_dT=with_dT)
 
         if self.use_pf:
 
@@ -1831,9 +2292,13 @@ class DerivedRate(ReacLibRate):
                     fstring += f"    # interpolating {nuc} partition function\n"
                     fstring += f"    {nuc}_pf_exponent = np.interp(tf.T9, xp={nuc}_temp_array, fp=np.log10({nuc}_pf_array))\n"
                     fstring += f"    {nuc}_pf = 10.0**{nuc}_pf_exponent\n"
+                    if with_dT:
+                        fstring += f"    d{nuc}_pf_dT = {nuc}_pf * np.log(10.0) * interp_slope(tf.T9, {nuc}_temp_array, np.log10({nuc}_pf_array)) / 1.e9\n"
                 else:
                     fstring += f"    # setting {nuc} partition function to 1.0 by default, independent of T\n"
                     fstring += f"    {nuc}_pf = 1.0\n"
+                    if with_dT:
+                        fstring += f"    d{nuc}_pf_dT = 0.0\n"
                 fstring += "\n"
 
             fstring += "    "
@@ -1846,6 +2311,18 @@ class DerivedRate(ReacLibRate):
             fstring += "*".join([f"{nucp}_pf" for nucp in self.rate.products])
 
             fstring += "\n"
+
+            if with_dT:
+                # the derivatives, via the chain rule
+                chain_terms = self._pf_chain_terms(self.rate.reactants, "*")
+                fstring += f"    dz_r_dT = {' + '.join(chain_terms)}\n"
+
+                chain_terms = self._pf_chain_terms(self.rate.products, "*")
+                fstring += f"    dz_p_dT = {' + '.join(chain_terms)}\n"
+
+                fstring += "    dzterm_dT = (z_p * dz_r_dT - z_r * dz_p_dT) / (z_p * z_p)\n"
+                fstring += f"    rate_eval.{self.fname}_dT = dzterm_dT * rate_eval.{self.fname} + rate_eval.{self.fname}_dT * z_r/z_p\n"
+
             fstring += f"    rate_eval.{self.fname} *= z_r/z_p\n"
 
         return fstring
@@ -1888,17 +2365,13 @@ class DerivedRate(ReacLibRate):
             fstring += ";\n\n"
 
             # now the derivatives, via chain rule
-            chain_terms = []
-            for n in self.rate.reactants:
-                chain_terms.append(" * ".join([f"{nucr}_pf" for nucr in self.rate.reactants if nucr != n] + [f"d{n}_pf_dT"]))
+            chain_terms = self._pf_chain_terms(self.rate.reactants, " * ")
 
             fstring += f"    {dtype} dz_r_dT = "
             fstring += " + ".join(chain_terms)
             fstring += ";\n"
 
-            chain_terms = []
-            for n in self.rate.products:
-                chain_terms.append(" * ".join([f"{nucp}_pf" for nucp in self.rate.products if nucp != n] + [f"d{n}_pf_dT"]))
+            chain_terms = self._pf_chain_terms(self.rate.products, " * ")
 
             fstring += f"    {dtype} dz_p_dT = "
             fstring += " + ".join(chain_terms)
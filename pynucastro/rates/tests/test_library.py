@@ -101,3 +101,93 @@ class TestLibrary:
 
     def test_forward_backward(self):
         assert self.library.backward() is None
+
+    def test_filter(self):
+        rf = pyna.RateFilter(reactants=["p"], exact=False)
+        assert self.library.filter(rf).get_rates() == \
+            [r for r in self.library.get_rates() if pyna.Nucleus("p") in r.reactants]
+
+        rf = pyna.RateFilter(reactants=["n15", "p"], products=["c12", "he4"])
+        assert self.library.filter(rf).get_rates() == [pyna.load_rate("n15-pa-c12-nacr")]
+
+        rfs = [pyna.RateFilter(products=["c13"]), pyna.RateFilter(reactants=["o15"])]
+        assert self.library.filter(rfs).get_rates() == [pyna.load_rate("n13--c13-wc12"),
+                                                        pyna.load_rate("o15--n15-wc12")]
+
+        assert self.library.filter(pyna.RateFilter(reactants=["ne20"])) is None
+
+    def test_index_add_remove(self):
+        # make sure the index is built, then modify the library
+        rf = pyna.RateFilter(reactants=["n13"], exact=False)
+        assert len(self.library.filter(rf).get_rates()) == 2
+
+        rate = pyna.load_rate("c12-pg-n13-ls09")
+        self.library.remove_rate(rate)
+        assert self.library.get_rate_by_nuclei(["c12", "p"], ["n13"]) is None
+        assert len(self.library.linking_nuclei(["p", "c12", "n13", "c13"],
+                                               print_warning=False).get_rates()) == 1
+
+        new_rate = pyna.load_rate("n13-pg-o14-lg06")
+        self.library.remove_rate(new_rate)
+        self.library.add_rate(new_rate)
+        assert self.library.filter(rf).get_rates() == [pyna.load_rate("n13--c13-wc12"),
+                                                       new_rate]
+
+        self.library.add_rate(rate)
+        assert self.library.get_rate_by_nuclei(["c12", "p"], ["n13"]) == rate
+
+    def test_index_add(self):
+        # the sum of two libraries has its own rates, so changing one
+        # library can't leave the index of another stale
+        rate = pyna.load_rate("c12-pg-n13-ls09")
+        assert self.library.get_rate_by_nuclei(["c12", "p"], ["n13"]) == rate
+
+        new_lib = self.library + self.smaller_lib
+        assert new_lib.get_rate_by_nuclei(["c12", "p"], ["n13"]) == rate
+
+        other_rate = pyna.load_rate("c12-ag-o16-nac2")
+        new_lib.remove_rate(rate)
+        new_lib.add_rate(other_rate)
+        assert new_lib.get_num_rates() == self.library.get_num_rates()
+        assert new_lib.get_rate_by_nuclei(["c12", "p"], ["n13"]) is None
+        assert new_lib.get_rate_by_nuclei(["c12", "he4"], ["o16"]) == other_rate
+
+        assert self.library.get_rate_by_nuclei(["c12", "p"], ["n13"]) == rate
+        assert self.library.get_rate_by_nuclei(["c12", "he4"], ["o16"]) is None
+
+    def test_library_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", str(tmp_path/"cache"))
+
+        libfile = tmp_path/"test_library"
+        self.library.write_to_file(libfile)
+
+        # the first read creates the cache, the second one uses it
+        uncached = pyna.Library(libfile)
+        lib1 = pyna.Library(libfile, use_cache=True)
+        assert len(list((tmp_path/"cache").glob("library-*.npz"))) == 1
+        lib2 = pyna.Library(libfile, use_cache=True)
+
+        # the rates from the cache are built as they are needed
+        nuclei = ["p", "c12", "c13", "n13", "n14"]
+        linked = lib2.linking_nuclei(nuclei)
+        assert linked.get_rates() == pyna.Library(libfile).linking_nuclei(nuclei).get_rates()
+        built = lib2._rates._cache.built  # pylint: disable=protected-access
+        assert sum(r is not None for r in built) < uncached.get_num_rates()
+
+        combined = lib2 + self.smaller_lib
+        assert combined.get_num_rates() == uncached.get_num_rates()
+        assert combined.get_rate(linked.get_rates()[0].get_rate_id()) is linked.get_rates()[0]
+
+        for lib in [lib1, lib2]:
+            assert lib.get_num_rates() == uncached.get_num_rates()
+            for r in uncached.get_rates():
+                rc = lib.get_rate(r.get_rate_id())
+                assert rc == r
+                assert rc.Q == r.Q
+                assert rc.labelprops == r.labelprops
+                assert rc.original_source == r.original_source
+
+        # changing the file invalidates the cache
+        self.smaller_lib.write_to_file(libfile)
+        lib3 = pyna.Library(libfile, use_cache=True)
+        assert lib3.get_num_rates() == self.smaller_lib.get_num_rates()
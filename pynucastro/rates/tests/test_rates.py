@@ -1,6 +1,7 @@
 # unit tests for rates
 import math
 
+import numpy as np
 import pytest
 from pytest import approx
 
@@ -216,6 +217,23 @@ class TestRate:
 
         assert err < 1.e-6
 
+    def test_eval_array(self):
+        temps = np.logspace(7, 10, 25)
+
+        for r in [self.rate1, self.rate4, self.rate6, self.rate8]:
+            rvals = r.eval(temps)
+            drvals = r.eval_deriv(temps)
+            nu = r.get_rate_exponent(temps)
+            assert rvals.shape == temps.shape
+
+            for n, T in enumerate(temps):
+                assert rvals[n] == approx(r.eval(T), rel=1.e-10, abs=1.e-100)
+                assert drvals[n] == approx(r.eval_deriv(T), rel=1.e-10, abs=1.e-100)
+                assert nu[n] == approx(r.get_rate_exponent(T), rel=1.e-6, abs=1.e-6)
+
+        # 2-d arrays of temperature are also supported
+        assert self.rate8.eval(temps.reshape(5, 5)) == approx(self.rate8.eval(temps).reshape(5, 5))
+
     def test_comparison(self):
         assert self.rate1 > self.rate2
         assert self.rate1 > self.rate4
@@ -276,6 +294,12 @@ class TestDerivedRate:
             rval = c12_ga_a_a_derived.eval(T=2.0e9)
         assert rval == approx(2.8953989705969484e-07)
 
+        # evaluating with an array of temperatures uses the same
+        # partition function interpolation
+        with pytest.warns(UserWarning, match="C12 partition function is not supported by tables"):
+            rvals = c12_ga_a_a_derived.eval(T=np.array([2.0e9, 4.0e9]))
+        assert rvals[0] == approx(rval)
+
     def test_a_a_ag_c12_with_Q(self, reaclib_library):
         """
         This function test the correct rate value if we take in consideration the
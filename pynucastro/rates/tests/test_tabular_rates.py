@@ -2,6 +2,7 @@
 
 import warnings
 
+import numpy as np
 import pytest
 from pytest import approx, raises
 
@@ -455,3 +456,99 @@ class TestTabularRates:
 
         with raises(ValueError):
             r.eval(T, rho=rho, comp=comp)
+
+    def test_eval_array(self, rc_su):
+
+        comp = pyna.Composition(rc_su.get_nuclei())
+        comp.set_all(1)
+        comp.normalize()
+
+        r = rc_su.get_rates()[0]
+
+        temps = np.logspace(7.5, 9.5, 7)
+        rhos = np.logspace(7.5, 10.5, 5)
+
+        # broadcast over a (rho, T) grid
+        rvals = r.eval(temps[np.newaxis, :], rho=rhos[:, np.newaxis], comp=comp)
+        nu_loss = r.get_nu_loss(temps[np.newaxis, :], rho=rhos[:, np.newaxis], comp=comp)
+        assert rvals.shape == (len(rhos), len(temps))
+
+        for i, rho in enumerate(rhos):
+            for j, T in enumerate(temps):
+                assert rvals[i, j] == r.eval(T, rho=rho, comp=comp)
+                assert nu_loss[i, j] == r.get_nu_loss(T, rho=rho, comp=comp)
+
+        with raises(ValueError):
+            r.eval(np.array([1.e9, 1.e11]), rho=1.e9, comp=comp)
+
+    def test_interpolate_array(self, rc_su):
+
+        r = rc_su.get_rates()[0]
+        interp = r.interpolator
+
+        logrhoy = np.array([interp.rhoy_min, 7.5, 8.25, interp.rhoy_max])
+        logT = np.array([interp.temp_min, 8.5, 9.1, interp.temp_max])
+        components = np.array([pyna.rates.TableIndex.RATE.value,
+                               pyna.rates.TableIndex.NU.value])
+
+        vals = interp.interpolate_array(logrhoy, logT, components)
+        assert vals.shape == (4, 2)
+        for n in range(4):
+            for m, c in enumerate(components):
+                assert vals[n, m] == interp.interpolate(logrhoy[n], logT[n], c)
+
+        # out of bounds points are an error unless we clamp them
+        logrhoy_out = np.array([interp.rhoy_max + 1.0])
+        logT_out = np.array([interp.temp_min - 1.0])
+
+        with raises(ValueError):
+            interp.interpolate_array(logrhoy_out, logT_out, components)
+
+        vals = interp.interpolate_array(logrhoy_out, logT_out, components, True)
+        assert vals[0, 0] == interp.interpolate(interp.rhoy_max, interp.temp_min, components[0])
+
+    def test_table_archive(self, tmp_path, monkeypatch):
+
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(pyna.rates.rate, "_tabular_archives", {})
+
+        # the first table we read builds the archive for its directory
+        r = pyna.rates.TabularRate("al23--mg23-toki")
+        assert r.tabular_data_table is not None
+        assert len(list(tmp_path.glob("tabular-*-suzuki-*.np[yz]"))) == 2
+
+        table = pyna.rates.rate._read_tabular_table(r.table_path, r.table_header_lines)  # pylint: disable=protected-access
+        assert np.array_equal(r.tabular_data_table, table)
+
+        # the table is a read-only view into the memory-mapped archive
+        assert not r.tabular_data_table.flags.writeable
+
+        # if the archive can't be used, we fall back to parsing the text
+        monkeypatch.setenv("PYNUCASTRO_CACHE_DIR", "")
+        monkeypatch.setattr(pyna.rates.rate, "_tabular_archives", {})
+
+        r2 = pyna.rates.TabularRate("al23--mg23-toki")
+        assert r2.tabular_data_table.flags.writeable
+        assert np.array_equal(r2.tabular_data_table, table)
+
+        comp = pyna.Composition(r.reactants + r.products)
+        comp.set_all(0.5)
+        assert r.eval(1.5e9, rho=1.2e8, comp=comp) == r2.eval(1.5e9, rho=1.2e8, comp=comp)
+
+    def test_lazy_table(self):
+
+        r = pyna.rates.TabularRate("na23--ne23-toki")
+
+        # only the metadata is read when the rate is created
+        assert r._tabular_data_table is None  # pylint: disable=protected-access
+        assert r._interpolator is None  # pylint: disable=protected-access
+        assert r.table_rhoy_lines == 152
+        assert r.table_temp_lines == 39
+
+        comp = pyna.Composition(r.reactants + r.products)
+        comp.set_all(0.5)
+        r.eval(1.e9, rho=1.e8, comp=comp)
+
+        assert r.tabular_data_table.shape == (152 * 39, 8)
+        assert r.table_Tmin == approx(1.e7)
+        assert r.table_rhoYmax == approx(1.e11)
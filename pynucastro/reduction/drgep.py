@@ -228,12 +228,14 @@ def _drgep_numpy(net, conds, targets, tols):
 
     R_TB = np.zeros(len(net.unique_nuclei), dtype=np.float64)
 
+    # the temperatures are evaluated together
+    T_arr = np.asarray(T_L, dtype=np.float64)
+
     for comp in comp_L:
         net.update_yfac_arr(comp)
         for rho in rho_L:
             net.update_prefac_arr(rho, comp)
-            for T in T_L:
-                rvals_arr = net.evaluate_rates_arr(T)
+            for rvals_arr in net.evaluate_rates_arr(T_arr):
                 _drgep_kernel_numpy(net, R_TB, rvals_arr, targets, tols, adj_nuc)
 
     net.clear_arrays()
@@ -273,9 +275,10 @@ def _drgep_mpi_numpy(net, conds, targets, tols):
         for j in range(rho_idx, n[1], rho_step):
             rho = rho_L[j]
             net.update_prefac_arr(rho, comp)
-            for k in range(T_idx, n[2], T_step):
-                T = T_L[k]
-                rvals_arr = net.evaluate_rates_arr(T)
+            T_arr = np.array([T_L[k] for k in range(T_idx, n[2], T_step)], dtype=np.float64)
+            if len(T_arr) == 0:
+                continue
+            for rvals_arr in net.evaluate_rates_arr(T_arr):
                 _drgep_kernel_numpy(net, R_TB_loc, rvals_arr, targets, tols, adj_nuc)
 
     R_TB = np.zeros_like(R_TB_loc)
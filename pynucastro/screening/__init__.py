@@ -2,7 +2,11 @@
 
 __all__ = ["screen", "screening_util"]
 
-from .screen import (NseState, PlasmaState, ScreenFactors, chugunov_2007,
-                     chugunov_2009, make_plasma_state, make_screen_factors,
-                     potekhin_1998, screen5)
+from .screen import (NseState, PlasmaState, PlasmaStateArray, ScreenFactors,
+                     ScreenFactorsArray, chugunov_2007, chugunov_2007_with_dT,
+                     chugunov_2009, chugunov_2009_with_dT, make_plasma_state,
+                     make_plasma_state_array, make_screen_factors,
+                     make_screen_factors_array, potekhin_1998,
+                     potekhin_1998_with_dT, screen5, screen5_with_dT,
+                     screen_all_pairs, screen_func_with_dT)
 from .screening_util import ScreeningPair, get_screening_map
@@ -1,6 +1,8 @@
 """
 Python implementations of screening routines.
 """
+import collections
+
 import numpy as np
 
 from pynucastro.constants import constants
@@ -14,9 +16,13 @@ else:
     def njit(func):
         return func
 
-__all__ = ["PlasmaState", "ScreenFactors", "chugunov_2007", "chugunov_2009",
-           "make_plasma_state", "make_screen_factors", "potekhin_1998",
-           "screen5"]
+__all__ = ["PlasmaState", "PlasmaStateArray", "ScreenFactors",
+           "ScreenFactorsArray", "chugunov_2007", "chugunov_2007_with_dT",
+           "chugunov_2009", "chugunov_2009_with_dT", "make_plasma_state",
+           "make_plasma_state_array", "make_screen_factors",
+           "make_screen_factors_array", "potekhin_1998",
+           "potekhin_1998_with_dT", "screen5", "screen5_with_dT",
+           "screen_all_pairs", "screen_func_with_dT"]
 
 
 @jitclass()
@@ -35,6 +41,12 @@ class PlasmaState:
     :var z2bar:       average (ion charge)^2
     :var n_e:         electron number density
     :var gamma_e_fac: temperature-independent part of Gamma_e
+    :var ntot:        ion number density divided by N_A
+    :var xni:         (ntot * zbar)^(1/3)
+
+    Only qlam0z, taufac, and aa depend on the temperature, so
+    :meth:`update_temp` can change the temperature without redoing
+    the sums over the composition.
     """
     temp: float
     dens: float
@@ -46,6 +58,8 @@ class PlasmaState:
     z2bar: float
     n_e: float
     gamma_e_fac: float
+    ntot: float
+    xni: float
 
     def __init__(self, temp, dens, Ys, Zs):
         """
@@ -56,7 +70,6 @@ class PlasmaState:
         :param Zs:   charge of each ion, in the same order as Ys
         :type Zs: numpy ndarray
         """
-        self.temp = temp
         self.dens = dens
         ytot = np.sum(Ys)
         self.abar = 1 / ytot
@@ -64,11 +77,34 @@ class PlasmaState:
         self.z2bar = np.sum(Zs ** 2 * Ys) / ytot
 
         # ntot
-        rr = dens * ytot
+        self.ntot = dens * ytot
+
+        self.xni = np.cbrt(self.ntot * self.zbar)
+
+        self.update_temp(temp)
+
+        # Average mass and total number density
+        mbar = self.abar * constants.m_u
+        ntot = self.dens / mbar
+        # Electron number density
+        # zbar * ntot works out to sum(z[i] * n[i]), after cancelling terms
+        self.n_e = self.zbar * ntot
+
+        # temperature-independent part of Gamma_e, from Chugunov 2009 eq. 6
+        self.gamma_e_fac = constants.q_e ** 2 / constants.k * np.cbrt(4 * np.pi / 3) * np.cbrt(self.n_e)
+
+    def update_temp(self, temp):
+        """
+        Change the temperature, recomputing only the
+        temperature-dependent factors.
+
+        :param temp: temperature in K
+        """
+        self.temp = temp
 
         # Part version of Eq. 19 in Graboske:1973
         # pp = sqrt( \tilde{z}*(rho/u_I/T) )
-        pp = np.sqrt(rr/temp*(self.z2bar + self.zbar))
+        pp = np.sqrt(self.ntot/temp*(self.z2bar + self.zbar))
         self.qlam0z = 1.88e8 / temp * pp
 
         # Part of Eq.6 in Itoh:1979
@@ -77,22 +113,10 @@ class PlasmaState:
         co2 = np.cbrt(27*np.pi**2*constants.q_e**4*constants.m_u/(2*constants.k*constants.hbar**2)) / 3
         self.taufac = co2 / np.cbrt(temp)
 
-        xni = np.cbrt(rr * self.zbar)
-
         # Part of Eq.4 in Itoh:1979
         # 2.27493e5 = e^2 / ( (3*m_u/(4pi))^(1/3) *k_B )
         aa_factor = constants.q_e**2 / (np.cbrt(3*constants.m_u/(4*np.pi)) * constants.k)
-        self.aa = aa_factor / temp * xni
-
-        # Average mass and total number density
-        mbar = self.abar * constants.m_u
-        ntot = self.dens / mbar
-        # Electron number density
-        # zbar * ntot works out to sum(z[i] * n[i]), after cancelling terms
-        self.n_e = self.zbar * ntot
-
-        # temperature-independent part of Gamma_e, from Chugunov 2009 eq. 6
-        self.gamma_e_fac = constants.q_e ** 2 / constants.k * np.cbrt(4 * np.pi / 3) * np.cbrt(self.n_e)
+        self.aa = aa_factor / temp * self.xni
 
 
 @jitclass()
@@ -201,13 +225,138 @@ def make_screen_factors(n1, n2):
     return ScreenFactors(n1.Z, n1.A, n2.Z, n2.A)
 
 
+# struct-of-arrays versions of PlasmaState and ScreenFactors, for
+# evaluating the screening of many pairs and states at once.  An
+# instance with scalar fields describes a single state or pair, and can
+# be passed to the screening functions in place of the jitclass.
+
+PlasmaStateArray = collections.namedtuple(
+    "PlasmaStateArray",
+    ["temp", "dens", "qlam0z", "taufac", "aa", "abar", "zbar", "z2bar",
+     "n_e", "gamma_e_fac"])
+
+PlasmaStateArray.__doc__ = """\
+The fields of :class:`PlasmaState` for many plasma states, each
+stored as a 1-d array.  Construct it with
+:func:`make_plasma_state_array`.
+"""
+
+ScreenFactorsArray = collections.namedtuple(
+    "ScreenFactorsArray",
+    ["z1", "z2", "a1", "a2", "zs13", "zhat", "zhat2", "lzav", "aznut",
+     "ztilde"])
+
+ScreenFactorsArray.__doc__ = """\
+The fields of :class:`ScreenFactors` for many pairs of nuclei, each
+stored as a 1-d array.  Construct it with
+:func:`make_screen_factors_array`.
+"""
+
+
+@njit
+def _plasma_state_fields(temp, dens, Ys, Zs, same_comp):
+    nstates = len(temp)
+    fields = np.empty((10, nstates))
+    if nstates == 0:
+        return fields
+    state = PlasmaState(temp[0], dens[0], Ys[0, :], Zs)
+    for k in range(nstates):
+        if k > 0:
+            if same_comp and dens[k] == dens[k-1]:
+                # only the temperature changed
+                state.update_temp(temp[k])
+            else:
+                state = PlasmaState(temp[k], dens[k], Ys[k, :], Zs)
+        fields[0, k] = state.temp
+        fields[1, k] = state.dens
+        fields[2, k] = state.qlam0z
+        fields[3, k] = state.taufac
+        fields[4, k] = state.aa
+        fields[5, k] = state.abar
+        fields[6, k] = state.zbar
+        fields[7, k] = state.z2bar
+        fields[8, k] = state.n_e
+        fields[9, k] = state.gamma_e_fac
+    return fields
+
+
+def make_plasma_state_array(temp, dens, Ys, Zs):
+    """
+    Construct a :class:`PlasmaStateArray` for many plasma states.
+
+    :param temp: temperatures in K, a scalar or 1-d array
+    :param dens: densities in g/cm^3, a scalar or 1-d array
+    :param Ys:   molar fractions of each ion, with shape (nstates, nions)
+                 or (nions,)
+    :param Zs:   charge of each ion, in the same order as Ys
+    """
+    Ys = np.atleast_2d(np.asarray(Ys, dtype=np.float64))
+    # with a single composition, consecutive states at the same density
+    # only need their temperature-dependent parts updated
+    same_comp = Ys.shape[0] == 1
+    nstates = np.broadcast_shapes(np.shape(temp), np.shape(dens), Ys.shape[:1])
+    temp = np.ascontiguousarray(np.broadcast_to(temp, nstates), dtype=np.float64)
+    dens = np.ascontiguousarray(np.broadcast_to(dens, nstates), dtype=np.float64)
+    Ys = np.ascontiguousarray(np.broadcast_to(Ys, nstates + Ys.shape[1:]))
+    Zs = np.asarray(Zs, dtype=np.float64)
+    return PlasmaStateArray(*_plasma_state_fields(temp, dens, Ys, Zs, same_comp))
+
+
+def make_screen_factors_array(pairs):
+    """
+    Construct a :class:`ScreenFactorsArray` for a sequence of pairs
+    of nuclei.
+
+    :param pairs: a sequence of (n1, n2) pairs of nuclei
+    """
+    facs = [make_screen_factors(n1, n2) for n1, n2 in pairs]
+    ints = {"z1", "z2", "a1", "a2"}
+    return ScreenFactorsArray(*[np.array([getattr(f, name) for f in facs],
+                                         dtype=np.int64 if name in ints else np.float64)
+                                for name in ScreenFactorsArray._fields])
+
+
 @njit
-def screen5(state: PlasmaState, scn_fac):
+def screen_all_pairs(screen_func, states, scn_facs):
+    """Evaluate the screening function screen_func (e.g.,
+    :func:`screen5`) for every plasma state and pair of nuclei in a
+    single compiled call.
+
+    :param screen_func: one of the screening functions in this module
+    :param PlasmaStateArray states: the plasma states
+    :param ScreenFactorsArray scn_facs: the pairs of nuclei
+    :returns: the screening correction factors, with shape
+              (number of states, number of pairs)
+    """
+    nstates = len(states.temp)
+    npairs = len(scn_facs.z1)
+    scor = np.empty((nstates, npairs))
+    for k in range(nstates):
+        state = PlasmaStateArray(states.temp[k], states.dens[k], states.qlam0z[k],
+                                 states.taufac[k], states.aa[k], states.abar[k],
+                                 states.zbar[k], states.z2bar[k], states.n_e[k],
+                                 states.gamma_e_fac[k])
+        for p in range(npairs):
+            scn_fac = ScreenFactorsArray(scn_facs.z1[p], scn_facs.z2[p],
+                                         scn_facs.a1[p], scn_facs.a2[p],
+                                         scn_facs.zs13[p], scn_facs.zhat[p],
+                                         scn_facs.zhat2[p], scn_facs.lzav[p],
+                                         scn_facs.aznut[p], scn_facs.ztilde[p])
+            scor[k, p] = screen_func(state, scn_fac)
+    return scor
+
+
+@njit
+def screen5(state, scn_fac):
     """Calculates screening factors following the appendix of :cite:t:`Wallace:1982`.
 
     Based on :cite:t:`graboske:1973` for weak screening. Based on
     :cite:t:`alastuey:1978` with plasma parameters from :cite:t:`itoh:1979`,
     for strong screening.
+
+    :param PlasmaState state:     the precomputed plasma state factors
+    :param ScreenFactors scn_fac: the precomputed ion pair factors
+    :returns: screening correction factor
     """
     fact = np.cbrt(2)
     gamefx = 0.3e0  # lower gamma limit for intermediate screening
@@ -334,6 +483,128 @@ def screen5(state: PlasmaState, scn_fac):
     return scor
 
 
+@njit
+def screen5_with_dT(state, scn_fac):
+    """Calculates the screening factor of :func:`screen5` and its
+    temperature derivative.
+
+    :param PlasmaState state:     the precomputed plasma state factors
+    :param ScreenFactors scn_fac: the precomputed ion pair factors
+    :returns: screening correction factor and its derivative with respect
+              to temperature
+    """
+    fact = np.cbrt(2)
+    gamefx = 0.3e0  # lower gamma limit for intermediate screening
+    gamefs = 0.8e0  # upper gamma limit for intermediate screening
+    h12_max = 300.e0
+
+    z1 = scn_fac.z1
+    z2 = scn_fac.z2
+
+    # qlam0z ~ T^(-3/2), taufac ~ T^(-1/3), and aa ~ T^(-1)
+    temp = state.temp
+
+    bb = z1 * z2
+    gamp = state.aa
+    dgamp_dT = -gamp / temp
+
+    qq = fact * bb / scn_fac.zs13
+
+    gamef = qq * gamp
+    dgamef_dT = qq * dgamp_dT
+
+    tau12 = state.taufac * scn_fac.aznut
+    dtau12_dT = -tau12 / (3.0 * temp)
+
+    alph12 = gamef / tau12
+    dalph12_dT = (dgamef_dT - alph12 * dtau12_dT) / tau12
+
+    if alph12 > 1.6:
+        alph12 = 1.6e0
+        dalph12_dT = 0.0
+
+        gamef = 1.6e0 * tau12
+        dgamef_dT = 1.6e0 * dtau12_dT
+
+        gamp = gamef * scn_fac.zs13/(fact * bb)
+        dgamp_dT = dgamef_dT * scn_fac.zs13/(fact * bb)
+
+    # weak screening regime
+    h12w = bb * state.qlam0z
+    dh12w_dT = -1.5 * h12w / temp
+
+    h12 = h12w
+    dh12_dT = dh12w_dT
+
+    # intermediate and strong sceening regime
+
+    if gamef > gamefx:
+
+        gamp14 = gamp ** 0.25
+        dgamp14_dT = 0.25 * gamp14 / gamp * dgamp_dT
+
+        cc = (0.896434e0 * gamp * scn_fac.zhat +
+              -3.44740e0 * gamp14 * scn_fac.zhat2 +
+              -0.5551e0 * (np.log(gamp) + scn_fac.lzav) +
+              -2.996e0)
+        dcc_dT = (0.896434e0 * dgamp_dT * scn_fac.zhat +
+                  -3.44740e0 * dgamp14_dT * scn_fac.zhat2 +
+                  -0.5551e0 * dgamp_dT / gamp)
+
+        a3 = alph12 * alph12 * alph12
+        da3_dT = 3.0 * alph12 * alph12 * dalph12_dT
+
+        qq = 0.014e0 + 0.0128e0*alph12
+        dqq_dT = 0.0128e0 * dalph12_dT
+
+        rr = (5.0/32.0) - alph12*qq
+        drr_dT = -(dalph12_dT * qq + alph12 * dqq_dT)
+
+        ss = tau12*rr
+        dss_dT = dtau12_dT * rr + tau12 * drr_dT
+
+        tt = -0.0098e0 + 0.0048e0*alph12
+        dtt_dT = 0.0048e0 * dalph12_dT
+
+        uu = 0.0055e0 + alph12*tt
+        duu_dT = dalph12_dT * tt + alph12 * dtt_dT
+
+        vv = gamef * alph12 * uu
+        dvv_dT = (dgamef_dT * alph12 * uu + gamef * dalph12_dT * uu +
+                  gamef * alph12 * duu_dT)
+
+        h12 = cc - a3 * (ss + vv)
+        dh12_dT = dcc_dT - (da3_dT * (ss + vv) + a3 * (dss_dT + dvv_dT))
+
+        rr = 1.0 - 0.0562e0*a3
+        drr_dT = -0.0562e0 * da3_dT
+
+        xlgfac = max(0.77, rr)
+        dxlgfac_dT = drr_dT if rr > 0.77 else 0.0
+
+        h12 += np.log(xlgfac)
+        dh12_dT += dxlgfac_dT / xlgfac
+
+        if gamef <= gamefs:
+            dgamma = 1.0e0/(gamefs - gamefx)
+
+            rr = dgamma*(gamefs - gamef)
+            drr_dT = -dgamma * dgamef_dT
+
+            ss = dgamma*(gamef - gamefx)
+            dss_dT = dgamma * dgamef_dT
+
+            dh12_dT = dh12w_dT*rr + h12w*drr_dT + dh12_dT*ss + h12*dss_dT
+            h12 = h12w*rr + h12*ss
+
+    if h12 > h12_max or h12 < 0.0:
+        dh12_dT = 0.0
+    h12 = max(min(h12, h12_max), 0.0)
+    scor = np.exp(h12)
+
+    return scor, scor * dh12_dT
+
+
 @njit
 def smooth_clip(x, limit, start):
     """Smoothly transition between y=limit and y=x with a half-cosine.
@@ -363,6 +634,41 @@ def smooth_clip(x, limit, start):
     return (1 - f) * lower + f * upper
 
 
+@njit
+def smooth_clip_with_deriv(x, dx, limit, start):
+    """Evaluate :func:`smooth_clip` and its derivative.
+
+    :param x:     the value to clip
+    :param dx:    the derivative of x
+    :param limit: the constant value to clip x to
+    :param start: the x-value at which to start the transition
+    :returns: y and its derivative
+    """
+    if limit < start:
+        lower = limit
+        dlower = 0.0
+        upper = x
+        dupper = dx
+    else:
+        lower = x
+        dlower = dx
+        upper = limit
+        dupper = 0.0
+
+    if x < min(limit, start):
+        return lower, dlower
+    if x > max(limit, start):
+        return upper, dupper
+
+    tmp = np.pi * (x - min(limit, start)) / (start - limit)
+    dtmp = np.pi * dx / (start - limit)
+    f = (1 - np.cos(tmp)) / 2
+    df = np.sin(tmp) / 2 * dtmp
+
+    return ((1 - f) * lower + f * upper,
+            df * (upper - lower) + (1 - f) * dlower + f * dupper)
+
+
 @njit
 def chugunov_2007(state, scn_fac):
     """Calculates screening factors based on :cite:t:`chugunov:2007`.
@@ -461,6 +767,91 @@ def chugunov_2007(state, scn_fac):
     return scor
 
 
+@njit
+def chugunov_2007_with_dT(state, scn_fac):
+    """Calculates the screening factor of :func:`chugunov_2007` and its
+    temperature derivative.
+
+    :param PlasmaState state:     the precomputed plasma state factors
+    :param ScreenFactors scn_fac: the precomputed ion pair factors
+    :returns: screening correction factor and its derivative with respect
+              to temperature
+    """
+    # see chugunov_2007 for the details of the prescription
+    mu12 = scn_fac.a1 * scn_fac.a2 / (scn_fac.a1 + scn_fac.a2)
+    z_factor = scn_fac.z1 * scn_fac.z2
+    n_i = state.n_e / scn_fac.ztilde ** 3
+    m_i = 2 * mu12 * constants.m_u
+
+    T_p = constants.hbar / constants.k * constants.q_e * np.sqrt(4 * np.pi * z_factor * n_i / m_i)
+
+    T_norm = state.temp / T_p
+    dT_norm_dT = 1 / T_p
+
+    T_norm_fade = 0.2
+    T_norm_min = 0.1
+
+    T_norm, dT_norm_dT = smooth_clip_with_deriv(T_norm, dT_norm_dT,
+                                                limit=T_norm_min, start=T_norm_fade)
+
+    Gamma = state.gamma_e_fac * scn_fac.z1 * scn_fac.z2 / (scn_fac.ztilde * T_norm * T_p)
+    dGamma_dT = -Gamma / T_norm * dT_norm_dT
+
+    Gamma_fade = 590
+    Gamma_max = 600
+    Gamma, dGamma_dT = smooth_clip_with_deriv(Gamma, dGamma_dT,
+                                              limit=Gamma_max, start=Gamma_fade)
+
+    zeta = np.cbrt(4 / (3 * np.pi ** 2 * T_norm ** 2))
+    dzeta_dT = -2 / 3 * zeta / T_norm * dT_norm_dT
+
+    fit_alpha = 0.022
+    fit_beta = 0.41 - 0.6 / Gamma
+    dfit_beta_dT = 0.6 / Gamma ** 2 * dGamma_dT
+    fit_gamma = 0.06 + 2.2 / Gamma
+    dfit_gamma_dT = -2.2 / Gamma ** 2 * dGamma_dT
+
+    poly = 1 + zeta*(fit_alpha + zeta*(fit_beta + fit_gamma*zeta))
+    dpoly_dT = (dzeta_dT * (fit_alpha + zeta * (2 * fit_beta + 3 * fit_gamma * zeta)) +
+                zeta ** 2 * (dfit_beta_dT + zeta * dfit_gamma_dT))
+
+    gamtilde = Gamma / np.cbrt(poly)
+    dgamtilde_dT = dGamma_dT / np.cbrt(poly) - gamtilde / 3 * dpoly_dT / poly
+
+    A1 = 2.7822
+    A2 = 98.34
+    A3 = np.sqrt(3) - A1 / np.sqrt(A2)
+    B1 = -1.7476
+    B2 = 66.07
+    B3 = 1.12
+    B4 = 65
+    gamtilde2 = gamtilde ** 2
+
+    term1 = 1 / np.sqrt(A2 + gamtilde)
+    term2 = 1 / (1 + gamtilde)
+    term3 = gamtilde ** 2 / (B2 + gamtilde)
+    term4 = gamtilde2 / (B4 + gamtilde2)
+
+    dterm1 = -0.5 * term1 / (A2 + gamtilde)
+    dterm2 = -term2 ** 2
+    dterm3 = gamtilde * (2 * B2 + gamtilde) / (B2 + gamtilde) ** 2
+    dterm4 = 2 * gamtilde * B4 / (B4 + gamtilde2) ** 2
+
+    h = gamtilde ** (3 / 2) * (A1 * term1 + A3 * term2) + B1 * term3 + B3 * term4
+    dh_dgamtilde = (1.5 * np.sqrt(gamtilde) * (A1 * term1 + A3 * term2) +
+                    gamtilde ** (3 / 2) * (A1 * dterm1 + A3 * dterm2) +
+                    B1 * dterm3 + B3 * dterm4)
+    dh_dT = dh_dgamtilde * dgamtilde_dT
+
+    h_max = 300
+    if h > h_max:
+        dh_dT = 0.0
+    h = min(h, h_max)
+    scor = np.exp(h)
+
+    return scor, scor * dh_dT
+
+
 @njit
 def f0(gamma):
     r"""Calculate the free energy per ion in a OCP from :cite:t:`chugunov:2009` eq. 24
@@ -491,6 +882,31 @@ def f0(gamma):
     )
 
 
+@njit
+def f0_deriv(gamma):
+    r"""Calculate the derivative of :func:`f0` with respect to gamma
+
+    :param gamma: Coulomb coupling parameter
+    :returns: df0/dgamma
+    """
+    A1 = -0.907
+    A2 = 0.62954
+    A3 = -np.sqrt(3) / 2 - A1 / np.sqrt(A2)
+    B1 = 0.00456
+    B2 = 211.6
+    B3 = -1e-4
+    B4 = 0.00462
+
+    gamma_12 = np.sqrt(gamma)
+
+    return (
+        A1 * gamma_12 / np.sqrt(A2 + gamma) +
+        A3 * gamma_12 / (1 + gamma) +
+        B1 * gamma / (B2 + gamma) +
+        B3 * gamma / (B4 + gamma ** 2)
+    )
+
+
 @njit
 def chugunov_2009(state, scn_fac):
     """Calculates screening factors based on :cite:t:`chugunov:2009`.
@@ -556,6 +972,77 @@ def chugunov_2009(state, scn_fac):
     return scor
 
 
+@njit
+def chugunov_2009_with_dT(state, scn_fac):
+    """Calculates the screening factor of :func:`chugunov_2009` and its
+    temperature derivative.
+
+    :param PlasmaState state:     the precomputed plasma state factors
+    :param ScreenFactors scn_fac: the precomputed ion pair factors
+    :returns: screening correction factor and its derivative with respect
+              to temperature
+    """
+    # see chugunov_2009 for the details of the prescription
+    z1z2 = scn_fac.z1 * scn_fac.z2
+    zcomp = scn_fac.z1 + scn_fac.z2
+
+    # all of the Gamma's scale as 1/T
+    Gamma_e = state.gamma_e_fac / state.temp
+
+    Gamma_1 = Gamma_e * scn_fac.z1 ** (5 / 3)
+    Gamma_2 = Gamma_e * scn_fac.z2 ** (5 / 3)
+    Gamma_comp = Gamma_e * zcomp ** (5 / 3)
+
+    Gamma_12 = Gamma_e * z1z2 / scn_fac.ztilde
+    dGamma_12_dT = -Gamma_12 / state.temp
+
+    tau_factor = np.cbrt(27 / 2 * (np.pi * constants.q_e ** 2 / constants.hbar) ** 2 * constants.m_u / constants.k)
+    tau_12 = tau_factor * scn_fac.aznut / np.cbrt(state.temp)
+
+    # zeta ~ T^(-2/3)
+    zeta = 3 * Gamma_12 / tau_12
+    dzeta_dT = -2 / 3 * zeta / state.temp
+
+    y_12 = 4 * z1z2 / zcomp ** 2
+    c1 = 0.013 * y_12 ** 2
+    c2 = 0.406 * y_12 ** 0.14
+    c3 = 0.062 * y_12 ** 0.19 + 1.8 / Gamma_12
+    dc3_dT = -1.8 / Gamma_12 ** 2 * dGamma_12_dT
+
+    poly = 1 + zeta*(c1 + zeta*(c2 + c3*zeta))
+    dpoly_dT = dzeta_dT * (c1 + zeta * (2 * c2 + 3 * c3 * zeta)) + zeta ** 3 * dc3_dT
+    t_12 = np.cbrt(poly)
+    dt_12_dT = t_12 / 3 * dpoly_dT / poly
+
+    h_fit = 0.0
+    dh_fit_dT = 0.0
+    for Gamma, sign in ((Gamma_1, 1.0), (Gamma_2, 1.0), (Gamma_comp, -1.0)):
+        x = Gamma / t_12
+        dx_dT = -x / state.temp - x * dt_12_dT / t_12
+        h_fit += sign * f0(x)
+        dh_fit_dT += sign * f0_deriv(x) * dx_dT
+
+    corr_C = (
+        3 * z1z2 * np.sqrt(state.z2bar / state.zbar) /
+        (zcomp ** 2.5 - scn_fac.z1 ** 2.5 - scn_fac.z2 ** 2.5)
+    )
+
+    Gamma_12_2 = Gamma_12 ** 2
+    numer = corr_C + Gamma_12_2
+    denom = 1 + Gamma_12_2
+    dratio_dT = 2 * Gamma_12 * dGamma_12_dT * (1 - corr_C) / denom ** 2
+    h12 = numer / denom * h_fit
+    dh12_dT = dratio_dT * h_fit + numer / denom * dh_fit_dT
+
+    h12_max = 300
+    if h12 > h12_max:
+        dh12_dT = 0.0
+    h12 = min(h12, h12_max)
+    scor = np.exp(h12)
+
+    return scor, scor * dh12_dT
+
+
 @njit
 def potekhin_1998(state, scn_fac):
     """Calculates screening factors based on :cite:t:`chabrier_potekhin:1998`.
@@ -593,3 +1080,93 @@ def potekhin_1998(state, scn_fac):
     scor = np.exp(h12)
 
     return scor
+
+
+@njit
+def potekhin_1998_with_dT(state, scn_fac):
+    """Calculates the screening factor of :func:`potekhin_1998` and its
+    temperature derivative.
+
+    :param PlasmaState state:     the precomputed plasma state factors
+    :param ScreenFactors scn_fac: the precomputed ion pair factors
+    :returns: screening correction factor and its derivative with respect
+              to temperature
+    """
+
+    Gamma_e = state.gamma_e_fac / state.temp
+    zcomp = scn_fac.z1 + scn_fac.z2
+
+    A_1 = -0.9052
+    A_2 = 0.6322
+    A_3 = -0.5 * np.sqrt(3) - A_1/np.sqrt(A_2)
+
+    # h12 = f(Gamma_1) + f(Gamma_2) - f(Gamma_comp), where each Gamma ~ 1/T
+    h12 = 0.0
+    dh12_dT = 0.0
+    for z, sign in ((scn_fac.z1, 1.0), (scn_fac.z2, 1.0), (zcomp, -1.0)):
+        Gamma = Gamma_e * z ** (5 / 3)
+        f = A_1 * (np.sqrt(Gamma * (A_2 + Gamma)) - A_2 * np.log(np.sqrt(Gamma / A_2) +
+                   np.sqrt(1.0 + Gamma/A_2))) + 2.0 * A_3 * (np.sqrt(Gamma) - np.arctan(np.sqrt(Gamma)))
+        df_dGamma = (A_1 * np.sqrt(Gamma / (A_2 + Gamma)) +
+                     A_3 * np.sqrt(Gamma) / (1.0 + Gamma))
+        h12 += sign * f
+        dh12_dT -= sign * df_dGamma * Gamma / state.temp
+
+    h12_max = 300
+    if h12 > h12_max:
+        dh12_dT = 0.0
+    h12 = min(h12, h12_max)
+    scor = np.exp(h12)
+
+    return scor, scor * dh12_dT
+
+
+@njit
+def _plasma_state_at_temp(state, temp):
+    """return a copy of state (as a scalar :class:`PlasmaStateArray`)
+    at a different temperature"""
+    # qlam0z ~ T^(-3/2), taufac ~ T^(-1/3), and aa ~ T^(-1)
+    ratio = temp / state.temp
+    return PlasmaStateArray(temp, state.dens, state.qlam0z / ratio ** 1.5,
+                            state.taufac / np.cbrt(ratio), state.aa / ratio,
+                            state.abar, state.zbar, state.z2bar, state.n_e,
+                            state.gamma_e_fac)
+
+
+def _numerical_with_dT(screen_func):
+    """wrap a screening function without an analytic temperature
+    derivative so it returns a centered-difference derivative"""
+
+    @njit
+    def numerical_with_dT(state, scn_fac):
+        dT = 1.e-5 * state.temp
+        scor_hi = screen_func(_plasma_state_at_temp(state, state.temp + dT), scn_fac)
+        scor_lo = screen_func(_plasma_state_at_temp(state, state.temp - dT), scn_fac)
+        return screen_func(state, scn_fac), (scor_hi - scor_lo) / (2.0 * dT)
+
+    return numerical_with_dT
+
+
+_screen_funcs_with_dT = {screen5: screen5_with_dT,
+                         chugunov_2007: chugunov_2007_with_dT,
+                         chugunov_2009: chugunov_2009_with_dT,
+                         potekhin_1998: potekhin_1998_with_dT}
+
+
+def screen_func_with_dT(screen_func):
+    """Return the counterpart of screen_func that computes both the
+    screening factor and its temperature derivative, e.g.,
+    :func:`screen5_with_dT` for :func:`screen5`.  Other screening
+    functions are differenced in temperature instead.
+
+    :param screen_func: one of the screening functions in this module,
+                        a user-supplied one with the same signature, or
+                        None
+    :returns: a function of (state, scn_fac) returning the screening
+              factor and its derivative, or None if screen_func is None
+    """
+    if screen_func is None:
+        return None
+    if screen_func not in _screen_funcs_with_dT:
+        _screen_funcs_with_dT[screen_func] = _numerical_with_dT(screen_func)
+    return _screen_funcs_with_dT[screen_func]
@@ -1,10 +1,17 @@
+import numba
+import numpy as np
 import pytest
 from pytest import approx
 
 import pynucastro as pyna
-from pynucastro.screening import (chugunov_2007, chugunov_2009,
-                                  make_plasma_state, make_screen_factors,
-                                  potekhin_1998, screen5)
+from pynucastro.screening import (chugunov_2007, chugunov_2007_with_dT,
+                                  chugunov_2009, chugunov_2009_with_dT,
+                                  make_plasma_state, make_plasma_state_array,
+                                  make_screen_factors,
+                                  make_screen_factors_array, potekhin_1998,
+                                  potekhin_1998_with_dT, screen5,
+                                  screen5_with_dT, screen_all_pairs,
+                                  screen_func_with_dT)
 
 
 class TestScreen:
@@ -43,6 +50,18 @@ class TestScreen:
         assert plasma_state.n_e == approx(5.118819647768954e+28)
         assert plasma_state.gamma_e_fac == approx(10001498.09343337)
 
+    def test_update_temp(self, nuclei):
+        comp = pyna.Composition(nuclei)
+        comp.set_solar_like()
+
+        plasma_state = make_plasma_state(1e6, 1e5, comp.get_molar())
+        plasma_state.update_temp(3e8)
+        ref = make_plasma_state(3e8, 1e5, comp.get_molar())
+
+        for field in ["temp", "dens", "qlam0z", "taufac", "aa", "abar",
+                      "zbar", "z2bar", "n_e", "gamma_e_fac"]:
+            assert getattr(plasma_state, field) == getattr(ref, field)
+
     def test_screen_factors(self, scn_fac):
         assert scn_fac.z1 == 6
         assert scn_fac.a1 == 12
@@ -70,3 +89,62 @@ class TestScreen:
     def test_screen5(self, plasma_state, scn_fac):
         scor = screen5(plasma_state, scn_fac)
         assert scor == approx(4.049488384394272e+33)
+
+    @pytest.mark.parametrize("screen_func", [chugunov_2007, chugunov_2009,
+                                             potekhin_1998, screen5])
+    def test_screen_all_pairs(self, nuclei, screen_func):
+        temps = np.array([1.e6, 1.e8, 3.e9])
+        denss = np.array([1.e5, 1.e7, 1.e9])
+        comp = pyna.Composition(nuclei)
+        comp.set_solar_like()
+        ys = comp.get_molar()
+
+        pairs = [(nuclei[i], nuclei[j])
+                 for i in range(len(nuclei)) for j in range(i, len(nuclei))]
+        states = make_plasma_state_array(temps, denss, list(ys.values()),
+                                         [n.Z for n in ys])
+        scor = screen_all_pairs(screen_func, states,
+                                make_screen_factors_array(pairs))
+        assert scor.shape == (len(temps), len(pairs))
+
+        for k, (temp, dens) in enumerate(zip(temps, denss)):
+            plasma_state = make_plasma_state(temp, dens, ys)
+            for p, (n1, n2) in enumerate(pairs):
+                scn_fac = make_screen_factors(n1, n2)
+                assert scor[k, p] == approx(screen_func(plasma_state, scn_fac),
+                                            rel=1.e-14)
+
+    @pytest.mark.parametrize("screen_func, screen_func_dT",
+                             [(chugunov_2007, chugunov_2007_with_dT),
+                              (chugunov_2009, chugunov_2009_with_dT),
+                              (potekhin_1998, potekhin_1998_with_dT),
+                              (screen5, screen5_with_dT)])
+    def test_with_dT(self, nuclei, scn_fac, screen_func, screen_func_dT):
+        assert screen_func_with_dT(screen_func) is screen_func_dT
+
+        comp = pyna.Composition(nuclei)
+        comp.set_solar_like()
+        ys = comp.get_molar()
+
+        # these cover the weak, intermediate, and strong screening regimes
+        for temp, dens in [(1.e6, 1.e5), (1.e8, 1.e2), (1.e8, 1.e6), (3.e9, 1.e9)]:
+            plasma_state = make_plasma_state(temp, dens, ys)
+            scor, dscor_dT = screen_func_dT(plasma_state, scn_fac)
+            assert scor == screen_func(plasma_state, scn_fac)
+
+            dT = 1.e-6 * temp
+            dscor_dT_fd = (screen_func(make_plasma_state(temp + dT, dens, ys), scn_fac) -
+                           screen_func(make_plasma_state(temp - dT, dens, ys), scn_fac)) / (2.0 * dT)
+            assert dscor_dT == approx(dscor_dT_fd, rel=1.e-6, abs=1.e-8 * scor / temp)
+
+    def test_with_dT_numerical(self, plasma_state, scn_fac):
+        assert screen_func_with_dT(None) is None
+
+        @numba.njit()
+        def my_screen(state, scn_fac):
+            return chugunov_2009(state, scn_fac)
+
+        scor, dscor_dT = screen_func_with_dT(my_screen)(plasma_state, scn_fac)
+        scor_ref, dscor_dT_ref = chugunov_2009_with_dT(plasma_state, scn_fac)
+        assert scor == scor_ref
+        assert dscor_dT == approx(dscor_dT_ref, rel=1.e-6)